@@ -1,43 +1,55 @@
-from flask import Flask, request, jsonify, send_file, session
-from flask_sqlalchemy import SQLAlchemy
+from flask import (
+    Blueprint, Flask, current_app, g, make_response, redirect, render_template, request, jsonify,
+    send_from_directory, session, stream_with_context, url_for,
+)
+from werkzeug.datastructures import ContentRange
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
+from werkzeug.utils import secure_filename, send_file as werkzeug_send_file
 import os
 import json
-from datetime import datetime
+import mimetypes
+import base64
+import hashlib
+import uuid
+from datetime import datetime, timedelta
 import re
-from functools import wraps
-
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
-app.config['UPLOAD_FOLDER'] = 'uploads'
-
-db = SQLAlchemy(app)
-
-# Database Models
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(200), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-class Document(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(200), nullable=False)
-    original_filename = db.Column(db.String(300))
-    google_doc_link = db.Column(db.String(500))
-    file_path = db.Column(db.String(500))
-    file_type = db.Column(db.String(50))
-    file_size = db.Column(db.Integer)
-    category = db.Column(db.String(100), default='General')
-    tags = db.Column(db.String(300))
-    description = db.Column(db.Text)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+import shutil
+import zipfile
+from contextlib import contextmanager
+from functools import partial, wraps
+import click
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from assets import build_assets, negotiate_encoding
+from models import db, configure_sqlite, engine_options, User, Document, DocumentChange, Export, Job, UserStat, UploadSession
+from metrics import (
+    DOWNLOAD_BYTES, UPLOAD_BYTES, finish_request, instrument_engine, render_metrics, start_request,
+)
+from migrations import REBUILD_STATS_SQL, run_migrations
+from uploads import (
+    create_partial_file, drop_hasher, file_checksum, hash_file_prefix, put_hasher, take_hasher, write_chunk,
+)
+from blobstore import (
+    add_reference, blob_key, collect_blob, orphaned_blobs, release_references, reuse_blob, settle_blob,
+    store_blob, unreferenced_blobs,
+)
+from jobs import enqueue_jobs, job_handler, start_workers, wake_workers
+from previews import cached_preview, can_preview, generate_preview
+from exports import measure_documents, plan_archive, unmeasured_documents
+from imports import (
+    DEFAULT_CATEGORIES, MAX_CATEGORY_LENGTH, MAX_TAGS_LENGTH, ImportFormatError,
+    batches, csv_records, jsonl_records, normalize_tags, valid_link, validate_record,
+)
+from streaming import compress_response, json_provider, stream_csv, stream_json, stream_jsonl
+from storage import create_storage
+from search import (
+    build_match_query, extract_text, index_document_body, render_snippet,
+    SNIPPET_START, SNIPPET_END,
+)
+
+# All routes and CLI commands hang off this blueprint; create_app() wires it up
+bp = Blueprint('docmanager', __name__, cli_group=None)
 
 # Helper functions
 def login_required(f):
@@ -52,19 +64,294 @@ def allowed_file(filename):
     allowed_extensions = {'pdf', 'doc', 'docx', 'txt', 'xls', 'xlsx', 'ppt', 'pptx', 'jpg', 'jpeg', 'png', 'zip'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
-def get_user_folder(user_id):
-    user_folder = os.path.join(app.config['UPLOAD_FOLDER'], f'user_{user_id}')
-    if not os.path.exists(user_folder):
-        os.makedirs(user_folder)
-    return user_folder
+def incoming_path(upload_id):
+    """Partial file that receives the chunks of an upload"""
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], '.incoming', f'{upload_id}.part')
+
+def get_storage():
+    return current_app.extensions['storage']
+
+@contextmanager
+def document_file(document):
+    """A local path to a document's file inside the with block, wherever it is stored"""
+    if document.content_hash:
+        with get_storage().local_copy(blob_key(document.content_hash)) as path:
+            yield path
+    else:
+        yield document.file_path  # from before the blob store, so on local disk
+
+def file_document(user_id, filename, file_path, file_size, sha256, category, description):
+    """Document row for a file that has been put in the blob store"""
+    # Get file extension for file type
+    file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'unknown'
+    
+    return Document(
+        name=os.path.splitext(filename)[0],
+        original_filename=filename,
+        file_path=file_path,
+        file_type=file_ext,
+        file_size=file_size,
+        content_hash=sha256,
+        category=category,
+        description=description,
+        user_id=user_id,
+        processing_status='pending'
+    )
 
-def create_user_folder(user_id):
-    """Create user folder immediately when user signs up"""
-    user_folder = os.path.join(app.config['UPLOAD_FOLDER'], f'user_{user_id}')
-    if not os.path.exists(user_folder):
-        os.makedirs(user_folder)
-        print(f"✅ Created user folder: {user_folder}")
-    return user_folder
+def save_uploaded_file(user_id, temp_path, filename, file_size, sha256, category, description):
+    """Move a fully received file into the blob store and record it"""
+    # Upload before the write transaction, which then only takes the reference
+    storage = get_storage()
+    file_path = store_blob(storage, sha256, temp_path)
+    
+    add_reference(db.session.connection(), sha256, file_size)
+    document = file_document(user_id, filename, file_path, file_size, sha256, category, description)
+    db.session.add(document)
+    db.session.flush()
+    
+    enqueue_jobs([document.id], POST_UPLOAD_JOBS)
+    db.session.commit()
+    settle_blob(storage, sha256, temp_path)
+    wake_workers()
+    return document
+
+def stage_file(stream):
+    """Stream one incoming file to a partial file, hashing it on the way
+
+    Returns (temp path, size, sha256), or None if it is larger than MAX_UPLOAD_SIZE.
+    """
+    temp_path = incoming_path(uuid.uuid4().hex)
+    create_partial_file(temp_path)
+    hasher = hashlib.sha256()
+    try:
+        file_size, complete = write_chunk(stream, temp_path, 0, current_app.config['MAX_UPLOAD_SIZE'], hasher)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    if not complete:
+        os.remove(temp_path)
+        return None
+    return temp_path, file_size, hasher.hexdigest()
+
+# ZIP bombs: the sizes in an archive's headers can't be trusted, so they are
+# checked up front and again against the bytes each member actually yields
+RATIO_CHECK_MIN_SIZE = 1024 * 1024  # tiny members may legitimately compress very well
+
+class ArchiveLimitError(Exception):
+    """An archive expands past MAX_UNPACKED_SIZE or MAX_COMPRESSION_RATIO"""
+
+class UnpackBudget:
+    """Uncompressed bytes still allowed across all the archives in one request"""
+    def __init__(self, limit):
+        self.remaining = limit
+    
+    def take(self, size):
+        self.remaining -= size
+        if self.remaining < 0:
+            raise ArchiveLimitError('The archives expand past the size limit!')
+
+class ZipMember:
+    """A member's stream that stops at its declared size, the ratio limit or the budget"""
+    def __init__(self, member, info, budget):
+        self.member = member
+        self.info = info
+        self.budget = budget
+        self.max_size = max(info.compress_size * current_app.config['MAX_COMPRESSION_RATIO'], RATIO_CHECK_MIN_SIZE)
+        self.read_size = 0
+    
+    def read(self, size=-1):
+        data = self.member.read(size)
+        self.read_size += len(data)
+        if self.read_size > self.info.file_size:
+            raise ArchiveLimitError(f'{self.info.filename} is larger than its header says!')
+        if self.read_size > self.max_size:
+            raise ArchiveLimitError(f'{self.info.filename} is compressed too many times over!')
+        self.budget.take(len(data))
+        return data
+
+def zip_members(archive, budget):
+    """(filename, stream) for every regular file in an open ZIP, read lazily
+
+    Raises ArchiveLimitError when the archive would overrun `budget` (an
+    UnpackBudget) or MAX_COMPRESSION_RATIO, before any member is read if its
+    headers already say so.
+    """
+    members = []
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        members.append((name, info))
+    max_ratio = current_app.config['MAX_COMPRESSION_RATIO']
+    if sum(info.file_size for _, info in members) > budget.remaining:
+        raise ArchiveLimitError('The archives expand past the size limit!')
+    for _, info in members:
+        if info.file_size > max(info.compress_size * max_ratio, RATIO_CHECK_MIN_SIZE):
+            raise ArchiveLimitError(f'{info.filename} is compressed too many times over!')
+    
+    for name, info in members:
+        with archive.open(info) as member:
+            yield name, ZipMember(member, info, budget)
+
+def ingest_files(user_id, incoming, category, description):
+    """Store many files and insert all their documents in one transaction
+
+    `incoming` yields (filename, binary stream) pairs, which are streamed to
+    disk one at a time. Returns one result per file, in order. Processing such
+    as text extraction is queued for the background workers. An
+    ArchiveLimitError aborts the whole request: nothing staged is kept.
+    """
+    results = []
+    staged = []
+    max_files = current_app.config['MAX_BULK_FILES']
+    try:
+        for original_name, stream in incoming:
+            if len(results) >= max_files:
+                results.append({'filename': original_name, 'success': False, 'message': f'Only {max_files} files per request!'})
+                break
+            
+            filename = secure_filename(original_name)
+            if not filename or not allowed_file(filename):
+                results.append({'filename': original_name, 'success': False, 'message': 'Invalid file type!'})
+                continue
+            
+            try:
+                stored = stage_file(stream)
+            except (zipfile.BadZipFile, EOFError) as e:
+                results.append({'filename': original_name, 'success': False, 'message': f'Corrupt archive member: {e}'})
+                continue
+            if stored is None:
+                results.append({'filename': original_name, 'success': False, 'message': 'File is too large!'})
+                continue
+            
+            staged.append((len(results), filename) + stored)
+            results.append({'filename': original_name, 'success': True, 'message': 'File uploaded!'})
+        
+        # Upload everything before the write transaction, which then only records it
+        storage = get_storage()
+        file_paths = [store_blob(storage, sha256, temp_path) for _, _, temp_path, _, sha256 in staged]
+        
+        documents = []
+        connection = db.session.connection()
+        for (_, filename, _, file_size, sha256), file_path in zip(staged, file_paths):
+            add_reference(connection, sha256, file_size)
+            documents.append(file_document(user_id, filename, file_path, file_size, sha256, category, description))
+        db.session.add_all(documents)
+        db.session.flush()
+        # Read these before the commit expires (and would reload) every row
+        doc_ids = [document.id for document in documents]
+        enqueue_jobs(doc_ids, POST_UPLOAD_JOBS)
+        db.session.commit()
+        
+        for _, _, temp_path, _, sha256 in staged:
+            if os.path.exists(temp_path):  # the same content can be staged twice
+                settle_blob(storage, sha256, temp_path)
+    finally:
+        # Anything not settled (e.g. after an error) is left over here
+        for _, _, temp_path, _, _ in staged:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    for (index, *_), doc_id in zip(staged, doc_ids):
+        results[index]['document_id'] = doc_id
+    wake_workers()
+    return results
+
+# Metrics (see metrics.py)
+UPLOAD_ENDPOINTS = {'docmanager.api_upload', 'docmanager.api_upload_bulk', 'docmanager.api_upload_chunk'}
+
+def metrics_endpoint():
+    return (request.endpoint or 'unmatched').removeprefix('docmanager.')
+
+@bp.before_app_request
+def start_request_metrics():
+    start_request()
+
+@bp.after_app_request
+def record_response_metrics(response):
+    state = g.get('metrics')
+    if state is None:
+        return response
+    state.status = response.status_code
+    if request.endpoint in UPLOAD_ENDPOINTS and request.content_length:
+        UPLOAD_BYTES.inc(request.content_length, endpoint=metrics_endpoint())
+    # Finished when the server closes the response, i.e. after a streamed body has gone out
+    response.call_on_close(partial(
+        finish_request, state, request.method, metrics_endpoint(), request.path,
+        current_app.config['SLOW_REQUEST_THRESHOLD']
+    ))
+    return response
+
+@bp.teardown_app_request
+def abandon_request_metrics(exception):
+    # A request that failed on the way out still has to leave the in-flight gauge
+    state = g.get('metrics')
+    if state is not None and exception is not None:
+        finish_request(
+            state, request.method, metrics_endpoint(), request.path, current_app.config['SLOW_REQUEST_THRESHOLD']
+        )
+
+@bp.route('/metrics')
+def metrics():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'success': False, 'message': 'Unauthorized!'}), 401
+    return current_app.response_class(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# Background processing after an upload, run by the workers in jobs.py
+POST_UPLOAD_JOBS = ['extract_text', 'preview', 'measure']
+
+@job_handler('extract_text', concurrency=2)
+def extract_text_job(document_id):
+    """Make a stored file's contents searchable"""
+    document = db.session.get(Document, document_id)
+    if document is None or not document.file_path:
+        return  # deleted while the job was queued
+    with document_file(document) as path:
+        text = extract_text(path, document.file_type)
+    index_document_body(db.session.connection(), document.id, text)
+
+@job_handler('preview', concurrency=2)
+def preview_job(document_id):
+    """Render a stored file's preview into the preview cache"""
+    document = db.session.get(Document, document_id)
+    if document is None or not document.content_hash or not can_preview(document.file_type):
+        return
+    config = current_app.config
+    if cached_preview(config['PREVIEW_FOLDER'], document.content_hash) is not None:
+        return  # e.g. another document with the same content got there first
+    with document_file(document) as path:
+        generate_preview(
+            config['PREVIEW_FOLDER'], document.content_hash, path, document.file_type,
+            config['PREVIEW_SIZE'], config['PREVIEW_CACHE_SIZE']
+        )
+
+@job_handler('measure', concurrency=2)
+def measure_job(document_id):
+    """Store the CRC-32 and deflated size a ZIP export of the file will need"""
+    document = db.session.get(Document, document_id)
+    if document is None or not document.content_hash:
+        return
+    measure_documents(db.session.connection(), get_storage(), [document])
+
+@bp.before_app_request
+def start_job_workers():
+    if current_app.config['JOB_WORKERS']:
+        start_workers(current_app._get_current_object(), current_app.config['JOB_WORKERS'])
+
+def discard_upload_session(upload):
+    drop_hasher(upload.id)
+    temp_path = incoming_path(upload.id)
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    db.session.delete(upload)
+
+def expire_upload_sessions():
+    """Drop chunked uploads that have been idle for longer than UPLOAD_SESSION_TTL"""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['UPLOAD_SESSION_TTL'])
+    for upload in UploadSession.query.filter(UploadSession.updated_at < cutoff).all():
+        discard_upload_session(upload)
+    db.session.commit()
 
 def format_file_size(size):
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -73,1749 +360,162 @@ def format_file_size(size):
         size /= 1024.0
     return f"{size:.1f} TB"
 
-# Main HTML Page - Enhanced with Charts
-@app.route('/')
-def index():
-    return '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>DocManager Pro - Enhanced Document Management</title>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.2/gsap.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        :root {
-            --primary: #6366f1;
-            --primary-dark: #4f46e5;
-            --secondary: #10b981;
-            --danger: #ef4444;
-            --warning: #f59e0b;
-            --info: #3b82f6;
-            
-            --bg-primary: #0f172a;
-            --bg-secondary: #1e293b;
-            --bg-card: #334155;
-            --text-primary: #f8fafc;
-            --text-secondary: #cbd5e1;
-            --border: #475569;
-            
-            --gradient-primary: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            --gradient-secondary: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-            --gradient-success: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-            
-            --shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.3), 0 4px 6px -2px rgba(0, 0, 0, 0.2);
-            --shadow-lg: 0 25px 50px -12px rgba(0, 0, 0, 0.5);
-            
-            --border-radius: 12px;
-            --transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-
-        .light-theme {
-            --bg-primary: #f8fafc;
-            --bg-secondary: #e2e8f0;
-            --bg-card: #ffffff;
-            --text-primary: #1e293b;
-            --text-secondary: #475569;
-            --border: #cbd5e1;
-            
-            --shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
-            --shadow-lg: 0 25px 50px -12px rgba(0, 0, 0, 0.15);
-        }
-
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: var(--bg-primary);
-            color: var(--text-primary);
-            line-height: 1.6;
-            overflow-x: hidden;
-            transition: var(--transition);
-        }
-
-        /* Particles Background */
-        #particles-js {
-            position: fixed;
-            width: 100%;
-            height: 100%;
-            z-index: -1;
-        }
-
-        /* Header Styles */
-        .header {
-            background: rgba(15, 23, 42, 0.8);
-            backdrop-filter: blur(10px);
-            padding: 1rem 0;
-            box-shadow: var(--shadow);
-            position: sticky;
-            top: 0;
-            z-index: 100;
-            border-bottom: 1px solid var(--border);
-            transition: var(--transition);
-        }
-
-        .light-theme .header {
-            background: rgba(248, 250, 252, 0.8);
-        }
-
-        .header-content {
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 0 2rem;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-
-        .logo {
-            display: flex;
-            align-items: center;
-            gap: 12px;
-        }
-
-        .logo-icon {
-            font-size: 2rem;
-            background: var(--gradient-primary);
-            -webkit-background-clip: text;
-            background-clip: text;
-            color: transparent;
-            filter: drop-shadow(0 0 10px rgba(99, 102, 241, 0.5));
-            animation: pulse 2s infinite;
-        }
-
-        .logo h1 {
-            font-size: 1.8rem;
-            background: var(--gradient-primary);
-            -webkit-background-clip: text;
-            background-clip: text;
-            color: transparent;
-            font-weight: 700;
-        }
-
-        /* Navigation */
-        .nav {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 2rem;
-            background: var(--bg-secondary);
-            padding: 0.5rem;
-            border-radius: var(--border-radius);
-            box-shadow: var(--shadow);
-        }
-
-        .nav-btn {
-            padding: 12px 24px;
-            background: transparent;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-weight: 600;
-            color: var(--text-secondary);
-            transition: var(--transition);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .nav-btn::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--gradient-primary);
-            transition: var(--transition);
-            z-index: -1;
-        }
-
-        .nav-btn:hover::before,
-        .nav-btn.active::before {
-            left: 0;
-        }
-
-        .nav-btn:hover,
-        .nav-btn.active {
-            color: white;
-            box-shadow: 0 0 15px rgba(99, 102, 241, 0.5);
-        }
-
-        /* Auth Container */
-        .auth-container {
-            max-width: 450px;
-            margin: 80px auto;
-            padding: 2.5rem;
-            background: var(--bg-card);
-            border-radius: var(--border-radius);
-            box-shadow: var(--shadow-lg);
-            backdrop-filter: blur(10px);
-            border: 1px solid var(--border);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .auth-container::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: var(--gradient-primary);
-        }
-
-        .auth-form {
-            display: none;
-        }
-
-        .auth-form.active {
-            display: block;
-            animation: fadeIn 0.5s ease-out;
-        }
-
-        /* Form Elements */
-        .form-group {
-            margin-bottom: 1.5rem;
-            position: relative;
-        }
-
-        .form-group label {
-            display: block;
-            margin-bottom: 0.5rem;
-            font-weight: 600;
-            color: var(--text-primary);
-        }
-
-        .form-input {
-            width: 100%;
-            padding: 14px 16px;
-            background: var(--bg-secondary);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            font-size: 16px;
-            color: var(--text-primary);
-            transition: var(--transition);
-        }
-
-        .form-input:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.2);
-        }
-
-        /* Buttons */
-        .btn {
-            padding: 14px 24px;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-size: 16px;
-            font-weight: 600;
-            text-decoration: none;
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            gap: 8px;
-            transition: var(--transition);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .btn::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-            transition: var(--transition);
-        }
-
-        .btn:hover::before {
-            left: 100%;
-        }
-
-        .btn-primary {
-            background: var(--gradient-primary);
-            color: white;
-            box-shadow: 0 4px 6px rgba(99, 102, 241, 0.3);
-        }
-
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 12px rgba(99, 102, 241, 0.4);
-        }
-
-        .btn-secondary {
-            background: var(--bg-secondary);
-            color: var(--text-primary);
-            border: 1px solid var(--border);
-        }
-
-        .btn-secondary:hover {
-            background: var(--bg-card);
-        }
-
-        .btn-success {
-            background: var(--gradient-success);
-            color: white;
-        }
-
-        .btn-danger {
-            background: var(--danger);
-            color: white;
-        }
-
-        .btn-block {
-            width: 100%;
-        }
-
-        /* Stats Cards */
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1.5rem;
-            margin-bottom: 2rem;
-        }
-
-        .stat-card {
-            background: var(--bg-card);
-            padding: 1.5rem;
-            border-radius: var(--border-radius);
-            box-shadow: var(--shadow);
-            border: 1px solid var(--border);
-            transition: var(--transition);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .stat-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: var(--gradient-primary);
-        }
-
-        .stat-card:hover {
-            transform: translateY(-5px);
-            box-shadow: var(--shadow-lg);
-        }
-
-        .stat-card h3 {
-            font-size: 2.5rem;
-            margin-bottom: 0.5rem;
-            background: var(--gradient-primary);
-            -webkit-background-clip: text;
-            background-clip: text;
-            color: transparent;
-        }
-
-        /* Chart Containers */
-        .charts-container {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-            gap: 1.5rem;
-            margin-bottom: 2rem;
-        }
-
-        .chart-card {
-            background: var(--bg-card);
-            padding: 1.5rem;
-            border-radius: var(--border-radius);
-            box-shadow: var(--shadow);
-            border: 1px solid var(--border);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .chart-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: var(--gradient-primary);
-        }
-
-        .chart-title {
-            font-size: 1.2rem;
-            font-weight: 600;
-            margin-bottom: 1rem;
-            text-align: center;
-            color: var(--text-primary);
-        }
-
-        .chart-wrapper {
-            position: relative;
-            height: 300px;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-        }
-
-        /* Document Cards - UPDATED LAYOUT */
-        .documents-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(320px, 1fr));
-            gap: 1.5rem;
-        }
-
-        .document-card {
-            background: var(--bg-card);
-            padding: 1.5rem;
-            border-radius: var(--border-radius);
-            box-shadow: var(--shadow);
-            border: 1px solid var(--border);
-            transition: var(--transition);
-            position: relative;
-            overflow: hidden;
-            display: flex;
-            flex-direction: column;
-            height: 100%;
-        }
-
-        .document-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: var(--gradient-primary);
-        }
-
-        .document-card:hover {
-            transform: translateY(-5px);
-            box-shadow: var(--shadow-lg);
-        }
-
-        .document-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            margin-bottom: 1rem;
-        }
-
-        .document-title {
-            font-weight: 700;
-            font-size: 1.2rem;
-            margin-bottom: 0.5rem;
-            color: var(--text-primary);
-            line-height: 1.3;
-        }
-
-        .document-category {
-            background: var(--gradient-primary);
-            color: white;
-            padding: 4px 12px;
-            border-radius: 20px;
-            font-size: 0.8rem;
-            font-weight: 600;
-            display: inline-block;
-        }
-
-        .file-icon-container {
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin-bottom: 1rem;
-        }
-
-        .file-icon {
-            font-size: 3rem;
-        }
-
-        .document-content {
-            flex: 1;
-            margin-bottom: 1rem;
-        }
-
-        .document-description {
-            color: var(--text-secondary);
-            margin-bottom: 1rem;
-            line-height: 1.4;
-            font-size: 0.9rem;
-        }
-
-        .document-meta {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            font-size: 0.8rem;
-            color: var(--text-secondary);
-            margin-bottom: 1rem;
-        }
-
-        .document-actions {
-            display: flex;
-            gap: 8px;
-            justify-content: center;
-            padding-top: 1rem;
-            border-top: 1px solid var(--border);
-        }
-
-        .action-btn {
-            padding: 10px 16px;
-            border: none;
-            background: var(--bg-secondary);
-            border-radius: 8px;
-            cursor: pointer;
-            color: var(--text-secondary);
-            transition: var(--transition);
-            font-size: 0.9rem;
-            font-weight: 600;
-            display: flex;
-            align-items: center;
-            gap: 6px;
-            flex: 1;
-            justify-content: center;
-        }
-
-        .action-btn:hover {
-            background: var(--primary);
-            color: white;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(99, 102, 241, 0.3);
-        }
-
-        .action-btn.delete:hover {
-            background: var(--danger);
-            box-shadow: 0 4px 8px rgba(239, 68, 68, 0.3);
-        }
-
-        .action-btn.download:hover {
-            background: var(--secondary);
-            box-shadow: 0 4px 8px rgba(16, 185, 129, 0.3);
-        }
-
-        .action-btn.copy:hover {
-            background: var(--info);
-            box-shadow: 0 4px 8px rgba(59, 130, 246, 0.3);
-        }
-
-        /* File Type Icons */
-        .pdf-icon {
-            color: #ff4b4b;
-        }
-
-        .doc-icon {
-            color: #2b579a;
-        }
-
-        .xls-icon {
-            color: #217346;
-        }
-
-        .img-icon {
-            color: #ff6b6b;
-        }
-
-        .code-icon {
-            color: #6f42c1;
-        }
-
-        .drive-icon {
-            color: #4285f4;
-        }
-
-        /* Search and Filter */
-        .search-box {
-            margin-bottom: 1.5rem;
-            display: flex;
-            gap: 10px;
-            align-items: center;
-        }
-
-        .search-box input {
-            flex: 1;
-            padding: 14px 16px;
-            background: var(--bg-secondary);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            font-size: 16px;
-            color: var(--text-primary);
-            transition: var(--transition);
-        }
-
-        .search-box input:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.2);
-        }
-
-        /* Modals */
-        .modal {
-            display: none;
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0, 0, 0, 0.7);
-            z-index: 1000;
-            backdrop-filter: blur(5px);
-        }
-
-        .modal-content {
-            background: var(--bg-card);
-            margin: 50px auto;
-            padding: 2rem;
-            border-radius: var(--border-radius);
-            max-width: 500px;
-            position: relative;
-            box-shadow: var(--shadow-lg);
-            border: 1px solid var(--border);
-            animation: modalAppear 0.3s ease-out;
-        }
-
-        .close-btn {
-            position: absolute;
-            top: 15px;
-            right: 15px;
-            background: none;
-            border: none;
-            font-size: 1.5rem;
-            cursor: pointer;
-            color: var(--text-secondary);
-            transition: var(--transition);
-        }
-
-        .close-btn:hover {
-            color: var(--danger);
-            transform: rotate(90deg);
-        }
-
-        /* Toast */
-        .toast {
-            position: fixed;
-            top: 20px;
-            right: 20px;
-            padding: 1rem 1.5rem;
-            background: var(--bg-card);
-            border-radius: var(--border-radius);
-            box-shadow: var(--shadow-lg);
-            display: none;
-            z-index: 2000;
-            border-left: 4px solid var(--primary);
-            animation: slideInRight 0.3s ease-out;
-        }
-
-        .toast.success {
-            border-left-color: var(--secondary);
-        }
-
-        .toast.error {
-            border-left-color: var(--danger);
-        }
-
-        /* Theme Toggle */
-        .theme-toggle {
-            background: var(--bg-secondary);
-            border: 1px solid var(--border);
-            border-radius: 50px;
-            padding: 8px;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            transition: var(--transition);
-        }
-
-        .theme-toggle:hover {
-            background: var(--bg-card);
-        }
-
-        .theme-icon {
-            font-size: 1.2rem;
-            transition: var(--transition);
-        }
-
-        /* Animations */
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(20px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-            100% { transform: scale(1); }
-        }
-
-        @keyframes modalAppear {
-            from { opacity: 0; transform: scale(0.8) translateY(-20px); }
-            to { opacity: 1; transform: scale(1) translateY(0); }
-        }
-
-        @keyframes slideInRight {
-            from { opacity: 0; transform: translateX(100%); }
-            to { opacity: 1; transform: translateX(0); }
-        }
-
-        /* Utility Classes */
-        .hidden { display: none; }
-        .text-center { text-align: center; }
-        .mt-2 { margin-top: 1rem; }
-        .mb-2 { margin-bottom: 1rem; }
-
-        /* Responsive */
-        @media (max-width: 768px) {
-            .header-content {
-                padding: 0 1rem;
-            }
-            
-            .documents-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .stats {
-                grid-template-columns: 1fr;
-            }
-            
-            .charts-container {
-                grid-template-columns: 1fr;
-            }
-            
-            .search-box {
-                flex-direction: column;
-            }
-            
-            .document-actions {
-                flex-direction: column;
-            }
-            
-            .action-btn {
-                width: 100%;
-            }
-        }
-    </style>
-</head>
-<body>
-    <!-- Particles Background -->
-    <div id="particles-js"></div>
-
-    <!-- Header -->
-    <div class="header">
-        <div class="header-content">
-            <div class="logo">
-                <i class="fas fa-folder-open logo-icon"></i>
-                <h1>DocManager Pro</h1>
-            </div>
-            <div id="userInfo" class="hidden">
-                <span id="usernameDisplay"></span>
-                <button class="btn btn-secondary" onclick="logout()">
-                    <i class="fas fa-sign-out-alt"></i> Logout
-                </button>
-                <div class="theme-toggle" onclick="toggleTheme()">
-                    <i class="fas fa-moon theme-icon"></i>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <div class="container">
-        <!-- Auth Section -->
-        <div id="authSection">
-            <div class="auth-container">
-                <div class="text-center mb-2">
-                    <h2>Welcome to DocManager Pro</h2>
-                    <p>Enhanced document management with stunning visuals</p>
-                </div>
-                
-                <div class="nav">
-                    <button class="nav-btn active" onclick="showAuthForm('login')">
-                        <i class="fas fa-sign-in-alt"></i> Login
-                    </button>
-                    <button class="nav-btn" onclick="showAuthForm('signup')">
-                        <i class="fas fa-user-plus"></i> Sign Up
-                    </button>
-                </div>
-
-                <form id="loginForm" class="auth-form active" onsubmit="handleLogin(event)">
-                    <div class="form-group">
-                        <label><i class="fas fa-user"></i> Username</label>
-                        <input type="text" class="form-input" required>
-                    </div>
-                    <div class="form-group">
-                        <label><i class="fas fa-lock"></i> Password</label>
-                        <input type="password" class="form-input" required>
-                    </div>
-                    <button type="submit" class="btn btn-primary btn-block">
-                        <i class="fas fa-sign-in-alt"></i> Login
-                    </button>
-                </form>
-
-                <form id="signupForm" class="auth-form" onsubmit="handleSignup(event)">
-                    <div class="form-group">
-                        <label><i class="fas fa-user"></i> Username</label>
-                        <input type="text" class="form-input" required>
-                    </div>
-                    <div class="form-group">
-                        <label><i class="fas fa-envelope"></i> Email</label>
-                        <input type="email" class="form-input" required>
-                    </div>
-                    <div class="form-group">
-                        <label><i class="fas fa-lock"></i> Password</label>
-                        <input type="password" class="form-input" required>
-                    </div>
-                    <div class="form-group">
-                        <label><i class="fas fa-lock"></i> Confirm Password</label>
-                        <input type="password" class="form-input" required>
-                    </div>
-                    <div class="form-group">
-                        <label><i class="fas fa-briefcase"></i> Primary Use</label>
-                        <select class="form-input" required>
-                            <option value="">Select your primary use</option>
-                            <option value="education">Education</option>
-                            <option value="professional">Professional Work</option>
-                            <option value="personal">Personal</option>
-                            <option value="business">Business</option>
-                            <option value="research">Research</option>
-                            <option value="other">Other</option>
-                        </select>
-                    </div>
-                    <button type="submit" class="btn btn-primary btn-block">
-                        <i class="fas fa-user-plus"></i> Create Account
-                    </button>
-                </form>
-            </div>
-        </div>
-
-        <!-- Main App Section -->
-        <div id="appSection" class="hidden">
-            <div class="nav">
-                <button class="nav-btn active" onclick="showSection('dashboard')">
-                    <i class="fas fa-tachometer-alt"></i> Dashboard
-                </button>
-                <button class="nav-btn" onclick="showSection('documents')">
-                    <i class="fas fa-file"></i> Documents
-                </button>
-                <div class="theme-toggle" onclick="toggleTheme()">
-                    <i class="fas fa-moon theme-icon"></i>
-                </div>
-            </div>
-
-            <!-- Dashboard -->
-            <div id="dashboardSection">
-                <h2>Dashboard</h2>
-                <div class="stats">
-                    <div class="stat-card">
-                        <i class="fas fa-file-pdf pdf-icon file-icon"></i>
-                        <h3 id="totalDocs">0</h3>
-                        <p>Total Documents</p>
-                    </div>
-                    <div class="stat-card">
-                        <i class="fas fa-hdd file-icon"></i>
-                        <h3 id="totalStorage">0 B</h3>
-                        <p>Storage Used</p>
-                    </div>
-                    <div class="stat-card">
-                        <i class="fas fa-file-code code-icon file-icon"></i>
-                        <h3 id="fileTypes">0</h3>
-                        <p>File Types</p>
-                    </div>
-                </div>
-
-                <!-- Charts Section -->
-                <div class="charts-container">
-                    <div class="chart-card">
-                        <div class="chart-title">File Types Distribution</div>
-                        <div class="chart-wrapper">
-                            <canvas id="fileTypeChart"></canvas>
-                        </div>
-                    </div>
-                    <div class="chart-card">
-                        <div class="chart-title">Document Categories</div>
-                        <div class="chart-wrapper">
-                            <canvas id="categoryChart"></canvas>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="stats">
-                    <div class="stat-card">
-                        <h3>Quick Actions</h3>
-                        <button class="btn btn-primary mt-2" onclick="openAddModal()">
-                            <i class="fab fa-google-drive"></i> Add Google Doc
-                        </button>
-                        <button class="btn btn-success mt-2" onclick="openUploadModal()">
-                            <i class="fas fa-upload"></i> Upload File
-                        </button>
-                    </div>
-                    <div class="stat-card">
-                        <h3>Recent Activity</h3>
-                        <div id="recentActivity"></div>
-                    </div>
-                </div>
-            </div>
-
-            <!-- Documents -->
-            <div id="documentsSection" class="hidden">
-                <h2>My Documents</h2>
-                
-                <div class="search-box">
-                    <input type="text" id="searchInput" placeholder="Search documents..." onkeyup="filterDocuments()">
-                    <select id="typeFilter" onchange="filterDocuments()">
-                        <option value="">All Types</option>
-                        <option value="google_doc">Google Docs</option>
-                        <option value="file">Files</option>
-                    </select>
-                    <select id="categoryFilter" onchange="filterDocuments()">
-                        <option value="">All Categories</option>
-                        <option value="Education">Education</option>
-                        <option value="Professional">Professional</option>
-                        <option value="Personal">Personal</option>
-                        <option value="Business">Business</option>
-                        <option value="Research">Research</option>
-                        <option value="General">General</option>
-                    </select>
-                    <button class="btn btn-primary" onclick="loadDocuments()">
-                        <i class="fas fa-sync-alt"></i> Refresh
-                    </button>
-                </div>
-
-                <div id="documentsContainer" class="documents-grid">
-                    <!-- Documents will appear here -->
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Modals -->
-    <div id="addModal" class="modal">
-        <div class="modal-content">
-            <button class="close-btn" onclick="closeAddModal()">×</button>
-            <h3>Add Google Document</h3>
-            <form onsubmit="handleAddDocument(event)">
-                <div class="form-group">
-                    <label>Document Name</label>
-                    <input type="text" class="form-input" required>
-                </div>
-                <div class="form-group">
-                    <label>Google Doc Link</label>
-                    <input type="url" class="form-input" placeholder="https://docs.google.com/..." required>
-                </div>
-                <div class="form-group">
-                    <label>Category</label>
-                    <select class="form-input" required>
-                        <option value="General">General</option>
-                        <option value="Education">Education</option>
-                        <option value="Professional">Professional</option>
-                        <option value="Personal">Personal</option>
-                        <option value="Business">Business</option>
-                        <option value="Research">Research</option>
-                    </select>
-                </div>
-                <div class="form-group">
-                    <label>Description</label>
-                    <textarea class="form-input" rows="3"></textarea>
-                </div>
-                <button type="submit" class="btn btn-primary">
-                    <i class="fas fa-save"></i> Save Document
-                </button>
-            </form>
-        </div>
-    </div>
-
-    <div id="uploadModal" class="modal">
-        <div class="modal-content">
-            <button class="close-btn" onclick="closeUploadModal()">×</button>
-            <h3>Upload File</h3>
-            <form onsubmit="handleUploadFile(event)">
-                <div class="form-group">
-                    <label>Select File</label>
-                    <input type="file" class="form-input" required>
-                </div>
-                <div class="form-group">
-                    <label>Category</label>
-                    <select class="form-input" required>
-                        <option value="General">General</option>
-                        <option value="Education">Education</option>
-                        <option value="Professional">Professional</option>
-                        <option value="Personal">Personal</option>
-                        <option value="Business">Business</option>
-                        <option value="Research">Research</option>
-                    </select>
-                </div>
-                <div class="form-group">
-                    <label>Description</label>
-                    <textarea class="form-input" rows="3"></textarea>
-                </div>
-                <button type="submit" class="btn btn-primary">
-                    <i class="fas fa-upload"></i> Upload File
-                </button>
-            </form>
-        </div>
-    </div>
-
-    <!-- Toast -->
-    <div id="toast" class="toast"></div>
-
-    <script src="https://cdn.jsdelivr.net/particles.js/2.0.0/particles.min.js"></script>
-    <script>
-        // Initialize particles background
-        document.addEventListener('DOMContentLoaded', function() {
-            particlesJS('particles-js', {
-                particles: {
-                    number: { value: 80, density: { enable: true, value_area: 800 } },
-                    color: { value: "#6366f1" },
-                    shape: { type: "circle" },
-                    opacity: { value: 0.5, random: true },
-                    size: { value: 3, random: true },
-                    line_linked: {
-                        enable: true,
-                        distance: 150,
-                        color: "#6366f1",
-                        opacity: 0.4,
-                        width: 1
-                    },
-                    move: {
-                        enable: true,
-                        speed: 2,
-                        direction: "none",
-                        random: true,
-                        straight: false,
-                        out_mode: "out",
-                        bounce: false
-                    }
-                },
-                interactivity: {
-                    detect_on: "canvas",
-                    events: {
-                        onhover: { enable: true, mode: "repulse" },
-                        onclick: { enable: true, mode: "push" },
-                        resize: true
-                    }
-                },
-                retina_detect: true
-            });
-        });
-
-        let documents = [];
-        let currentUser = null;
-        let isDarkTheme = true;
-        let fileTypeChart = null;
-        let categoryChart = null;
-
-        // Theme Toggle
-        function toggleTheme() {
-            isDarkTheme = !isDarkTheme;
-            document.body.classList.toggle('light-theme');
-            
-            const themeIcon = document.querySelector('.theme-icon');
-            if (isDarkTheme) {
-                themeIcon.className = 'fas fa-moon theme-icon';
-            } else {
-                themeIcon.className = 'fas fa-sun theme-icon';
-            }
-            
-            // Save theme preference
-            localStorage.setItem('docmanager-theme', isDarkTheme ? 'dark' : 'light');
-            
-            // Update charts if they exist
-            updateChartThemes();
-        }
-
-        function updateChartThemes() {
-            const isDark = document.body.classList.contains('light-theme') ? false : true;
-            const textColor = isDark ? '#f8fafc' : '#1e293b';
-            const gridColor = isDark ? 'rgba(255,255,255,0.1)' : 'rgba(0,0,0,0.1)';
-            
-            if (fileTypeChart) {
-                fileTypeChart.options.plugins.legend.labels.color = textColor;
-                fileTypeChart.update();
-            }
-            if (categoryChart) {
-                categoryChart.options.plugins.legend.labels.color = textColor;
-                categoryChart.update();
-            }
-        }
-
-        // Load saved theme
-        const savedTheme = localStorage.getItem('docmanager-theme');
-        if (savedTheme === 'light') {
-            toggleTheme(); // Switch to light theme if saved
-        }
-
-        // Auth Functions
-        function showAuthForm(formType) {
-            document.querySelectorAll('.auth-form').forEach(form => form.classList.remove('active'));
-            document.querySelectorAll('.nav-btn').forEach(btn => btn.classList.remove('active'));
-            
-            document.getElementById(formType + 'Form').classList.add('active');
-            event.target.classList.add('active');
-        }
-
-        async function handleLogin(e) {
-            e.preventDefault();
-            const form = e.target;
-            const formData = {
-                username: form[0].value,
-                password: form[1].value
-            };
-
-            try {
-                const response = await fetch('/api/login', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(formData)
-                });
-                const data = await response.json();
-                
-                if (data.success) {
-                    showToast('Login successful!', 'success');
-                    currentUser = data.user;
-                    showApp();
-                    
-                    // Celebration effect
-                    createConfetti();
-                } else {
-                    showToast(data.message, 'error');
-                }
-            } catch (error) {
-                showToast('Login failed', 'error');
-            }
-        }
-
-        async function handleSignup(e) {
-            e.preventDefault();
-            const form = e.target;
-            const formData = {
-                username: form[0].value,
-                email: form[1].value,
-                password: form[2].value,
-                confirm_password: form[3].value,
-                primary_use: form[4].value
-            };
-
-            try {
-                const response = await fetch('/api/signup', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(formData)
-                });
-                const data = await response.json();
-                
-                if (data.success) {
-                    showToast('Account created successfully!', 'success');
-                    currentUser = data.user;
-                    showApp();
-                    
-                    // Celebration effect
-                    createConfetti();
-                } else {
-                    showToast(data.message, 'error');
-                }
-            } catch (error) {
-                showToast('Signup failed', 'error');
-            }
-        }
-
-        function showApp() {
-            document.getElementById('authSection').classList.add('hidden');
-            document.getElementById('appSection').classList.remove('hidden');
-            document.getElementById('userInfo').classList.remove('hidden');
-            document.getElementById('usernameDisplay').textContent = currentUser.username;
-            
-            loadDashboard();
-            loadDocuments();
-        }
-
-        async function logout() {
-            try {
-                await fetch('/api/logout');
-                currentUser = null;
-                document.getElementById('appSection').classList.add('hidden');
-                document.getElementById('authSection').classList.remove('hidden');
-                document.getElementById('userInfo').classList.add('hidden');
-                showToast('Logged out', 'success');
-            } catch (error) {
-                showToast('Logout failed', 'error');
-            }
-        }
-
-        // Chart Functions
-        function createCharts(stats) {
-            const isDark = !document.body.classList.contains('light-theme');
-            const textColor = isDark ? '#f8fafc' : '#1e293b';
-            const gridColor = isDark ? 'rgba(255,255,255,0.1)' : 'rgba(0,0,0,0.1)';
-
-            // File Type Chart
-            const fileTypeCtx = document.getElementById('fileTypeChart').getContext('2d');
-            if (fileTypeChart) {
-                fileTypeChart.destroy();
-            }
-            
-            fileTypeChart = new Chart(fileTypeCtx, {
-                type: 'doughnut',
-                data: {
-                    labels: Object.keys(stats.file_types),
-                    datasets: [{
-                        data: Object.values(stats.file_types),
-                        backgroundColor: [
-                            '#6366f1', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4',
-                            '#84cc16', '#f97316', '#ec4899', '#14b8a6'
-                        ],
-                        borderWidth: 2,
-                        borderColor: isDark ? '#1e293b' : '#ffffff'
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {
-                        legend: {
-                            position: 'bottom',
-                            labels: {
-                                color: textColor,
-                                font: {
-                                    size: 12
-                                }
-                            }
-                        },
-                        tooltip: {
-                            callbacks: {
-                                label: function(context) {
-                                    const label = context.label || '';
-                                    const value = context.raw || 0;
-                                    const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                    const percentage = Math.round((value / total) * 100);
-                                    return `${label}: ${value} (${percentage}%)`;
-                                }
-                            }
-                        }
-                    }
-                }
-            });
-
-            // Category Chart
-            const categoryCtx = document.getElementById('categoryChart').getContext('2d');
-            if (categoryChart) {
-                categoryChart.destroy();
-            }
-            
-            categoryChart = new Chart(categoryCtx, {
-                type: 'pie',
-                data: {
-                    labels: Object.keys(stats.categories),
-                    datasets: [{
-                        data: Object.values(stats.categories),
-                        backgroundColor: [
-                            '#6366f1', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4',
-                            '#84cc16', '#f97316', '#ec4899', '#14b8a6'
-                        ],
-                        borderWidth: 2,
-                        borderColor: isDark ? '#1e293b' : '#ffffff'
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {
-                        legend: {
-                            position: 'bottom',
-                            labels: {
-                                color: textColor,
-                                font: {
-                                    size: 12
-                                }
-                            }
-                        },
-                        tooltip: {
-                            callbacks: {
-                                label: function(context) {
-                                    const label = context.label || '';
-                                    const value = context.raw || 0;
-                                    const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                    const percentage = Math.round((value / total) * 100);
-                                    return `${label}: ${value} (${percentage}%)`;
-                                }
-                            }
-                        }
-                    }
-                }
-            });
-        }
-
-        // Document Functions
-        async function loadDashboard() {
-            try {
-                const response = await fetch('/api/stats');
-                const data = await response.json();
-                
-                if (data.success) {
-                    document.getElementById('totalDocs').textContent = data.stats.total_documents;
-                    document.getElementById('totalStorage').textContent = data.stats.storage_formatted;
-                    document.getElementById('fileTypes').textContent = Object.keys(data.stats.file_types).length;
-                    
-                    let recentHtml = '';
-                    data.stats.recent_documents.forEach(doc => {
-                        recentHtml += `<div style="padding: 5px 0; border-bottom: 1px solid var(--border);">
-                            <strong>${doc.name}</strong> - ${doc.category}
-                        </div>`;
-                    });
-                    document.getElementById('recentActivity').innerHTML = recentHtml || 'No recent activity';
-                    
-                    // Create charts
-                    createCharts(data.stats);
-                }
-            } catch (error) {
-                console.error('Failed to load dashboard:', error);
-            }
-        }
-
-        async function loadDocuments() {
-            try {
-                const response = await fetch('/api/documents');
-                const data = await response.json();
-                
-                if (data.success) {
-                    documents = data.documents;
-                    displayDocuments(documents);
-                }
-            } catch (error) {
-                showToast('Failed to load documents', 'error');
-            }
-        }
-
-        function displayDocuments(docs) {
-            const container = document.getElementById('documentsContainer');
-            
-            if (docs.length === 0) {
-                container.innerHTML = '<div class="text-center">No documents found</div>';
-                return;
-            }
-
-            container.innerHTML = docs.map(doc => {
-                let fileIcon = 'fas fa-file';
-                let iconClass = '';
-                
-                if (doc.google_doc_link) {
-                    fileIcon = 'fab fa-google-drive';
-                    iconClass = 'drive-icon';
-                } else if (doc.file_path) {
-                    const ext = doc.file_path.split('.').pop().toLowerCase();
-                    if (['pdf'].includes(ext)) {
-                        fileIcon = 'fas fa-file-pdf';
-                        iconClass = 'pdf-icon';
-                    } else if (['doc', 'docx'].includes(ext)) {
-                        fileIcon = 'fas fa-file-word';
-                        iconClass = 'doc-icon';
-                    } else if (['xls', 'xlsx'].includes(ext)) {
-                        fileIcon = 'fas fa-file-excel';
-                        iconClass = 'xls-icon';
-                    } else if (['jpg', 'jpeg', 'png', 'gif'].includes(ext)) {
-                        fileIcon = 'fas fa-file-image';
-                        iconClass = 'img-icon';
-                    } else if (['js', 'html', 'css', 'py', 'java', 'cpp'].includes(ext)) {
-                        fileIcon = 'fas fa-file-code';
-                        iconClass = 'code-icon';
-                    }
-                }
-                
-                return `
-                    <div class="document-card">
-                        <div class="document-header">
-                            <div>
-                                <div class="document-title">${escapeHtml(doc.name)}</div>
-                                <span class="document-category">${doc.category}</span>
-                            </div>
-                        </div>
-                        
-                        <div class="file-icon-container">
-                            <i class="${fileIcon} ${iconClass} file-icon"></i>
-                        </div>
-                        
-                        <div class="document-content">
-                            ${doc.description ? `<div class="document-description">${escapeHtml(doc.description)}</div>` : ''}
-                            
-                            <div class="document-meta">
-                                ${doc.file_size ? `<span><i class="fas fa-weight-hanging"></i> ${doc.file_size_formatted}</span>` : ''}
-                                <span><i class="fas fa-calendar"></i> ${new Date(doc.created_at).toLocaleDateString()}</span>
-                            </div>
-                        </div>
-                        
-                        <div class="document-actions">
-                            ${doc.google_doc_link ? `
-                                <button class="action-btn copy" onclick="copyLink('${doc.google_doc_link}')">
-                                    <i class="fas fa-copy"></i> Copy
-                                </button>
-                                <button class="action-btn" onclick="openLink('${doc.google_doc_link}')">
-                                    <i class="fas fa-external-link-alt"></i> Open
-                                </button>
-                            ` : ''}
-                            ${doc.file_path ? `
-                                <button class="action-btn download" onclick="downloadFile(${doc.id})">
-                                    <i class="fas fa-download"></i> Download
-                                </button>
-                            ` : ''}
-                            <button class="action-btn delete" onclick="deleteDocument(${doc.id})">
-                                <i class="fas fa-trash"></i> Delete
-                            </button>
-                        </div>
-                    </div>
-                `;
-            }).join('');
-        }
-
-        function filterDocuments() {
-            const searchTerm = document.getElementById('searchInput').value.toLowerCase();
-            const typeFilter = document.getElementById('typeFilter').value;
-            const categoryFilter = document.getElementById('categoryFilter').value;
-            
-            let filtered = documents;
-            
-            if (searchTerm) {
-                filtered = filtered.filter(doc => 
-                    doc.name.toLowerCase().includes(searchTerm) ||
-                    (doc.description && doc.description.toLowerCase().includes(searchTerm))
-                );
-            }
-            
-            if (typeFilter) {
-                if (typeFilter === 'google_doc') {
-                    filtered = filtered.filter(doc => doc.google_doc_link);
-                } else if (typeFilter === 'file') {
-                    filtered = filtered.filter(doc => doc.file_path);
-                }
-            }
-            
-            if (categoryFilter) {
-                filtered = filtered.filter(doc => doc.category === categoryFilter);
-            }
-            
-            displayDocuments(filtered);
-        }
+def serialize_document(doc):
+    return {
+        'id': doc.id,
+        'name': doc.name,
+        'google_doc_link': doc.google_doc_link,
+        'file_path': doc.file_path,
+        'file_type': doc.file_type,
+        'file_size': doc.file_size,
+        'file_size_formatted': format_file_size(doc.file_size) if doc.file_size else '',
+        'category': doc.category,
+        'tags': doc.tags or '',
+        'processing_status': doc.processing_status,
+        # The content behind a document never changes, so neither does its preview
+        'preview_url': f'/api/documents/{doc.id}/preview?v={doc.content_hash[:12]}'
+            if doc.content_hash and can_preview(doc.file_type) else None,
+        'description': doc.description,
+        'created_at': doc.created_at.isoformat()
+    }
+
+# Just the columns serialize_document() reads. Listings select these as plain
+# rows instead of loading Document objects, which skips the identity map and
+# attribute instrumentation, and the columns nobody reads
+DOCUMENT_LIST_COLUMNS = (
+    Document.id, Document.name, Document.google_doc_link, Document.file_path, Document.file_type,
+    Document.file_size, Document.category, Document.tags, Document.processing_status,
+    Document.content_hash, Document.description, Document.created_at,
+)
+
+# Document listing - keyset pagination
+DOCUMENTS_PAGE_SIZE = 50
+SEARCH_PAGE_SIZE = 20
+DOCUMENTS_MAX_PAGE_SIZE = 200
+DOCUMENTS_STREAM_BATCH = 100  # rows fetched from the cursor at a time
+
+# Sort keys accepted by /api/documents. Nullable columns are coalesced so the
+# keyset comparison never has to deal with NULLs.
+DOCUMENT_SORT_KEYS = {
+    'created_at': Document.created_at,
+    'name': Document.name,
+    'file_size': db.func.coalesce(Document.file_size, 0),
+    'category': db.func.coalesce(Document.category, ''),
+}
+
+def encode_cursor(sort_key, doc):
+    """Opaque cursor pointing just past `doc` in the current sort order"""
+    if sort_key == 'created_at':
+        value = doc.created_at.isoformat()
+    elif sort_key == 'file_size':
+        value = doc.file_size or 0
+    elif sort_key == 'category':
+        value = doc.category or ''
+    else:
+        value = getattr(doc, sort_key)
+    raw = json.dumps([sort_key, value, doc.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(sort_key, cursor):
+    """Return (sort value, id) from a cursor, or None if it is malformed"""
+    try:
+        cursor_key, value, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_key != sort_key or not isinstance(doc_id, int):
+            return None
+        if sort_key == 'created_at':
+            value = datetime.fromisoformat(value)
+        return value, doc_id
+    except (ValueError, TypeError):
+        return None
+
+# Delta sync
+CHANGES_PAGE_SIZE = 500
+
+def current_change_seq(user_id):
+    return db.session.query(db.func.coalesce(db.func.max(DocumentChange.seq), 0)).filter(
+        DocumentChange.user_id == user_id
+    ).scalar()
+
+def encode_sync_token(seq):
+    """Opaque token for "seen every change up to seq", stamped with when it was issued"""
+    raw = json.dumps([seq, int(datetime.utcnow().timestamp())]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_sync_token(token):
+    """Return the seq in a sync token, or None if it is malformed or too old to trust
+
+    Tombstones are only kept for CHANGE_LOG_RETENTION, so a token issued
+    before that may have missed deletions and the client has to reload.
+    """
+    try:
+        seq, issued_at = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if not isinstance(seq, int) or not isinstance(issued_at, int):
+            return None
+    except (ValueError, TypeError):
+        return None
+    if issued_at < datetime.utcnow().timestamp() - current_app.config['CHANGE_LOG_RETENTION']:
+        return None
+    return seq
+
+def filter_documents(query, search='', doc_type='', category=''):
+    """Apply the documents page search/type/category filters in SQL"""
+    if search:
+        query = query.filter(db.or_(
+            Document.name.icontains(search, autoescape=True),
+            Document.description.icontains(search, autoescape=True)
+        ))
+    # `!= ''` is false for NULL too, so this matches the old truthiness checks
+    if doc_type == 'google_doc':
+        query = query.filter(Document.google_doc_link != '')
+    elif doc_type == 'file':
+        query = query.filter(Document.file_path != '')
+    if category:
+        query = query.filter(Document.category == category)
+    return query
+
+# JSON responses are compressed for clients that accept it (see streaming.py)
+@bp.after_app_request
+def compress_api_response(response):
+    return compress_response(response, request.accept_encodings, current_app.config['COMPRESS_MIN_SIZE'])
 
-        // Modal Functions
-        function openAddModal() {
-            document.getElementById('addModal').style.display = 'block';
-        }
-
-        function closeAddModal() {
-            document.getElementById('addModal').style.display = 'none';
-        }
-
-        function openUploadModal() {
-            document.getElementById('uploadModal').style.display = 'block';
-        }
-
-        function closeUploadModal() {
-            document.getElementById('uploadModal').style.display = 'none';
-        }
-
-        async function handleAddDocument(e) {
-            e.preventDefault();
-            const form = e.target;
-            const formData = {
-                name: form[0].value,
-                link: form[1].value,
-                category: form[2].value,
-                description: form[3].value
-            };
-
-            try {
-                const response = await fetch('/api/documents', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(formData)
-                });
-                const data = await response.json();
-                
-                if (data.success) {
-                    showToast('Document added!', 'success');
-                    closeAddModal();
-                    form.reset();
-                    loadDocuments();
-                    loadDashboard();
-                    
-                    // Celebration effect for 100th document
-                    if (documents.length + 1 === 100) {
-                        createFireworks();
-                        showToast('🎉 100th Document! You\\'re a Storage Champion!', 'success');
-                    }
-                } else {
-                    showToast(data.message, 'error');
-                }
-            } catch (error) {
-                showToast('Failed to add document', 'error');
-            }
-        }
-
-        async function handleUploadFile(e) {
-            e.preventDefault();
-            const form = e.target;
-            const fileInput = form[0];
-            const file = fileInput.files[0];
-            
-            if (!file) {
-                showToast('Please select a file', 'error');
-                return;
-            }
-
-            const formData = new FormData();
-            formData.append('file', file);
-            formData.append('category', form[1].value);
-            formData.append('description', form[2].value);
-
-            try {
-                const response = await fetch('/api/upload', {
-                    method: 'POST',
-                    body: formData
-                });
-                const data = await response.json();
-                
-                if (data.success) {
-                    showToast('File uploaded!', 'success');
-                    closeUploadModal();
-                    form.reset();
-                    loadDocuments();
-                    loadDashboard();
-                    
-                    // Celebration effect for large files
-                    if (file.size > 10 * 1024 * 1024) { // 10MB
-                        createRocketAnimation();
-                    }
-                } else {
-                    showToast(data.message, 'error');
-                }
-            } catch (error) {
-                showToast('Upload failed', 'error');
-            }
-        }
-
-        async function deleteDocument(id) {
-            if (!confirm('Are you sure you want to delete this document?')) return;
-            
-            try {
-                const response = await fetch(`/api/documents/${id}`, {
-                    method: 'DELETE'
-                });
-                const data = await response.json();
-                
-                if (data.success) {
-                    showToast('Document deleted', 'success');
-                    loadDocuments();
-                    loadDashboard();
-                } else {
-                    showToast(data.message, 'error');
-                }
-            } catch (error) {
-                showToast('Delete failed', 'error');
-            }
-        }
-
-        async function downloadFile(id) {
-            try {
-                window.open(`/api/documents/${id}/download`, '_blank');
-            } catch (error) {
-                showToast('Download failed', 'error');
-            }
-        }
-
-        function openLink(url) {
-            window.open(url, '_blank');
-        }
-
-        async function copyLink(url) {
-            try {
-                await navigator.clipboard.writeText(url);
-                showToast('Link copied to clipboard!', 'success');
-            } catch (error) {
-                showToast('Failed to copy link', 'error');
-            }
-        }
-
-        function showSection(section) {
-            document.querySelectorAll('.nav-btn').forEach(btn => btn.classList.remove('active'));
-            event.target.classList.add('active');
-            
-            document.getElementById('dashboardSection').classList.add('hidden');
-            document.getElementById('documentsSection').classList.add('hidden');
-            document.getElementById(section + 'Section').classList.remove('hidden');
-        }
-
-        // Animation Functions
-        function createConfetti() {
-            const confettiCount = 200;
-            const confettiContainer = document.createElement('div');
-            confettiContainer.style.position = 'fixed';
-            confettiContainer.style.top = '0';
-            confettiContainer.style.left = '0';
-            confettiContainer.style.width = '100%';
-            confettiContainer.style.height = '100%';
-            confettiContainer.style.pointerEvents = 'none';
-            confettiContainer.style.zIndex = '9999';
-            document.body.appendChild(confettiContainer);
-            
-            for (let i = 0; i < confettiCount; i++) {
-                const confetti = document.createElement('div');
-                confetti.style.position = 'absolute';
-                confetti.style.width = '10px';
-                confetti.style.height = '10px';
-                confetti.style.backgroundColor = getRandomColor();
-                confetti.style.borderRadius = '50%';
-                confetti.style.left = Math.random() * 100 + 'vw';
-                confetti.style.top = '-10px';
-                confetti.style.opacity = '0.8';
-                confettiContainer.appendChild(confetti);
-                
-                // Animate confetti
-                const animation = confetti.animate([
-                    { transform: 'translateY(0) rotate(0deg)', opacity: 1 },
-                    { transform: `translateY(${window.innerHeight}px) rotate(${360 + Math.random() * 360}deg)`, opacity: 0 }
-                ], {
-                    duration: 2000 + Math.random() * 3000,
-                    easing: 'cubic-bezier(0.1, 0.8, 0.2, 1)'
-                });
-                
-                animation.onfinish = () => {
-                    confetti.remove();
-                    if (confettiContainer.children.length === 0) {
-                        confettiContainer.remove();
-                    }
-                };
-            }
-        }
-        
-        function createFireworks() {
-            const fireworkCount = 5;
-            for (let i = 0; i < fireworkCount; i++) {
-                setTimeout(() => {
-                    createFirework();
-                }, i * 300);
-            }
-        }
-        
-        function createFirework() {
-            const firework = document.createElement('div');
-            firework.style.position = 'fixed';
-            firework.style.left = Math.random() * 80 + 10 + 'vw';
-            firework.style.top = Math.random() * 80 + 10 + 'vh';
-            firework.style.width = '6px';
-            firework.style.height = '6px';
-            firework.style.backgroundColor = getRandomColor();
-            firework.style.borderRadius = '50%';
-            firework.style.boxShadow = '0 0 10px ' + getRandomColor();
-            firework.style.zIndex = '9999';
-            document.body.appendChild(firework);
-            
-            // Explode firework
-            const particles = 30;
-            for (let i = 0; i < particles; i++) {
-                setTimeout(() => {
-                    const particle = document.createElement('div');
-                    particle.style.position = 'fixed';
-                    particle.style.left = firework.style.left;
-                    particle.style.top = firework.style.top;
-                    particle.style.width = '4px';
-                    particle.style.height = '4px';
-                    particle.style.backgroundColor = getRandomColor();
-                    particle.style.borderRadius = '50%';
-                    particle.style.zIndex = '9999';
-                    document.body.appendChild(particle);
-                    
-                    const angle = (i / particles) * Math.PI * 2;
-                    const distance = 50 + Math.random() * 100;
-                    const x = Math.cos(angle) * distance;
-                    const y = Math.sin(angle) * distance;
-                    
-                    particle.animate([
-                        { transform: 'translate(0, 0) scale(1)', opacity: 1 },
-                        { transform: `translate(${x}px, ${y}px) scale(0)`, opacity: 0 }
-                    ], {
-                        duration: 1000 + Math.random() * 500,
-                        easing: 'cubic-bezier(0.1, 0.8, 0.2, 1)'
-                    }).onfinish = () => particle.remove();
-                }, i * 30);
-            }
-            
-            firework.animate([
-                { transform: 'scale(1)', opacity: 1 },
-                { transform: 'scale(0)', opacity: 0 }
-            ], {
-                duration: 500,
-                easing: 'ease-out'
-            }).onfinish = () => firework.remove();
-        }
-        
-        function createRocketAnimation() {
-            const rocket = document.createElement('div');
-            rocket.innerHTML = '🚀';
-            rocket.style.position = 'fixed';
-            rocket.style.left = '50%';
-            rocket.style.bottom = '20px';
-            rocket.style.fontSize = '40px';
-            rocket.style.zIndex = '9999';
-            rocket.style.transform = 'translateX(-50%)';
-            document.body.appendChild(rocket);
-            
-            rocket.animate([
-                { transform: 'translateX(-50%) translateY(0)', opacity: 1 },
-                { transform: 'translateX(-50%) translateY(-100vh)', opacity: 0 }
-            ], {
-                duration: 2000,
-                easing: 'cubic-bezier(0.1, 0.8, 0.2, 1)'
-            }).onfinish = () => rocket.remove();
-        }
-        
-        function getRandomColor() {
-            const colors = ['#6366f1', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4'];
-            return colors[Math.floor(Math.random() * colors.length)];
-        }
-
-        // Utility Functions
-        function showToast(message, type) {
-            const toast = document.getElementById('toast');
-            toast.textContent = message;
-            toast.className = `toast ${type}`;
-            toast.style.display = 'block';
-            
-            setTimeout(() => {
-                toast.style.display = 'none';
-            }, 3000);
-        }
+# Main HTML Page - Enhanced with Charts
+# The page is a small shell; its CSS and JS are fingerprinted static assets
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
 
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
+@bp.app_context_processor
+def inject_asset_url():
+    return {'asset_url': asset_url}
 
-        // Check if user is already logged in
-        async function checkAuth() {
-            try {
-                const response = await fetch('/api/me');
-                const data = await response.json();
-                if (data.success) {
-                    currentUser = data.user;
-                    showApp();
-                }
-            } catch (error) {
-                // Not logged in
-            }
-        }
+def asset_url(name):
+    return url_for('docmanager.asset', filename=current_app.extensions['assets'][name])
 
-        // Initialize
-        checkAuth();
-    </script>
-</body>
-</html>
-    '''
+@bp.route('/')
+def index():
+    response = make_response(render_template('index.html'))
+    # Asset URLs change with every deploy, so the shell is always revalidated
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
+@bp.route('/assets/<path:filename>')
+def asset(filename):
+    """A built asset, precompressed with whatever encoding the client takes best"""
+    build_folder = current_app.config['ASSET_BUILD_FOLDER']
+    variant, encoding = negotiate_encoding(build_folder, filename, request.accept_encodings)
+    response = send_from_directory(
+        build_folder,
+        variant,
+        mimetype=mimetypes.guess_type(filename)[0],
+        max_age=ASSET_MAX_AGE
+    )
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response
 
 # API Routes (same as before)
-@app.route('/api/login', methods=['POST'])
+@bp.route('/api/login', methods=['POST'])
 def api_login():
     data = request.get_json()
     user = User.query.filter_by(username=data['username']).first()
@@ -1829,7 +529,7 @@ def api_login():
         })
     return jsonify({'success': False, 'message': 'Invalid credentials!'})
 
-@app.route('/api/signup', methods=['POST'])
+@bp.route('/api/signup', methods=['POST'])
 def api_signup():
     data = request.get_json()
     
@@ -1847,9 +547,6 @@ def api_signup():
     db.session.add(user)
     db.session.commit()
     
-    # ✅ CREATE USER FOLDER IMMEDIATELY AFTER SIGNUP
-    create_user_folder(user.id)
-    
     # ✅ AUTO-LOGIN AFTER SIGNUP
     session['user_id'] = user.id
     
@@ -1859,12 +556,12 @@ def api_signup():
         'user': {'id': user.id, 'username': user.username}
     })
 
-@app.route('/api/logout')
+@bp.route('/api/logout')
 def api_logout():
     session.clear()
     return jsonify({'success': True, 'message': 'Logged out!'})
 
-@app.route('/api/me')
+@bp.route('/api/me')
 def api_me():
     if 'user_id' in session:
         user = User.query.get(session['user_id'])
@@ -1874,71 +571,197 @@ def api_me():
         })
     return jsonify({'success': False})
 
-@app.route('/api/stats')
+@bp.route('/api/stats')
 @login_required
 def api_stats():
     user_id = session['user_id']
-    total_docs = Document.query.filter_by(user_id=user_id).count()
-    
-    # File types statistics
-    file_types = db.session.query(
-        Document.file_type, 
-        db.func.count(Document.id)
-    ).filter_by(user_id=user_id).group_by(Document.file_type).all()
+    total_docs = 0
+    total_storage = 0
+    file_types = {}
+    categories = {}
     
-    # Categories statistics
-    categories = db.session.query(
-        Document.category, 
-        db.func.count(Document.id)
-    ).filter_by(user_id=user_id).group_by(Document.category).all()
-    
-    total_storage = db.session.query(db.func.sum(Document.file_size)).filter_by(user_id=user_id).scalar() or 0
+    # Counters are maintained incrementally, so this is a handful of rows however many documents there are
+    stats = db.session.execute(
+        db.select(UserStat.kind, UserStat.value, UserStat.count, UserStat.bytes).where(UserStat.user_id == user_id)
+    )
+    for stat in stats:
+        if stat.kind == 'total':
+            total_docs, total_storage = stat.count, stat.bytes
+        elif stat.kind == 'file_type':
+            file_types[stat.value] = stat.count
+        elif stat.kind == 'category':
+            categories[stat.value] = stat.count
     
-    recent_docs = Document.query.filter_by(user_id=user_id).order_by(Document.created_at.desc()).limit(5).all()
+    recent_docs = db.session.execute(
+        db.select(Document.name, Document.category).where(Document.user_id == user_id)
+        .order_by(Document.created_at.desc()).limit(5)
+    )
     
     return jsonify({
         'success': True,
         'stats': {
             'total_documents': total_docs,
-            'file_types': dict(file_types),
-            'categories': dict(categories),
+            'file_types': file_types,
+            'categories': categories,
             'total_storage': total_storage,
             'storage_formatted': format_file_size(total_storage),
             'recent_documents': [{'name': doc.name, 'category': doc.category} for doc in recent_docs]
         }
     })
 
-@app.route('/api/documents')
+@bp.route('/api/documents')
 @login_required
 def api_documents():
     user_id = session['user_id']
-    documents = Document.query.filter_by(user_id=user_id).order_by(Document.created_at.desc()).all()
-    
-    docs_list = []
-    for doc in documents:
-        docs_list.append({
-            'id': doc.id,
-            'name': doc.name,
-            'google_doc_link': doc.google_doc_link,
-            'file_path': doc.file_path,
-            'file_type': doc.file_type,
-            'file_size': doc.file_size,
-            'file_size_formatted': format_file_size(doc.file_size) if doc.file_size else '',
-            'category': doc.category,
-            'description': doc.description,
-            'created_at': doc.created_at.isoformat()
-        })
+    sort_key = request.args.get('sort', 'created_at')
+    order = request.args.get('order', 'desc')
+    if sort_key not in DOCUMENT_SORT_KEYS or order not in ('asc', 'desc'):
+        return jsonify({'success': False, 'message': 'Invalid sort!'}), 400
+    
+    # limit=all returns every match in one streamed response, for clients
+    # that keep the whole list (it is never held in memory here)
+    limit = None
+    if request.args.get('limit') != 'all':
+        limit = request.args.get('limit', DOCUMENTS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, DOCUMENTS_MAX_PAGE_SIZE))
+    
+    query = filter_documents(
+        db.select(*DOCUMENT_LIST_COLUMNS).where(Document.user_id == user_id),
+        search=request.args.get('q', '').strip(),
+        doc_type=request.args.get('type', ''),
+        category=request.args.get('category', '')
+    )
+    
+    # Keyset pagination: (sort column, id) is unique, so each page continues
+    # strictly after the last row of the previous one
+    sort_column = DOCUMENT_SORT_KEYS[sort_key]
+    cursor = request.args.get('cursor')
+    sync_token = None
+    if not cursor:
+        # Read before the page, so a change racing with it is repeated in
+        # the next delta rather than missed
+        sync_token = encode_sync_token(current_change_seq(user_id))
+    else:
+        position = decode_cursor(sort_key, cursor)
+        if position is None:
+            return jsonify({'success': False, 'message': 'Invalid cursor!'}), 400
+        row = db.tuple_(sort_column, Document.id)
+        after = db.tuple_(*position)
+        query = query.filter(row < after if order == 'desc' else row > after)
+    
+    if order == 'desc':
+        query = query.order_by(sort_column.desc(), Document.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Document.id.asc())
+    
+    if limit is not None:
+        # Fetch one extra row to learn whether another page exists
+        query = query.limit(limit + 1)
+    page = {'next_cursor': None}
+    
+    def rows():
+        last = None
+        results = db.session.execute(query.execution_options(yield_per=DOCUMENTS_STREAM_BATCH))
+        for number, doc in enumerate(results):
+            if number == limit:
+                page['next_cursor'] = encode_cursor(sort_key, last)
+                break
+            last = doc
+            yield serialize_document(doc)
+    
+    # Serialized as the rows come off the cursor, so the page is never built up in memory
+    body = stream_json({'success': True, 'sync_token': sync_token}, 'documents', rows(), lambda: page)
+    return current_app.response_class(stream_with_context(body), mimetype='application/json')
+
+@bp.route('/api/documents/changes')
+@login_required
+def api_document_changes():
+    """Documents added, changed or deleted since a sync token
+
+    Without a usable token the response has reset=True and a fresh token, and
+    the client should reload its list. Changes come oldest first, at most
+    CHANGES_PAGE_SIZE per call; keep calling with the new token while has_more.
+    """
+    user_id = session['user_id']
+    since = decode_sync_token(request.args.get('since', ''))
+    if since is None:
+        return jsonify({'success': True, 'reset': True, 'token': encode_sync_token(current_change_seq(user_id))})
+    
+    rows = db.session.execute(
+        db.select(DocumentChange.seq, DocumentChange.document_id, DocumentChange.deleted, *DOCUMENT_LIST_COLUMNS)
+        .outerjoin(Document, db.and_(Document.id == DocumentChange.document_id, Document.user_id == user_id))
+        .where(DocumentChange.user_id == user_id, DocumentChange.seq > since)
+        .order_by(DocumentChange.seq).limit(CHANGES_PAGE_SIZE + 1)
+    ).all()
+    has_more = len(rows) > CHANGES_PAGE_SIZE
+    rows = rows[:CHANGES_PAGE_SIZE]
     
-    return jsonify({'success': True, 'documents': docs_list})
+    changed = []
+    deleted = []
+    for row in rows:
+        if row.deleted or row.id is None:
+            deleted.append(row.document_id)
+        else:
+            changed.append(serialize_document(row))
+    
+    return jsonify({
+        'success': True,
+        'reset': False,
+        'documents': changed,
+        'deleted': deleted,
+        'token': encode_sync_token(rows[-1].seq if rows else since),
+        'has_more': has_more
+    })
 
-@app.route('/api/documents', methods=['POST'])
+@bp.route('/api/search')
+@login_required
+def api_search():
+    user_id = session['user_id']
+    match = build_match_query(user_id, request.args.get('q', ''))
+    limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, DOCUMENTS_MAX_PAGE_SIZE))
+    # Results are ordered by relevance, so the cursor is simply an offset
+    offset = max(0, request.args.get('cursor', 0, type=int))
+    
+    if match is None:
+        return jsonify({'success': True, 'documents': [], 'next_cursor': None})
+    
+    document_fts = db.table('document_fts', db.column('rowid'), db.column('rank'))
+    snippet = db.func.snippet(db.literal_column('document_fts'), 4, SNIPPET_START, SNIPPET_END, '…', 16)
+    query = filter_documents(
+        db.select(*DOCUMENT_LIST_COLUMNS, snippet.label('body_snippet'))
+        .join(document_fts, document_fts.c.rowid == Document.id)
+        .where(db.literal_column('document_fts').op('MATCH')(match))
+        .where(Document.user_id == user_id),
+        doc_type=request.args.get('type', ''),
+        category=request.args.get('category', '')
+    )
+    rows = db.session.execute(query.order_by(document_fts.c.rank).offset(offset).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    
+    documents = []
+    for row in rows[:limit]:
+        result = serialize_document(row)
+        result['snippet'] = render_snippet(row.body_snippet)
+        documents.append(result)
+    
+    return jsonify({
+        'success': True,
+        'documents': documents,
+        'next_cursor': str(offset + limit) if has_more else None
+    })
+
+@bp.route('/api/documents', methods=['POST'])
 @login_required
 def api_add_document():
     data = request.get_json()
+    link = str(data.get('link') or '').strip()
+    if not valid_link(link):
+        return jsonify({'success': False, 'message': 'Enter a valid http(s) link!'}), 400
     
     document = Document(
         name=data['name'],
-        google_doc_link=data['link'],
+        google_doc_link=link,
         file_type='google_doc',
         category=data.get('category', 'General'),
         description=data.get('description', ''),
@@ -1949,7 +772,116 @@ def api_add_document():
     
     return jsonify({'success': True, 'message': 'Document added!'})
 
-@app.route('/api/upload', methods=['POST'])
+# Metadata export and import, as CSV or JSON Lines (see imports.py)
+METADATA_FIELDS = [
+    'id', 'name', 'category', 'tags', 'description', 'google_doc_link', 'original_filename',
+    'file_type', 'file_size', 'content_hash', 'created_at',
+]
+METADATA_FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+METADATA_STREAM_BATCH = 1000  # rows fetched from the cursor at a time
+MAX_REPORTED_IMPORT_ERRORS = 100
+
+@bp.route('/api/documents/export')
+@login_required
+def api_export_metadata():
+    """Every matching document's metadata, streamed straight off the cursor"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in METADATA_FORMATS:
+        return jsonify({'success': False, 'message': 'Unknown format!'}), 400
+    
+    query = filter_documents(
+        db.select(*(getattr(Document, field) for field in METADATA_FIELDS)).where(
+            Document.user_id == session['user_id']
+        ),
+        search=request.args.get('q', '').strip(),
+        doc_type=request.args.get('type', ''),
+        category=request.args.get('category', '')
+    ).order_by(Document.id)
+    
+    def rows():
+        results = db.session.execute(query.execution_options(yield_per=METADATA_STREAM_BATCH))
+        for row in results:
+            record = row._asdict()
+            record['created_at'] = row.created_at.isoformat() if row.created_at else None
+            yield record
+    
+    body = stream_csv(METADATA_FIELDS, rows()) if export_format == 'csv' else stream_jsonl(rows())
+    response = current_app.response_class(stream_with_context(body), mimetype=METADATA_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="documents.{export_format}"'
+    return response
+
+@bp.route('/api/documents/import', methods=['POST'])
+@login_required
+def api_import_metadata():
+    """Add link documents from a CSV or JSON Lines body, in the export's columns"""
+    import_format = request.args.get('format') or (
+        'jsonl' if request.mimetype in ('application/x-ndjson', 'application/jsonl') else 'csv'
+    )
+    if import_format not in METADATA_FORMATS:
+        return jsonify({'success': False, 'message': 'Unknown format!'}), 400
+    # One long stream rather than an upload chunk, so it has a limit of its own
+    request.max_content_length = current_app.config['MAX_IMPORT_SIZE']
+    
+    user_id = session['user_id']
+    categories = {value.lower(): value for value, in db.session.query(UserStat.value).filter(
+        UserStat.user_id == user_id, UserStat.kind == 'category', UserStat.count > 0, UserStat.value != ''
+    )}
+    categories.update((category.lower(), category) for category in DEFAULT_CATEGORIES)
+    db.session.commit()
+    
+    records = csv_records(request.stream) if import_format == 'csv' else jsonl_records(request.stream)
+    errors = []
+    counts = {'imported': 0, 'skipped': 0, 'errors': 0}
+    
+    def valid_documents():
+        for line, record in records:
+            document = validate_record(record, categories) if isinstance(record, dict) else record
+            if isinstance(document, str):
+                counts['errors'] += 1
+                if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                    errors.append({'line': line, 'message': document})
+                continue
+            document['user_id'] = user_id
+            yield document
+    
+    try:
+        # Each batch is one transaction, so a huge import doesn't hold the write lock throughout
+        for batch in batches(valid_documents()):
+            # Links the user already has, e.g. from an earlier run of the same import
+            existing = set(db.session.scalars(db.select(Document.google_doc_link).where(
+                Document.user_id == user_id,
+                Document.google_doc_link.in_(json_values([document['google_doc_link'] for document in batch]))
+            )))
+            fresh = []
+            for document in batch:
+                if document['google_doc_link'] in existing:
+                    counts['skipped'] += 1
+                    continue
+                existing.add(document['google_doc_link'])
+                fresh.append(document)
+            if fresh:
+                db.session.execute(db.insert(Document), fresh)
+            db.session.commit()
+            counts['imported'] += len(fresh)
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f"{e}! Imported {counts['imported']} documents before it.",
+            **counts,
+            'error_lines': errors
+        }), 400
+    
+    return jsonify({
+        'success': counts['imported'] > 0 or counts['errors'] == 0,
+        'message': f"Imported {counts['imported']} documents!" + (
+            f" {counts['skipped']} already existed." if counts['skipped'] else ''
+        ) + (f" {counts['errors']} records had errors." if counts['errors'] else ''),
+        **counts,
+        'error_lines': errors
+    })
+
+@bp.route('/api/upload', methods=['POST'])
 @login_required
 def api_upload():
     if 'file' not in request.files:
@@ -1961,31 +893,271 @@ def api_upload():
     
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        user_folder = get_user_folder(session['user_id'])
-        file_path = os.path.join(user_folder, filename)
-        file.save(file_path)
         
-        # Get file extension for file type
-        file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else 'unknown'
+        # Size and checksum are taken as the body streams to disk
+        stored = stage_file(file.stream)
+        if stored is None:
+            return jsonify({'success': False, 'message': 'File is too large!'})
+        temp_path, file_size, sha256 = stored
         
-        document = Document(
-            name=os.path.splitext(filename)[0],
-            original_filename=filename,
-            file_path=file_path,
-            file_type=file_ext,
-            file_size=os.path.getsize(file_path),
-            category=request.form.get('category', 'General'),
-            description=request.form.get('description', ''),
-            user_id=session['user_id']
+        save_uploaded_file(
+            session['user_id'], temp_path, filename, file_size, sha256,
+            request.form.get('category', 'General'),
+            request.form.get('description', '')
         )
-        db.session.add(document)
-        db.session.commit()
         
-        return jsonify({'success': True, 'message': 'File uploaded!'})
+        return jsonify({'success': True, 'message': 'File uploaded!', 'sha256': sha256})
     
     return jsonify({'success': False, 'message': 'Invalid file type!'})
 
-@app.route('/api/documents/<int:doc_id>', methods=['DELETE'])
+def bulk_response(results):
+    uploaded = sum(1 for result in results if result['success'])
+    return jsonify({
+        'success': uploaded > 0,
+        'message': f'Uploaded {uploaded} of {len(results)} files!',
+        'results': results
+    })
+
+@bp.route('/api/upload/bulk', methods=['POST'])
+@login_required
+def api_upload_bulk():
+    """Many files in one multipart request, as `files` fields and/or ZIP `archive` fields"""
+    files = [file for file in request.files.getlist('files') if file.filename]
+    archives = [file for file in request.files.getlist('archive') if file.filename]
+    if not files and not archives:
+        return jsonify({'success': False, 'message': 'No file selected!'})
+    
+    budget = UnpackBudget(current_app.config['MAX_UNPACKED_SIZE'])
+    
+    def incoming():
+        for file in files:
+            yield file.filename, file.stream
+        for file in archives:
+            # werkzeug spools uploads to a seekable temp file, which zipfile reads member by member
+            with zipfile.ZipFile(file.stream) as archive:
+                yield from zip_members(archive, budget)
+    
+    try:
+        results = ingest_files(
+            session['user_id'], incoming(),
+            request.form.get('category', 'General'),
+            request.form.get('description', '')
+        )
+    except zipfile.BadZipFile:
+        return jsonify({'success': False, 'message': 'Invalid ZIP archive!'})
+    except ArchiveLimitError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return bulk_response(results)
+
+# Chunked uploads: start a session, PUT the bytes in order with their offset,
+# then complete it. GET reports how far the server got, so an interrupted
+# upload resumes from there instead of starting over.
+def get_upload_session(upload_id):
+    return UploadSession.query.filter_by(id=upload_id, user_id=session['user_id']).first()
+
+@bp.route('/api/uploads', methods=['POST'])
+@login_required
+def api_upload_start():
+    data = request.get_json()
+    filename = secure_filename(data.get('filename', ''))
+    size = data.get('size')
+    
+    if not filename or not allowed_file(filename):
+        return jsonify({'success': False, 'message': 'Invalid file type!'})
+    
+    if not isinstance(size, int) or size < 0 or size > current_app.config['MAX_UPLOAD_SIZE']:
+        return jsonify({'success': False, 'message': 'File is too large!'})
+    
+    expire_upload_sessions()
+    
+    upload = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=session['user_id'],
+        filename=filename,
+        category=data.get('category', 'General'),
+        description=data.get('description', ''),
+        total_size=size,
+        received=0
+    )
+    create_partial_file(incoming_path(upload.id))
+    db.session.add(upload)
+    db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'upload_id': upload.id,
+        'offset': 0,
+        'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE']
+    })
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+@bp.route('/api/uploads/instant', methods=['POST'])
+@login_required
+def api_upload_instant():
+    """Pre-flight for an upload: if the server already holds the content, record the document without the bytes"""
+    data = request.get_json()
+    filename = secure_filename(data.get('filename', ''))
+    size = data.get('size')
+    sha256 = str(data.get('sha256', '')).lower()
+    
+    if not filename or not allowed_file(filename):
+        return jsonify({'success': False, 'message': 'Invalid file type!'})
+    
+    if not isinstance(size, int) or size < 0 or size > current_app.config['MAX_UPLOAD_SIZE']:
+        return jsonify({'success': False, 'message': 'File is too large!'})
+    
+    if not SHA256_RE.match(sha256):
+        return jsonify({'success': False, 'message': 'Invalid checksum!'})
+    
+    user_id = session['user_id']
+    if current_app.config['INSTANT_UPLOAD_SCOPE'] != 'all':
+        owned = db.session.query(Document.id).filter_by(user_id=user_id, content_hash=sha256).first()
+        if owned is None:
+            return jsonify({'success': True, 'uploaded': False})
+    
+    if not reuse_blob(db.session.connection(), sha256, size):
+        db.session.rollback()
+        return jsonify({'success': True, 'uploaded': False})
+    
+    document = file_document(
+        user_id, filename, blob_key(sha256), size, sha256,
+        data.get('category', 'General'),
+        data.get('description', '')
+    )
+    db.session.add(document)
+    db.session.flush()
+    
+    # The search index and preview are per document, so the jobs still run
+    enqueue_jobs([document.id], POST_UPLOAD_JOBS)
+    db.session.commit()
+    wake_workers()
+    
+    return jsonify({
+        'success': True,
+        'uploaded': True,
+        'message': 'File uploaded!',
+        'document_id': document.id,
+        'sha256': sha256
+    })
+
+@bp.route('/api/uploads/<upload_id>')
+@login_required
+def api_upload_status(upload_id):
+    upload = get_upload_session(upload_id)
+    
+    if not upload:
+        return jsonify({'success': False, 'message': 'Upload not found!'}), 404
+    
+    return jsonify({
+        'success': True,
+        'upload_id': upload.id,
+        'offset': upload.received,
+        'size': upload.total_size,
+        'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE']
+    })
+
+@bp.route('/api/uploads/<upload_id>', methods=['PUT'])
+@login_required
+def api_upload_chunk(upload_id):
+    upload = get_upload_session(upload_id)
+    temp_path = incoming_path(upload_id)
+    
+    if not upload or not os.path.exists(temp_path):
+        return jsonify({'success': False, 'message': 'Upload not found!'}), 404
+    
+    offset = request.args.get('offset', type=int)
+    if offset != upload.received:
+        return jsonify({'success': False, 'message': 'Offset mismatch!', 'offset': upload.received}), 409
+    
+    remaining = upload.total_size - offset
+    if request.content_length is not None and request.content_length > remaining:
+        return jsonify({'success': False, 'message': 'Chunk exceeds file size!', 'offset': offset}), 400
+    
+    # None if another process took the previous chunk: then /complete hashes the file
+    hasher = take_hasher(upload.id, offset)
+    written, complete = write_chunk(request.stream, temp_path, offset, remaining, hasher)
+    
+    # Record progress even for a cut-off chunk, so the client resumes from the last byte stored
+    upload.received = offset + written
+    upload.updated_at = datetime.utcnow()
+    db.session.commit()
+    if hasher:
+        put_hasher(upload.id, upload.received, hasher)
+    
+    if not complete:
+        return jsonify({'success': False, 'message': 'Chunk incomplete!', 'offset': upload.received}), 400
+    
+    return jsonify({'success': True, 'offset': upload.received})
+
+@bp.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def api_upload_complete(upload_id):
+    upload = get_upload_session(upload_id)
+    temp_path = incoming_path(upload_id)
+    
+    if not upload or not os.path.exists(temp_path):
+        return jsonify({'success': False, 'message': 'Upload not found!'}), 404
+    
+    if upload.received != upload.total_size:
+        return jsonify({'success': False, 'message': 'Upload incomplete!', 'offset': upload.received}), 400
+    
+    checksum = file_checksum(upload.id, temp_path, upload.received)
+    options = request.get_json(silent=True) or {}
+    expected = options.get('sha256')
+    if expected and expected.lower() != checksum:
+        discard_upload_session(upload)
+        db.session.commit()
+        return jsonify({'success': False, 'message': 'Checksum mismatch, please upload again!'}), 400
+    
+    # A large archive can come in through the resumable protocol and be unpacked here
+    if options.get('unpack') and upload.filename.lower().endswith('.zip'):
+        budget = UnpackBudget(current_app.config['MAX_UNPACKED_SIZE'])
+        limit_error = None
+        try:
+            with zipfile.ZipFile(temp_path) as archive:
+                results = ingest_files(upload.user_id, zip_members(archive, budget), upload.category, upload.description)
+        except zipfile.BadZipFile:
+            results = None
+        except ArchiveLimitError as e:
+            results, limit_error = None, str(e)
+        discard_upload_session(upload)
+        db.session.commit()
+        if limit_error:
+            return jsonify({'success': False, 'message': limit_error}), 400
+        if results is None:
+            return jsonify({'success': False, 'message': 'Invalid ZIP archive!'})
+        return bulk_response(results)
+    
+    drop_hasher(upload.id)
+    db.session.delete(upload)
+    document = save_uploaded_file(
+        upload.user_id, temp_path, upload.filename, upload.total_size, checksum,
+        upload.category, upload.description
+    )
+    
+    return jsonify({
+        'success': True,
+        'message': 'File uploaded!',
+        'document_id': document.id,
+        'sha256': checksum
+    })
+
+@bp.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def api_upload_abort(upload_id):
+    upload = get_upload_session(upload_id)
+    
+    if not upload:
+        return jsonify({'success': False, 'message': 'Upload not found!'}), 404
+    
+    discard_upload_session(upload)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'message': 'Upload cancelled!'})
+
+@bp.route('/api/documents/<int:doc_id>', methods=['DELETE'])
 @login_required
 def api_delete_document(doc_id):
     document = Document.query.filter_by(id=doc_id, user_id=session['user_id']).first()
@@ -1993,15 +1165,147 @@ def api_delete_document(doc_id):
     if not document:
         return jsonify({'success': False, 'message': 'Document not found!'})
     
-    if document.file_path and os.path.exists(document.file_path):
-        os.remove(document.file_path)
-    
+    # Like a bulk delete: only the count drops here, files go in the background
+    content_hash, file_path = document.content_hash, document.file_path
+    if content_hash:
+        release_references(db.session.connection(), {content_hash: 1})
     db.session.delete(document)
     db.session.commit()
     
+    if content_hash or file_path:
+        file_cleanup.submit(
+            cleanup_files, current_app._get_current_object(),
+            [content_hash] if content_hash else [], [] if content_hash else [file_path]
+        )
+    
     return jsonify({'success': True, 'message': 'Document deleted!'})
 
-@app.route('/api/documents/<int:doc_id>/download')
+# Bulk operations
+# Files are unlinked off the request thread; a single worker keeps it to one writer
+file_cleanup = ThreadPoolExecutor(max_workers=1, thread_name_prefix='file-cleanup')
+CLEANUP_BATCH_SIZE = 100
+
+def json_values(values):
+    """SELECT over a JSON array, so any number of values binds as one parameter"""
+    return db.select(db.func.json_each(json.dumps(values)).table_valued('value').c.value)
+
+def bulk_selection(user_id, payload):
+    """WHERE clause for the user's documents named by a bulk request, or None if invalid
+
+    The request either lists `ids` or gives a `filter` with the q/type/category
+    of the documents page, so "everything matching" works without the client
+    having to page through it first.
+    """
+    selection = db.select(Document.id).where(Document.user_id == user_id)
+    if 'ids' in payload:
+        ids = payload['ids']
+        if not isinstance(ids, list) or not ids or not all(type(doc_id) is int for doc_id in ids):
+            return None
+        return selection.where(Document.id.in_(json_values(ids))).whereclause
+    
+    filters = payload.get('filter')
+    if not isinstance(filters, dict):
+        return None
+    search = str(filters.get('q', '')).strip()
+    if search:
+        # Same matching as /api/search, which is what the page shows for a query
+        match = build_match_query(user_id, search)
+        if match is None:
+            return db.false()
+        matches = db.select(db.literal_column('rowid')).select_from(db.table('document_fts')).where(
+            db.literal_column('document_fts').op('MATCH')(match)
+        )
+        selection = selection.where(Document.id.in_(matches))
+    return filter_documents(
+        selection,
+        doc_type=str(filters.get('type', '')),
+        category=str(filters.get('category', ''))
+    ).whereclause
+
+def cleanup_files(app, digests, file_paths):
+    """Background half of a delete: unlink blobs and legacy files nothing uses any more"""
+    with app.app_context():
+        try:
+            for count, digest in enumerate(digests, 1):
+                # Re-checked under the write lock, so a blob re-uploaded meanwhile survives
+                collect_blob(db.session.connection(), app.extensions['storage'], digest)
+                if count % CLEANUP_BATCH_SIZE == 0:
+                    db.session.commit()
+            db.session.commit()
+            
+            # Files from before the blob store can be shared by same-name uploads
+            if file_paths:
+                in_use = {row[0] for row in db.session.query(Document.file_path).filter(
+                    Document.file_path.in_(json_values(file_paths))
+                )}
+                for file_path in file_paths:
+                    if file_path not in in_use and os.path.exists(file_path):
+                        os.remove(file_path)
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ File cleanup failed, run `flask collect-blobs` to retry: {e}")
+        finally:
+            db.session.remove()
+
+@bp.route('/api/documents', methods=['DELETE'])
+@login_required
+def api_bulk_delete_documents():
+    condition = bulk_selection(session['user_id'], request.get_json(silent=True) or {})
+    if condition is None:
+        return jsonify({'success': False, 'message': 'Select documents by ids or filter!'}), 400
+    
+    # One statement for the whole selection; the triggers keep search and stats in step
+    deleted = db.session.execute(
+        db.delete(Document).where(condition).returning(Document.content_hash, Document.file_path),
+        execution_options={'synchronize_session': False}
+    ).all()
+    
+    released = Counter(content_hash for content_hash, _ in deleted if content_hash)
+    legacy_paths = sorted({file_path for content_hash, file_path in deleted if not content_hash and file_path})
+    if released:
+        release_references(db.session.connection(), released)
+    db.session.commit()
+    
+    if released or legacy_paths:
+        file_cleanup.submit(cleanup_files, current_app._get_current_object(), list(released), legacy_paths)
+    
+    return jsonify({'success': True, 'message': f'{len(deleted)} documents deleted!', 'count': len(deleted)})
+
+@bp.route('/api/documents', methods=['PATCH'])
+@login_required
+def api_bulk_update_documents():
+    payload = request.get_json(silent=True) or {}
+    condition = bulk_selection(session['user_id'], payload)
+    if condition is None:
+        return jsonify({'success': False, 'message': 'Select documents by ids or filter!'}), 400
+    
+    changes = {}
+    if 'category' in payload:
+        category = str(payload['category'] or '').strip()
+        if not category:
+            return jsonify({'success': False, 'message': 'Category cannot be empty!'}), 400
+        if len(category) > MAX_CATEGORY_LENGTH:
+            return jsonify({'success': False, 'message': f'Category must be at most {MAX_CATEGORY_LENGTH} characters!'}), 400
+        changes['category'] = category
+    if 'tags' in payload:
+        tags = normalize_tags(payload['tags'] or '')
+        if tags is None:
+            return jsonify({'success': False, 'message': 'Invalid tags!'}), 400
+        if len(tags) > MAX_TAGS_LENGTH:
+            return jsonify({'success': False, 'message': f'Tags must be at most {MAX_TAGS_LENGTH} characters!'}), 400
+        changes['tags'] = tags
+    if not changes:
+        return jsonify({'success': False, 'message': 'Nothing to update!'}), 400
+    
+    updated = db.session.execute(
+        db.update(Document).where(condition).values(changes),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    db.session.commit()
+    
+    return jsonify({'success': True, 'message': f'{updated} documents updated!', 'count': updated})
+
+@bp.route('/api/documents/<int:doc_id>/download')
 @login_required
 def api_download_document(doc_id):
     document = Document.query.filter_by(id=doc_id, user_id=session['user_id']).first()
@@ -2009,23 +1313,393 @@ def api_download_document(doc_id):
     if not document or not document.file_path:
         return jsonify({'success': False, 'message': 'File not found!'})
     
-    return send_file(document.file_path, as_attachment=True, download_name=document.original_filename)
+    if document.content_hash:
+        # Object stores hand out a short-lived URL, so the bytes never pass through here
+        url = get_storage().download_url(blob_key(document.content_hash), document.original_filename)
+        if url:
+            response = redirect(url)
+            response.cache_control.no_store = True
+            return response
+    
+    if not os.path.exists(local_file_path(document)):
+        return jsonify({'success': False, 'message': 'File not found!'})
+    return send_document_file(document)
+
+# ZIP exports: POST a selection (like the bulk actions) to fix the documents
+# it covers, then GET the archive. The archive is streamed (see exports.py)
+# with a known length; once every file in it is measured, downloads can be
+# resumed with Range requests.
+def expire_exports():
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['EXPORT_TTL'])
+    Export.query.filter(Export.created_at < cutoff).delete(synchronize_session=False)
+
+def export_documents(user_id, doc_ids):
+    return db.session.execute(
+        db.select(
+            Document.id, Document.name, Document.original_filename, Document.file_type,
+            Document.file_path, Document.content_hash, Document.created_at
+        ).where(
+            Document.user_id == user_id, Document.id.in_(json_values(doc_ids))
+        ).order_by(Document.id)
+    ).all()
+
+@bp.route('/api/exports', methods=['POST'])
+@login_required
+def api_create_export():
+    condition = bulk_selection(session['user_id'], request.get_json(silent=True) or {})
+    if condition is None:
+        return jsonify({'success': False, 'message': 'Select documents by ids or filter!'}), 400
+    
+    doc_ids = db.session.scalars(
+        db.select(Document.id).where(condition, Document.file_path != '').order_by(Document.id)
+    ).all()
+    if not doc_ids:
+        return jsonify({'success': False, 'message': 'No files to export!'})
+    
+    documents = export_documents(session['user_id'], doc_ids)
+    _, missing = plan_archive(db.session.connection(), get_storage(), documents)
+    missing_ids = {document.id for document in missing}
+    missing_names = [document.original_filename or document.name for document in missing]
+    doc_ids = [doc_id for doc_id in doc_ids if doc_id not in missing_ids]
+    if not doc_ids:
+        return jsonify({'success': False, 'message': 'None of these files could be found!', 'missing': missing_names})
+    
+    # Nothing is read here: blobs the measure job hasn't got to (e.g. uploaded
+    # before it existed) are queued for it, and stream unmeasured meanwhile
+    unmeasured = unmeasured_documents(db.session.connection(), documents)
+    queued = set(db.session.scalars(
+        db.select(Job.document_id).where(Job.kind == 'measure', Job.document_id.in_(json_values(unmeasured)))
+    ))
+    enqueue_jobs([doc_id for doc_id in unmeasured if doc_id not in queued], ['measure'])
+    
+    expire_exports()
+    export = Export(id=uuid.uuid4().hex, user_id=session['user_id'], document_ids=json.dumps(doc_ids))
+    db.session.add(export)
+    db.session.commit()
+    wake_workers()
+    
+    return jsonify({
+        'success': True,
+        'message': f'Exporting {len(doc_ids)} files!' + (
+            f' {len(missing_names)} could not be found and are left out.' if missing_names else ''
+        ),
+        'export_id': export.id,
+        'count': len(doc_ids),
+        'missing': missing_names,
+        'url': url_for('docmanager.api_download_export', export_id=export.id)
+    })
 
-# Initialize database and create folders for existing users
-def initialize_user_folders():
-    """Create folders for all existing users on startup"""
-    users = User.query.all()
-    for user in users:
-        create_user_folder(user.id)
-    print(f"✅ Initialized folders for {len(users)} users")
+@bp.route('/api/exports/<export_id>')
+@login_required
+def api_download_export(export_id):
+    export = Export.query.filter_by(id=export_id, user_id=session['user_id']).first()
+    if not export or export.created_at < datetime.utcnow() - timedelta(seconds=current_app.config['EXPORT_TTL']):
+        return jsonify({'success': False, 'message': 'Export not found!'}), 404
+    
+    documents = export_documents(export.user_id, json.loads(export.document_ids))
+    archive, missing = plan_archive(db.session.connection(), get_storage(), documents)
+    # Don't hold a transaction open while the archive streams
+    db.session.commit()
+    if missing:
+        # Rather than an archive that quietly lacks them
+        return jsonify({
+            'success': False,
+            'message': f'{len(missing)} files in this export can no longer be found!',
+            'missing': [document.original_filename or document.name for document in missing]
+        }), 409
+    
+    # Resume from where an interrupted download stopped, if it was of this same archive
+    start, stop = 0, archive.size
+    byte_range = request.range if archive.rangeable else None
+    if byte_range and request.if_range.date is None and request.if_range.etag in (None, archive.etag):
+        satisfiable = byte_range.range_for_length(archive.size)
+        if satisfiable is None:
+            response = jsonify({'success': False, 'message': 'Range not satisfiable!'})
+            response.status_code = 416
+            response.headers['Content-Range'] = f'bytes */{archive.size}'
+            return response
+        start, stop = satisfiable
+    else:
+        byte_range = None
+    
+    response = current_app.response_class(
+        stream_with_context(archive.chunks(start, stop)), mimetype='application/zip', direct_passthrough=True
+    )
+    response.content_length = stop - start
+    if byte_range:
+        response.status_code = 206
+        response.content_range = ContentRange('bytes', start, stop, archive.size)
+    if archive.rangeable:
+        response.accept_ranges = 'bytes'
+        response.set_etag(archive.etag)
+    else:
+        response.accept_ranges = 'none'  # until the measure jobs are done
+    response.headers['Content-Disposition'] = f'attachment; filename="documents-{export.created_at:%Y%m%d-%H%M%S}.zip"'
+    response.cache_control.private = True
+    response.cache_control.no_transform = True
+    DOWNLOAD_BYTES.inc(stop - start)
+    return response
+
+PREVIEW_MAX_AGE = 365 * 24 * 60 * 60
+
+@bp.route('/api/documents/<int:doc_id>/preview')
+@login_required
+def api_document_preview(doc_id):
+    document = Document.query.filter_by(id=doc_id, user_id=session['user_id']).first()
+    
+    if not document or not document.content_hash or not can_preview(document.file_type):
+        return jsonify({'success': False, 'message': 'No preview available!'}), 404
+    
+    path = cached_preview(current_app.config['PREVIEW_FOLDER'], document.content_hash)
+    if path is None:
+        # Not rendered yet, or evicted from the cache since: have a worker build it
+        if not Job.query.filter_by(document_id=document.id, kind='preview').first():
+            enqueue_jobs([document.id], ['preview'])
+            db.session.commit()
+            wake_workers()
+        return jsonify({'success': False, 'message': 'Preview not ready yet!'}), 404
+    if not path:
+        return jsonify({'success': False, 'message': 'No preview available!'}), 404
+    
+    response = werkzeug_send_file(
+        os.path.abspath(path),
+        request.environ,
+        mimetype='image/jpeg',
+        etag=document.content_hash,
+        max_age=PREVIEW_MAX_AGE,
+        response_class=current_app.response_class
+    )
+    # werkzeug marks anything with a max_age public; previews need a login
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+def local_file_path(document):
+    """Where a document's file is on disk, with the local storage driver"""
+    if document.content_hash:
+        return get_storage().path(blob_key(document.content_hash))
+    return document.file_path
+
+def send_document_file(document):
+    """Send a stored file with validators taken from its document record
+
+    The ETag is the content's SHA-256, so it is strong and survives the file
+    being copied or migrated. Range requests and If-None-Match /
+    If-Modified-Since are answered by werkzeug, and without offloading the
+    body goes out through wsgi.file_wrapper (sendfile on servers that
+    support it). With DOWNLOAD_OFFLOAD set, Flask only answers 304s and the
+    proxy streams the bytes, handling ranges itself.
+    """
+    offload = current_app.config['DOWNLOAD_OFFLOAD']
+    file_path = local_file_path(document)
+    response = werkzeug_send_file(
+        os.path.abspath(file_path),
+        request.environ,
+        as_attachment=True,
+        download_name=document.original_filename,
+        etag=document.content_hash or True,  # files from before the blob store fall back to werkzeug's
+        last_modified=document.created_at,
+        conditional=not offload,
+        use_x_sendfile=bool(offload),
+        response_class=current_app.response_class
+    )
+    # Downloads need a login, so shared caches must not keep them
+    response.cache_control.private = True
+    
+    if offload:
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            response.headers.pop('X-Sendfile', None)
+        elif offload == 'x-accel-redirect':
+            response.headers.pop('X-Sendfile', None)
+            response.headers.pop('Content-Length', None)
+            relative_path = os.path.relpath(file_path, current_app.config['UPLOAD_FOLDER'])
+            response.headers['X-Accel-Redirect'] = current_app.config['X_ACCEL_REDIRECT_PREFIX'] + relative_path.replace(os.sep, '/')
+    
+    if response.status_code in (200, 206):
+        # With x-accel-redirect there is no Content-Length here; the proxy sends the whole file
+        DOWNLOAD_BYTES.inc(response.content_length if response.content_length is not None else document.file_size or 0)
+    return response
+
+@bp.cli.command('reindex-search')
+def reindex_search():
+    """Re-extract the text of every uploaded file into the search index"""
+    files = db.session.query(
+        Document.id, Document.file_path, Document.file_type, Document.content_hash
+    ).filter(Document.file_path != '').all()
+    for count, document in enumerate(files, 1):
+        try:
+            with document_file(document) as path:
+                if os.path.exists(path):
+                    index_document_body(db.session.connection(), document.id, extract_text(path, document.file_type))
+        except FileNotFoundError:
+            pass  # missing from the object store
+        if count % 100 == 0:
+            db.session.commit()
+    db.session.commit()
+    print(f"✅ Reindexed {len(files)} files")
+
+def migrate_legacy_file(app, file_path):
+    """Move one pre-blob-store file into the blob store; returns how many documents now use the blob
+
+    Safe to run while the app is serving: the file is hashed and stored
+    outside any transaction, and the documents are only switched over if they
+    still point at the old path, so a concurrent delete or re-upload wins.
+    A blob stored for documents that went away meanwhile is left for
+    `flask collect-blobs`.
+    """
+    with app.app_context():
+        try:
+            if not os.path.exists(file_path):
+                print(f"⚠️ Missing file {file_path}")
+                return 0
+            
+            file_size = os.path.getsize(file_path)
+            sha256 = hash_file_prefix(file_path, file_size).hexdigest()
+            # Stage a copy so the original stays readable until the switch-over
+            staged_path = incoming_path(uuid.uuid4().hex)
+            os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+            shutil.copyfile(file_path, staged_path)
+            try:
+                storage = get_storage()
+                store_blob(storage, sha256, staged_path)
+                # Several documents can point at one file (same-name uploads overwrote each other)
+                doc_ids = db.session.scalars(
+                    db.update(Document)
+                    .where(Document.file_path == file_path, Document.content_hash.is_(None))
+                    .values(file_path=blob_key(sha256), content_hash=sha256)
+                    .returning(Document.id)
+                ).all()
+                moved = len(doc_ids)
+                for _ in range(moved):
+                    add_reference(db.session.connection(), sha256, file_size)
+                # Like an upload, so ZIP exports of it can be resumed
+                enqueue_jobs(doc_ids, ['measure'])
+                db.session.commit()
+                if moved:
+                    settle_blob(storage, sha256, staged_path)
+                    wake_workers()
+            finally:
+                if os.path.exists(staged_path):
+                    os.remove(staged_path)
+            
+            # Only drop the original once the documents point at the blob
+            if moved:
+                os.remove(file_path)
+            return moved
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Could not migrate {file_path}: {e}")
+            return 0
+        finally:
+            db.session.remove()
+
+@bp.cli.command('migrate-blobs')
+@click.option('--workers', type=int, default=4, show_default=True, help='Files migrated in parallel.')
+def migrate_blobs(workers):
+    """Move files from the per-user folders into the content-addressed blob store, without downtime"""
+    file_paths = [row.file_path for row in db.session.query(Document.file_path).filter(
+        Document.file_path != '', Document.content_hash.is_(None)
+    ).distinct()]
+    db.session.commit()
+    
+    app = current_app._get_current_object()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='migrate-blobs') as executor:
+        migrated = sum(executor.map(partial(migrate_legacy_file, app), file_paths))
+    
+    print(f"✅ Migrated {migrated} documents into the blob store")
+
+@bp.cli.command('build-assets')
+def build_assets_command():
+    """Fingerprint and precompress the static assets ahead of a deploy"""
+    manifest = build_assets(current_app.static_folder, current_app.config['ASSET_BUILD_FOLDER'])
+    print(f"✅ Built {len(manifest)} assets into {current_app.config['ASSET_BUILD_FOLDER']}")
+
+@bp.cli.command('run-jobs')
+@click.option('--workers', type=int, help='Worker threads (default: JOB_WORKERS).')
+def run_jobs(workers):
+    """Process background jobs in the foreground until interrupted"""
+    count = workers or current_app.config['JOB_WORKERS'] or 1
+    stop = start_workers(current_app._get_current_object(), count)
+    print(f"✅ Running {count} job workers, press Ctrl+C to stop")
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        stop.set()
+
+@bp.cli.command('collect-blobs')
+def collect_blobs():
+    """Unlink blobs no document references, e.g. left behind by an interrupted delete or upload"""
+    storage = get_storage()
+    orphans = orphaned_blobs(db.session.connection(), storage)
+    db.session.commit()
+    
+    collected = 0
+    for digest in unreferenced_blobs(db.session.connection()):
+        # One short transaction per blob, so uploads aren't kept waiting on the deletes
+        collected += collect_blob(db.session.connection(), storage, digest)
+        db.session.commit()
+    print(f"✅ Collected {collected} unreferenced blobs ({len(orphans)} had never been referenced)")
+
+@bp.cli.command('prune-changes')
+def prune_changes():
+    """Drop deletion tombstones older than CHANGE_LOG_RETENTION from the change log"""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['CHANGE_LOG_RETENTION'])
+    pruned = DocumentChange.query.filter(
+        DocumentChange.deleted.is_(True), DocumentChange.changed_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    print(f"✅ Pruned {pruned} old tombstones")
+
+def rebuild_user_stats(user_id=None):
+    """Recompute the stats counters from the document table, for one user or everyone"""
+    where = 'WHERE user_id = :user_id' if user_id is not None else ''
+    if user_id is not None:
+        UserStat.query.filter_by(user_id=user_id).delete()
+    else:
+        UserStat.query.delete()
+    for statement in REBUILD_STATS_SQL:
+        db.session.execute(db.text(statement.format(where=where)), {'user_id': user_id})
+    db.session.commit()
 
-# Initialize database
-with app.app_context():
-    db.create_all()
-    if not os.path.exists(app.config['UPLOAD_FOLDER']):
-        os.makedirs(app.config['UPLOAD_FOLDER'])
-    # Create folders for all existing users
-    initialize_user_folders()
+@bp.cli.command('rebuild-stats')
+@click.option('--user-id', type=int, help='Only rebuild this user\'s counters.')
+def rebuild_stats(user_id):
+    """Recompute the per-user dashboard statistics, fixing any drift"""
+    rebuild_user_stats(user_id)
+    print(f"✅ Rebuilt statistics for {'user ' + str(user_id) if user_id is not None else 'all users'}")
+
+def create_app(test_config=None):
+    """Application factory, used by wsgi.py, the flask CLI and `python app.py`"""
+    app = Flask(__name__)
+    app.json = json_provider(app)
+    app.config.from_object(Config)
+    app.config.from_prefixed_env()
+    if test_config:
+        app.config.update(test_config)
+    if not app.config['BLOB_FOLDER']:
+        app.config['BLOB_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'blobs')
+    if not app.config['PREVIEW_FOLDER']:
+        app.config['PREVIEW_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'previews')
+    app.extensions['storage'] = create_storage(app.config)
+    if not app.config['ASSET_BUILD_FOLDER']:
+        app.config['ASSET_BUILD_FOLDER'] = os.path.join(app.static_folder, 'dist')
+    app.extensions['assets'] = build_assets(app.static_folder, app.config['ASSET_BUILD_FOLDER'])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    
+    db.init_app(app)
+    app.register_blueprint(bp)
+    
+    # Initialize database
+    with app.app_context():
+        configure_sqlite(db.engine, app.config)
+        instrument_engine(db.engine)
+        run_migrations(db.engine)
+        if not os.path.exists(app.config['UPLOAD_FOLDER']):
+            os.makedirs(app.config['UPLOAD_FOLDER'])
+    
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
@@ -0,0 +1,93 @@
+"""Fingerprinted, precompressed static assets for the UI
+
+build_assets() copies each source file under static/ into the build folder
+under a name that carries a hash of its content (css/app.css becomes
+css/app.3f2a9c1b7d4e.css), next to gzip and, if the optional `brotli`
+package is installed, brotli variants. Templates link to the built names
+through asset_url(), so browsers can cache them forever: changing a file
+changes its URL. Relative url() references in stylesheets (e.g. icon fonts)
+are rewritten to the built names too.
+
+Building is idempotent and cheap when nothing changed, so it runs at startup;
+`flask build-assets` does the same ahead of a deploy.
+"""
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSED_TYPES = {'.css', '.js', '.svg', '.json', '.txt', '.map'}
+# (Content-Encoding, file suffix), in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+def fingerprinted_name(name, data):
+    base, ext = os.path.splitext(name)
+    return f'{base}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+def write_once(path, produce):
+    """Write produce()'s bytes unless the output exists; names are content hashes, so it can't be stale"""
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(produce())
+    os.replace(temp_path, path)
+
+def rewrite_css_urls(data, name, manifest):
+    """Point relative url()s in a stylesheet at the fingerprinted files"""
+    base = posixpath.dirname(name)
+
+    def replace(match):
+        reference = match.group(2)
+        path, suffix = re.match(r'([^?#]*)(.*)', reference).groups()
+        target = posixpath.normpath(posixpath.join(base, path))
+        if re.match(r'^([a-z]+:|/|#)', reference) or target not in manifest:
+            return match.group(0)
+        return f'url({posixpath.relpath(manifest[target], base)}{suffix})'
+
+    return CSS_URL_RE.sub(replace, data.decode('utf-8')).encode('utf-8')
+
+def build_assets(source_folder, build_folder):
+    """Fingerprint and precompress every asset; returns {source name: built name}"""
+    build_folder = os.path.abspath(build_folder)
+    sources = []
+    for directory, dirnames, filenames in os.walk(source_folder):
+        dirnames[:] = [d for d in dirnames if os.path.abspath(os.path.join(directory, d)) != build_folder]
+        for filename in filenames:
+            source = os.path.join(directory, filename)
+            sources.append((os.path.relpath(source, source_folder).replace(os.sep, '/'), source))
+    # Stylesheets go last, so the files they reference already have their built names
+    sources.sort(key=lambda item: (item[0].endswith('.css'), item[0]))
+
+    manifest = {}
+    for name, source in sources:
+        with open(source, 'rb') as f:
+            data = f.read()
+        if name.endswith('.css'):
+            data = rewrite_css_urls(data, name, manifest)
+        built = fingerprinted_name(name, data)
+        target = os.path.join(build_folder, built)
+        write_once(target, lambda: data)
+        if os.path.splitext(name)[1] in COMPRESSED_TYPES:
+            write_once(target + '.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                write_once(target + '.br', lambda: brotli.compress(data, quality=11))
+        manifest[name] = built
+    return manifest
+
+def negotiate_encoding(build_folder, built_name, accept_encodings):
+    """Best precompressed variant the client accepts: (file name, Content-Encoding or None)"""
+    for encoding, suffix in ENCODINGS:
+        if accept_encodings[encoding] and os.path.exists(os.path.join(build_folder, built_name + suffix)):
+            return built_name + suffix, encoding
+    return built_name, None
@@ -0,0 +1 @@
+"""Benchmarks for the document manager; run each module with `python -m benchmarks.<name>`"""
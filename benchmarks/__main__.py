@@ -0,0 +1,99 @@
+"""Command line for the benchmark suite
+
+    python -m benchmarks generate --data-dir bench-data --documents 100000
+    python -m benchmarks run --data-dir bench-data [--target wsgi] --output new.json
+    python -m benchmarks compare old.json new.json [--fail-over 1.2]
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.runner import SCENARIOS, compare_reports, run_benchmarks
+
+def generate(args):
+    from app import create_app
+    from benchmarks.corpus import corpus_config, generate_corpus
+    if os.path.exists(os.path.join(args.data_dir, 'database.db')):
+        sys.exit(f'{args.data_dir} already holds a corpus; pick an empty directory')
+    os.makedirs(args.data_dir, exist_ok=True)
+    app = create_app(corpus_config(args.data_dir))
+    generate_corpus(app, args.users, args.documents, args.distinct_files, args.file_size, args.seed)
+    print(f"✅ Generated {args.documents} documents for {args.users} users in {args.data_dir}", file=sys.stderr)
+
+def run(args):
+    def progress(name, result):
+        print(
+            f"{name:>16}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms, "
+            f"{result['throughput_rps']} req/s, {result['errors']} errors, peak RSS {result['peak_rss_mb']} MB",
+            file=sys.stderr
+        )
+
+    report = run_benchmarks(
+        args.data_dir, target=args.target, url=args.url, scenarios=args.scenario, requests=args.requests,
+        concurrency=args.concurrency, warmup=args.warmup, user_id=args.user_id, upload_size=args.upload_size,
+        seed=args.seed, progress=progress
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    ratios = compare_reports(base, new)
+    print(json.dumps(ratios, indent=2))
+
+    # Latency and memory regress upwards, throughput downwards
+    regressions = [
+        f'{name} {metric} x{ratio}'
+        for name, metrics in ratios.items() for metric, ratio in metrics.items()
+        if args.fail_over and (ratio > args.fail_over if metric != 'throughput_rps' else ratio < 1 / args.fail_over)
+    ]
+    if regressions:
+        sys.exit('⚠️ Regressions: ' + ', '.join(regressions))
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Document manager benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('generate', help='create a synthetic corpus')
+    command.add_argument('--data-dir', required=True)
+    command.add_argument('--users', type=int, default=10)
+    command.add_argument('--documents', type=int, default=1000, help='total, e.g. 1000 to 1000000')
+    command.add_argument('--distinct-files', type=int, default=100, help='distinct file contents to share out')
+    command.add_argument('--file-size', type=int, default=64 * 1024, help='average file size in bytes')
+    command.add_argument('--seed', type=int, default=1)
+    command.set_defaults(handler=generate)
+
+    command = commands.add_parser('run', help='run scenarios and write a JSON report')
+    command.add_argument('--data-dir', required=True)
+    command.add_argument('--target', choices=['testclient', 'wsgi'], default='testclient',
+                         help='Flask test client in-process, or a threaded HTTP server in a child process')
+    command.add_argument('--url', help='benchmark a server already serving the corpus instead')
+    command.add_argument('--scenario', action='append', choices=list(SCENARIOS), help='repeat to pick several')
+    command.add_argument('--requests', type=int, default=200, help='per scenario')
+    command.add_argument('--concurrency', type=int, default=4)
+    command.add_argument('--warmup', type=int, default=5)
+    command.add_argument('--user-id', type=int, default=1)
+    command.add_argument('--upload-size', type=int, default=64 * 1024)
+    command.add_argument('--seed', type=int, default=1)
+    command.add_argument('--output', help='report file (default: stdout)')
+    command.set_defaults(handler=run)
+
+    command = commands.add_parser('compare', help='ratios of a report\'s metrics to a baseline\'s')
+    command.add_argument('base')
+    command.add_argument('new')
+    command.add_argument('--fail-over', type=float, help='exit non-zero if any metric is this much worse')
+    command.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
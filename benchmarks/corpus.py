@@ -0,0 +1,118 @@
+"""Synthetic users, documents and files for benchmarking
+
+A corpus is a data directory holding a database and an uploads folder, laid
+out like a real deployment so the app can be pointed straight at it. Every
+user has the password PASSWORD. Documents are spread evenly over the users
+and mix Google Docs links with files; the files are `distinct_files` blobs of
+random bytes, shared between documents the way deduplicated uploads are.
+Rows go in through the normal triggers, so search, stats and the change log
+are populated as they would be in production.
+"""
+import hashlib
+import os
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from blobstore import blob_key
+from models import db, Document, User
+
+PASSWORD = 'benchmark'
+BATCH_SIZE = 10000
+CATEGORIES = ['General', 'Work', 'Personal', 'Research', 'Business']
+FILE_TYPES = ['pdf', 'docx', 'xlsx', 'txt', 'png']
+WORDS = (
+    'annual budget report meeting notes draft final review contract invoice plan '
+    'summary proposal research data project design roadmap quarterly policy memo'
+).split()
+
+def corpus_config(data_dir):
+    """create_app() settings for a corpus in data_dir"""
+    data_dir = os.path.abspath(data_dir)
+    return {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(data_dir, 'database.db')}",
+        'UPLOAD_FOLDER': os.path.join(data_dir, 'uploads'),
+        # Requests are measured on their own; queued processing is left alone
+        'JOB_WORKERS': 0,
+    }
+
+def phrase(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+def write_blobs(storage, scratch_folder, count, file_size, rng):
+    """Put `count` files of random bytes in the blob store; returns [(digest, size)]"""
+    os.makedirs(scratch_folder, exist_ok=True)
+    blobs = []
+    for number in range(count):
+        data = rng.randbytes(max(1, int(file_size * rng.uniform(0.5, 1.5))))
+        digest = hashlib.sha256(data).hexdigest()
+        temp_path = os.path.join(scratch_folder, f'corpus-{number}')
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        storage.save(blob_key(digest), temp_path)
+        blobs.append((digest, len(data)))
+    return blobs
+
+def generate_corpus(app, users=10, documents=1000, distinct_files=100, file_size=64 * 1024, seed=1):
+    """Fill an empty database with a synthetic corpus"""
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(PASSWORD)  # hashing is slow, so every user shares one
+    with app.app_context():
+        db.session.execute(db.insert(User), [
+            {'id': number, 'username': f'user{number}', 'email': f'user{number}@example.com',
+             'password_hash': password_hash}
+            for number in range(1, users + 1)
+        ])
+        storage = app.extensions['storage']
+        scratch_folder = os.path.join(app.config['UPLOAD_FOLDER'], '.incoming')
+        blobs = write_blobs(storage, scratch_folder, distinct_files, file_size, rng)
+
+        references = {}
+        start = datetime.utcnow() - timedelta(days=365)
+        batch = []
+        for number in range(documents):
+            row = {
+                'name': f'{phrase(rng, 3).title()} {number}',
+                'category': rng.choice(CATEGORIES),
+                'tags': ', '.join(sorted(set(rng.sample(WORDS, rng.randint(0, 3))))),
+                'description': phrase(rng, rng.randint(5, 40)),
+                'user_id': number % users + 1,
+                'created_at': start + timedelta(seconds=number * 365 * 24 * 60 * 60 // max(documents, 1)),
+                'google_doc_link': None,
+                'file_path': None,
+                'file_type': 'google_doc',
+                'file_size': None,
+                'content_hash': None,
+                'original_filename': None,
+                'processing_status': None,
+            }
+            if blobs and rng.random() < 0.8:
+                digest, size = rng.choice(blobs)
+                references[digest] = references.get(digest, 0) + 1
+                row['file_type'] = rng.choice(FILE_TYPES)
+                row.update({
+                    'file_path': blob_key(digest),
+                    'file_size': size,
+                    'content_hash': digest,
+                    'original_filename': f"{row['name']}.{row['file_type']}",
+                    'processing_status': 'ready',
+                })
+            else:
+                row['google_doc_link'] = f'https://docs.google.com/document/d/{rng.getrandbits(64):016x}'
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                db.session.execute(db.insert(Document), batch)
+                db.session.commit()
+                batch = []
+        if batch:
+            db.session.execute(db.insert(Document), batch)
+
+        if references:
+            sizes = dict(blobs)
+            now = datetime.utcnow().isoformat(' ')
+            db.session.connection().exec_driver_sql(
+                'INSERT INTO blob (sha256, size, ref_count, created_at) VALUES (?, ?, ?, ?)',
+                [(digest, sizes[digest], count, now) for digest, count in references.items()]
+            )
+        db.session.commit()
@@ -0,0 +1,85 @@
+"""Per-row cost of listing documents: full ORM objects vs. projected rows
+
+    python -m benchmarks.list_rows [--rows 20000] [--repeat 5]
+
+Builds a throwaway database with one user owning --rows documents, then
+times reading and serializing all of them the way /api/documents used to
+(Document objects) and the way it does now (DOCUMENT_LIST_COLUMNS rows).
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app import DOCUMENT_LIST_COLUMNS, create_app, serialize_document
+from blobstore import blob_key
+from models import db, Document, User
+
+def populate(rows):
+    db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='-'))
+    start = datetime(2024, 1, 1)
+    db.session.execute(db.insert(Document), [
+        {
+            'name': f'Document {number}',
+            'file_path': blob_key(f'{number:064x}'),
+            'file_type': 'pdf',
+            'file_size': 1000 + number,
+            'category': 'Work',
+            'tags': 'report, quarterly',
+            'description': 'A fairly ordinary description of the document. ' * 4,
+            'user_id': 1,
+            'created_at': start + timedelta(seconds=number),
+            'content_hash': f'{number:064x}',
+            'processing_status': 'ready',
+        }
+        for number in range(rows)
+    ])
+    db.session.commit()
+
+def list_orm():
+    documents = Document.query.filter_by(user_id=1).order_by(Document.created_at.desc(), Document.id.desc())
+    return [serialize_document(doc) for doc in documents]
+
+def list_projected():
+    rows = db.session.execute(
+        db.select(*DOCUMENT_LIST_COLUMNS).where(Document.user_id == 1)
+        .order_by(Document.created_at.desc(), Document.id.desc())
+    )
+    return [serialize_document(row) for row in rows]
+
+def best_time(function, repeat):
+    """Fastest of `repeat` runs, each in a fresh session, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(folder, 'bench.db')}",
+            'UPLOAD_FOLDER': os.path.join(folder, 'uploads'),
+            'JOB_WORKERS': 0,
+        })
+        with app.app_context():
+            populate(args.rows)
+            results = {name: best_time(function, args.repeat)
+                       for name, function in [('orm', list_orm), ('projected', list_projected)]}
+            db.session.remove()
+            db.engine.dispose()
+
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds * 1000:8.1f} ms total, {seconds / args.rows * 1e6:6.2f} µs/row")
+    print(f"   speedup: {results['orm'] / results['projected']:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+"""Repeatable request scenarios against a corpus, with latency and memory stats
+
+Scenarios run either through Flask's test client in this process, or over
+HTTP: against a threaded werkzeug server started in a child process, or
+against any server already running at a URL (e.g. gunicorn pointed at the
+corpus). Each scenario sends a fixed number of requests from `concurrency`
+threads, each logged in as the same corpus user, and reports latency
+percentiles, throughput and the serving process's peak RSS so far. Documents
+a scenario adds (e.g. `upload`) are deleted through the API afterwards, so
+every run measures the same corpus.
+"""
+import http.cookiejar
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sqlite3
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+
+from benchmarks.corpus import PASSWORD, WORDS, corpus_config
+
+# Targets
+class TestClientSession:
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, method, path, body=None, content_type=None):
+        """Send one request; returns (status, response bytes)"""
+        response = self.client.open(path, method=method, data=body, content_type=content_type)
+        data = response.get_data()  # drains streamed responses too
+        response.close()
+        return response.status_code, data
+
+class HttpSession:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, body=None, content_type=None):
+        headers = {'Content-Type': content_type} if content_type else {}
+        request = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with self.opener.open(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+def peak_rss_mb(pid=None):
+    """High-water RSS of a process in MB: this one, or `pid` (Linux only, else None)"""
+    if pid is None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(maxrss / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+class TestClientTarget:
+    name = 'testclient'
+
+    def __init__(self, data_dir):
+        from app import create_app
+        self.app = create_app(corpus_config(data_dir))
+
+    def session(self):
+        return TestClientSession(self.app.test_client())
+
+    def peak_rss_mb(self):
+        return peak_rss_mb()
+
+    def close(self):
+        pass
+
+def serve(data_dir, ports):
+    """Child process: serve the app for a corpus on a free port, reported through `ports`"""
+    from werkzeug.serving import make_server
+    from app import create_app
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no line per request
+    server = make_server('127.0.0.1', 0, create_app(corpus_config(data_dir)), threaded=True)
+    ports.put(server.server_port)
+    server.serve_forever()
+
+class WsgiServerTarget:
+    name = 'wsgi'
+
+    def __init__(self, data_dir):
+        context = multiprocessing.get_context('spawn')
+        ports = context.Queue()
+        self.process = context.Process(target=serve, args=(data_dir, ports), daemon=True)
+        self.process.start()
+        self.base_url = f'http://127.0.0.1:{ports.get(timeout=120)}'
+
+    def session(self):
+        return HttpSession(self.base_url)
+
+    def peak_rss_mb(self):
+        return peak_rss_mb(self.process.pid)
+
+    def close(self):
+        self.process.terminate()
+        self.process.join()
+
+class UrlTarget:
+    name = 'url'
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def session(self):
+        return HttpSession(self.base_url)
+
+    def peak_rss_mb(self):
+        return None  # not our process
+
+    def close(self):
+        pass
+
+# Scenarios: each sends one request and returns (status, response bytes)
+def multipart(field, filename, data):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+def documents_page(session, context):
+    return session.request('GET', '/api/documents')
+
+def documents_all(session, context):
+    return session.request('GET', '/api/documents?limit=all')
+
+def stats(session, context):
+    return session.request('GET', '/api/stats')
+
+def search(session, context):
+    return session.request('GET', f"/api/search?q={context['rng'].choice(WORDS)}")
+
+def upload(session, context):
+    # Fresh random bytes every time, so deduplication never short-cuts the write
+    body, content_type = multipart('file', 'benchmark.txt', context['rng'].randbytes(context['upload_size']))
+    return session.request('POST', '/api/upload', body, content_type)
+
+def download(session, context):
+    if not context['file_ids']:
+        return 404, b''
+    return session.request('GET', f"/api/documents/{context['rng'].choice(context['file_ids'])}/download")
+
+SCENARIOS = {
+    'documents_page': documents_page,
+    'documents_all': documents_all,
+    'stats': stats,
+    'search': search,
+    'download': download,
+    'upload': upload,
+}
+
+# Running
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def login(session, username):
+    status, body = session.request(
+        'POST', '/api/login', json.dumps({'username': username, 'password': PASSWORD}).encode(), 'application/json'
+    )
+    if status != 200 or not json.loads(body).get('success'):
+        raise RuntimeError(f'Could not log in as {username}: {body[:200]!r}')
+
+def run_scenario(target, scenario, username, file_ids, requests, concurrency, warmup, upload_size, seed):
+    sessions = []
+    for number in range(concurrency):
+        session = target.session()
+        login(session, username)
+        sessions.append((session, {
+            'rng': random.Random(seed + number), 'file_ids': file_ids, 'upload_size': upload_size,
+        }))
+    for _ in range(warmup):
+        scenario(*sessions[0])
+
+    latencies = []
+    errors = 0
+    received = 0
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker(session, context):
+        nonlocal errors, received
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                status, body = scenario(session, context)
+            except OSError:
+                status, body = None, b''
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                received += len(body)
+                if status is None or status >= 400:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker, args=session) for session in sessions]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': concurrency,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else None,
+        'bytes_received': received,
+        'peak_rss_mb': target.peak_rss_mb(),
+    }
+
+def corpus_summary(data_dir, user_id):
+    """(username, file document ids, total documents, users) straight from the corpus database"""
+    connection = sqlite3.connect(os.path.join(data_dir, 'database.db'))
+    try:
+        username = connection.execute('SELECT username FROM user WHERE id = ?', (user_id,)).fetchone()
+        if username is None:
+            raise RuntimeError(f'No user {user_id} in the corpus; generate one first')
+        file_ids = [row[0] for row in connection.execute(
+            'SELECT id FROM document WHERE user_id = ? AND file_path IS NOT NULL', (user_id,)
+        )]
+        documents = connection.execute('SELECT COUNT(*) FROM document').fetchone()[0]
+        users = connection.execute('SELECT COUNT(*) FROM user').fetchone()[0]
+    finally:
+        connection.close()
+    return username[0], file_ids, documents, users
+
+def last_document_id(data_dir):
+    connection = sqlite3.connect(os.path.join(data_dir, 'database.db'))
+    try:
+        return connection.execute('SELECT COALESCE(MAX(id), 0) FROM document').fetchone()[0]
+    finally:
+        connection.close()
+
+def remove_added_documents(target, data_dir, username, after_id):
+    """Delete the documents created since `after_id`, returning the corpus to how it was"""
+    connection = sqlite3.connect(os.path.join(data_dir, 'database.db'))
+    try:
+        doc_ids = [row[0] for row in connection.execute('SELECT id FROM document WHERE id > ?', (after_id,))]
+    finally:
+        connection.close()
+    if not doc_ids:
+        return
+    # Through the app, so the stats, search index and blob references follow
+    session = target.session()
+    login(session, username)
+    status, body = session.request(
+        'DELETE', '/api/documents', json.dumps({'ids': doc_ids}).encode(), 'application/json'
+    )
+    if status != 200:
+        raise RuntimeError(f'Could not remove the documents the benchmark added: {body[:200]!r}')
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(data_dir, target='testclient', url=None, scenarios=None, requests=200, concurrency=4,
+                   warmup=5, user_id=1, upload_size=64 * 1024, seed=1, progress=None):
+    """Run the scenarios against a corpus; returns the report as a dict"""
+    username, file_ids, documents, users = corpus_summary(data_dir, user_id)
+    if url:
+        runner = UrlTarget(url)
+    elif target == 'wsgi':
+        runner = WsgiServerTarget(data_dir)
+    else:
+        runner = TestClientTarget(data_dir)
+
+    results = {}
+    try:
+        for name in scenarios or SCENARIOS:
+            before = last_document_id(data_dir)
+            try:
+                results[name] = run_scenario(
+                    runner, SCENARIOS[name], username, file_ids, requests, concurrency, warmup, upload_size, seed
+                )
+            finally:
+                remove_added_documents(runner, data_dir, username, before)
+            if progress:
+                progress(name, results[name])
+    finally:
+        runner.close()
+
+    return {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'target': runner.name,
+            'url': url,
+            'corpus': {'documents': documents, 'users': users, 'user_id': user_id, 'user_files': len(file_ids)},
+        },
+        'scenarios': results,
+    }
+
+COMPARED_METRICS = ['p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'peak_rss_mb']
+
+def compare_reports(base, new):
+    """{scenario: {metric: new / base}} for the scenarios both reports ran"""
+    ratios = {}
+    for name, result in new['scenarios'].items():
+        before = base['scenarios'].get(name)
+        if before is None:
+            continue
+        ratios[name] = {
+            metric: round(result[metric] / before[metric], 3)
+            for metric in COMPARED_METRICS if result.get(metric) and before.get(metric)
+        }
+    return ratios
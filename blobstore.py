@@ -0,0 +1,133 @@
+"""Content-addressed, deduplicating storage for uploaded files
+
+Each distinct file is stored once under its SHA-256, at the key
+`ab/cd/abcd...` of the configured storage driver (storage.py). The `blob` table (migration 5) counts the documents
+pointing at each blob; the file is unlinked when the last one goes away.
+
+The database write lock is never held while bytes move (an S3 multipart
+upload can take minutes), so storing a file takes three steps:
+
+1. store_blob() puts the object, outside any transaction. Keys are content
+   addresses, so putting one twice is harmless.
+2. add_reference() counts the new document in a short write transaction.
+3. settle_blob(), after the commit, drops the staged source. collect_blob()
+   deletes under the write lock, so if it removed the object between the
+   first two steps it did so before the reference committed, and the object
+   is put back from the source.
+
+Releases don't touch storage inside the transaction either: the count drops,
+and collect_blob() unlinks the file afterwards. Objects that never got a
+reference (e.g. after a crash between the first two steps) are picked up by
+orphaned_blobs(), which `flask collect-blobs` runs.
+"""
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+# Younger objects may be between store_blob() and add_reference()
+ORPHAN_MIN_AGE = 60 * 60
+ORPHAN_BATCH_SIZE = 1000
+DIGEST_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+def blob_key(digest):
+    return f'{digest[:2]}/{digest[2:4]}/{digest}'
+
+def store_blob(storage, digest, source_path):
+    """Make sure the store holds `digest`, copying it from source_path (which is kept)
+
+    Returns the blob's key, which is what documents record as their file_path.
+    """
+    key = blob_key(digest)
+    if not storage.exists(key):
+        storage.save(key, source_path, move=False)
+    return key
+
+def settle_blob(storage, digest, source_path):
+    """Consume source_path once the reference is committed, putting the object back if it was collected"""
+    key = blob_key(digest)
+    if storage.exists(key):
+        os.remove(source_path)
+    else:
+        storage.save(key, source_path)
+
+def add_reference(connection, digest, size):
+    connection.exec_driver_sql(
+        '''INSERT INTO blob (sha256, size, ref_count, created_at) VALUES (?, ?, 1, ?)
+           ON CONFLICT (sha256) DO UPDATE SET ref_count = ref_count + 1''',
+        (digest, size, datetime.utcnow().isoformat(' '))
+    )
+
+def reuse_blob(connection, digest, size):
+    """Take a reference on a blob the store already holds; returns False if it has none
+
+    Blobs whose count has dropped to zero don't count: collect_blob() may be
+    about to unlink them.
+    """
+    return connection.exec_driver_sql(
+        'UPDATE blob SET ref_count = ref_count + 1 WHERE sha256 = ? AND size = ? AND ref_count > 0',
+        (digest, size)
+    ).rowcount > 0
+
+def release_references(connection, counts):
+    """Drop several references at once, from a {digest: count} mapping
+
+    Blobs that reach zero are left for collect_blob(), so the caller's
+    transaction stays short and no files are touched inside it.
+    """
+    connection.exec_driver_sql(
+        'UPDATE blob SET ref_count = ref_count - ? WHERE sha256 = ?',
+        [(count, digest) for digest, count in counts.items()]
+    )
+
+def collect_blob(connection, storage, digest):
+    """Remove a blob whose reference count has dropped to zero; returns True if it was removed
+
+    The row is deleted (taking the write lock) before the file, and only if
+    nothing has taken a new reference in the meantime.
+    """
+    deleted = connection.exec_driver_sql(
+        'DELETE FROM blob WHERE sha256 = ? AND ref_count <= 0', (digest,)
+    ).rowcount
+    if not deleted:
+        return False
+    storage.delete(blob_key(digest))
+    return True
+
+def unreferenced_blobs(connection):
+    return [row[0] for row in connection.exec_driver_sql('SELECT sha256 FROM blob WHERE ref_count <= 0')]
+
+def record_orphans(connection, candidates):
+    """Give each (digest, size) without a blob row one with a zero count; returns those digests"""
+    known = {row[0] for row in connection.exec_driver_sql(
+        'SELECT sha256 FROM blob WHERE sha256 IN (SELECT value FROM json_each(?))',
+        (json.dumps([digest for digest, _ in candidates]),)
+    )}
+    orphans = [(digest, size) for digest, size in candidates if digest not in known]
+    if orphans:
+        # A reference taken since the SELECT wins: its row stays as it is
+        now = datetime.utcnow().isoformat(' ')
+        connection.exec_driver_sql(
+            '''INSERT INTO blob (sha256, size, ref_count, created_at) VALUES (?, ?, 0, ?)
+               ON CONFLICT (sha256) DO NOTHING''',
+            [(digest, size, now) for digest, size in orphans]
+        )
+    return [digest for digest, _ in orphans]
+
+def orphaned_blobs(connection, storage, min_age=ORPHAN_MIN_AGE):
+    """Find stored objects no blob row knows about and record them for collect_blob(); returns their digests"""
+    cutoff = time.time() - min_age
+    orphans = []
+    candidates = []
+    for key, size, modified in storage.keys():
+        digest = key.rsplit('/', 1)[-1]
+        if not DIGEST_PATTERN.fullmatch(digest) or key != blob_key(digest) or modified > cutoff:
+            continue
+        candidates.append((digest, size))
+        if len(candidates) >= ORPHAN_BATCH_SIZE:
+            orphans += record_orphans(connection, candidates)
+            candidates = []
+    if candidates:
+        orphans += record_orphans(connection, candidates)
+    return orphans
@@ -0,0 +1,87 @@
+"""Default settings for create_app()
+
+Any of these can be overridden from the environment with a FLASK_ prefix,
+e.g. FLASK_SECRET_KEY=... or FLASK_SQLITE_BUSY_TIMEOUT=10000 (values are
+parsed as JSON when possible), or by passing a mapping to create_app().
+"""
+class Config:
+    SECRET_KEY = 'your-secret-key-here'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connections are cheap for SQLite, but bounding them keeps a burst of
+    # uploads queueing on the pool instead of piling up on the write lock.
+    # Merged into SQLALCHEMY_ENGINE_OPTIONS for file-backed databases only: an
+    # in-memory one lives on a single connection (StaticPool) with no pool.
+    DATABASE_POOL_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 10,
+        'pool_timeout': 30,
+    }
+
+    # Applied to every new SQLite connection. WAL lets readers carry on while
+    # a write is in progress, and with WAL synchronous=NORMAL is still safe
+    # against corruption (a power cut can only lose the last commits).
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT = 5000  # ms to wait for the write lock before "database is locked"
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # per request, i.e. per upload chunk
+    UPLOAD_FOLDER = 'uploads'
+    BLOB_FOLDER = None  # defaults to <UPLOAD_FOLDER>/blobs
+    # Where file contents are stored: 'local' (BLOB_FOLDER) or 's3' for AWS S3 or
+    # any S3-compatible service such as MinIO (needs boto3). With s3, downloads
+    # are redirects to presigned URLs valid for S3_URL_EXPIRY seconds.
+    STORAGE_BACKEND = 'local'
+    S3_BUCKET = None
+    S3_PREFIX = ''  # prepended to every object key, e.g. 'blobs/'
+    S3_ENDPOINT_URL = None  # e.g. http://localhost:9000 for MinIO; None for AWS
+    S3_REGION = None
+    S3_ACCESS_KEY_ID = None  # None uses boto3's usual credential chain
+    S3_SECRET_ACCESS_KEY = None
+    S3_MULTIPART_THRESHOLD = 16 * 1024 * 1024  # larger files go up in parts...
+    S3_MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+    S3_MAX_CONCURRENCY = 8  # ...this many at a time
+    S3_URL_EXPIRY = 5 * 60
+    MAX_UPLOAD_SIZE = 10 * 1024 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    UPLOAD_SESSION_TTL = 24 * 60 * 60  # seconds an idle chunked upload is kept
+    EXPORT_TTL = 7 * 24 * 60 * 60  # seconds a ZIP export link keeps working (and can be resumed)
+    MAX_BULK_FILES = 10000  # per bulk request or unpacked archive
+    # Unpacking stops, and nothing from the request is kept, once the archives
+    # in it expand past this many bytes in total or a member expands more than
+    # MAX_COMPRESSION_RATIO times its compressed size (a ZIP bomb)
+    MAX_UNPACKED_SIZE = 20 * 1024 * 1024 * 1024
+    MAX_COMPRESSION_RATIO = 100
+    MAX_IMPORT_SIZE = 1024 * 1024 * 1024  # bytes of CSV/JSON Lines in one metadata import
+    # Instant uploads skip sending a file the server already has, matched by
+    # SHA-256: 'user' matches only the uploader's own files, 'all' anyone's
+    # (which lets whoever knows a file's hash add it to their documents)
+    INSTANT_UPLOAD_SCOPE = 'user'
+    UI_EFFECTS = True  # particles background and celebration animations
+    ASSET_BUILD_FOLDER = None  # fingerprinted assets; defaults to static/dist
+    COMPRESS_MIN_SIZE = 1024  # bytes; smaller API responses go out uncompressed
+
+    # /metrics serves Prometheus metrics; set a token to require
+    # `Authorization: Bearer <token>` from the scraper
+    METRICS_TOKEN = None
+    SLOW_REQUEST_THRESHOLD = 1.0  # seconds; slower requests are logged with their queries, None to disable
+
+    # Previews live in an LRU disk cache of this many bytes
+    PREVIEW_FOLDER = None  # defaults to <UPLOAD_FOLDER>/previews
+    PREVIEW_CACHE_SIZE = 512 * 1024 * 1024
+    PREVIEW_SIZE = 320  # longest side, in pixels
+
+    # Background processing (jobs.py). Web processes start JOB_WORKERS threads
+    # on their first request; set it to 0 and run `flask run-jobs` instead to
+    # keep processing out of the web workers.
+    JOB_WORKERS = 2
+    JOB_POLL_INTERVAL = 2  # seconds an idle worker waits before looking again
+    JOB_TIMEOUT = 10 * 60  # seconds before a 'running' job is presumed abandoned
+    # Seconds deletion tombstones are kept; older sync tokens get a full reload
+    CHANGE_LOG_RETENTION = 30 * 24 * 60 * 60
+
+    # Hand file transfers to the front proxy: None, 'x-sendfile' or 'x-accel-redirect'.
+    # For nginx, map X_ACCEL_REDIRECT_PREFIX to UPLOAD_FOLDER in an `internal` location.
+    DOWNLOAD_OFFLOAD = None
+    X_ACCEL_REDIRECT_PREFIX = '/protected-uploads/'
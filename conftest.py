@@ -0,0 +1 @@
+"""Makes the top-level modules (app, storage, ...) importable from tests/"""
@@ -0,0 +1,354 @@
+"""ZIP archives of stored documents, streamed as they are written
+
+Nothing is assembled on disk or in memory: each member is read from storage
+in EXPORT_READ_SIZE pieces and goes straight out. Formats that are already
+compressed (images, ZIPs, Office XML files, PDFs) are stored as they are;
+everything else is deflated if that makes it smaller.
+
+The archive is laid out before the first byte is sent, so its length is
+known up front; sizes and offsets past 4 GB switch to ZIP64 records. Each
+blob's CRC-32 and deflated size are measured once, by a job after upload (or
+after `flask migrate-blobs`), and kept on the blob row. When every member has
+them, any byte range of the archive can be produced on its own, which is
+what lets a browser resume an interrupted export with a Range request.
+
+Members that haven't been measured yet (still queued, or files from before
+the blob store) are stored as they are and their CRC-32 is worked out while
+they stream; it is only needed in the data descriptor after them and in the
+central directory. Such an archive is still complete and of known length,
+but can only be downloaded from the start.
+"""
+import hashlib
+import json
+import os
+import struct
+import zlib
+from functools import partial
+
+from blobstore import blob_key
+
+EXPORT_READ_SIZE = 1024 * 1024
+DEFLATE_LEVEL = 6
+# Extensions whose contents are compressed already; deflating them again gains nothing
+PRECOMPRESSED_TYPES = {'jpg', 'jpeg', 'png', 'gif', 'zip', 'docx', 'xlsx', 'pptx', 'pdf'}
+
+STORED = 0
+DEFLATED = 8
+ZIP64_LIMIT = 0xFFFFFFFF  # sizes and offsets from here on need ZIP64 records
+ZIP64_MARKER = 0xFFFFFFFF  # stands in for a field that is in the ZIP64 extra
+FLAGS = 0x08 | 0x800  # sizes and CRC follow the data; names are UTF-8
+EXTERNAL_ATTRIBUTES = 0o100644 << 16  # a regular file, rw-r--r--
+MADE_BY_UNIX = 3 << 8
+
+def dos_timestamp(moment):
+    """(time, date) fields for a datetime; ZIP can't go before 1980"""
+    if moment is None or moment.year < 1980:
+        return 0, (1 << 5) | 1
+    return (
+        (moment.hour << 11) | (moment.minute << 5) | (moment.second // 2),
+        ((moment.year - 1980) << 9) | (moment.month << 5) | moment.day
+    )
+
+def open_deflater():
+    return zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -15)
+
+def measure(open_source, deflate=True):
+    """(CRC-32, deflated size or None if not `deflate`) of a source, reading it once"""
+    crc = 0
+    deflated = 0
+    deflater = open_deflater() if deflate else None
+    with open_source() as source:
+        while True:
+            data = source.read(EXPORT_READ_SIZE)
+            if not data:
+                break
+            crc = zlib.crc32(data, crc)
+            if deflater:
+                deflated += len(deflater.compress(data))
+    if not deflater:
+        return crc, None
+    return crc, deflated + len(deflater.flush())
+
+def open_file(path, start=0):
+    """A file from before the blob store, read from byte `start` on"""
+    source = open(path, 'rb')
+    source.seek(start)
+    return source
+
+def window(data, position, start, stop):
+    """The part of `data` (found at `position` in the archive) inside [start, stop)"""
+    return data[max(start - position, 0):max(stop - position, 0)]
+
+class ArchiveEntry:
+    """One member: where its bytes come from and how they are stored"""
+
+    def __init__(self, name, modified, size, open_source, crc, digest=None, deflated_size=None):
+        self.name = name.encode('utf-8')
+        self.modified = dos_timestamp(modified)
+        self.size = size
+        self.open_source = open_source  # (start=0) -> a readable binary file from that byte on
+        self.crc = crc  # None until measured: then worked out while the member streams
+        self.digest = digest
+        self.method = DEFLATED if deflated_size is not None else STORED
+        self.compressed_size = deflated_size if deflated_size is not None else size
+        self.offset = 0
+
+    @property
+    def zip64(self):
+        return self.size >= ZIP64_LIMIT or self.compressed_size >= ZIP64_LIMIT
+
+    def local_header(self):
+        if self.zip64:
+            extra = struct.pack('<HHQQ', 1, 16, 0, 0)
+            sizes = (ZIP64_MARKER, ZIP64_MARKER)
+        else:
+            extra = b''
+            sizes = (0, 0)
+        return struct.pack(
+            '<IHHHHHIIIHH', 0x04034b50, 45 if self.zip64 else 20, FLAGS, self.method,
+            *self.modified, 0, *sizes, len(self.name), len(extra)
+        ) + self.name + extra
+
+    # A CRC not worked out yet doesn't change these records' lengths; it is
+    # known by the time they are sent
+    def descriptor(self):
+        if self.zip64:
+            return struct.pack('<IIQQ', 0x08074b50, self.crc or 0, self.compressed_size, self.size)
+        return struct.pack('<IIII', 0x08074b50, self.crc or 0, self.compressed_size, self.size)
+
+    def central_header(self):
+        fields = []
+        size, compressed_size, offset = self.size, self.compressed_size, self.offset
+        if self.zip64:
+            fields += [size, compressed_size]
+            size = compressed_size = ZIP64_MARKER
+        if offset >= ZIP64_LIMIT:
+            fields.append(offset)
+            offset = ZIP64_MARKER
+        extra = struct.pack(f'<HH{len(fields)}Q', 1, 8 * len(fields), *fields) if fields else b''
+        version = 45 if fields else 20
+        return struct.pack(
+            '<IHHHHHHIIIHHHHHII', 0x02014b50, MADE_BY_UNIX | version, version, FLAGS, self.method,
+            *self.modified, self.crc or 0, compressed_size, size, len(self.name), len(extra),
+            0, 0, 0, EXTERNAL_ATTRIBUTES, offset
+        ) + self.name + extra
+
+class ZipArchive:
+    """A fixed archive layout whose bytes can be produced from any offset"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        offset = 0
+        for entry in entries:
+            entry.offset = offset
+            offset += len(entry.local_header()) + entry.compressed_size + len(entry.descriptor())
+        self.directory_offset = offset
+        self.directory_size = sum(len(entry.central_header()) for entry in entries)
+        self.size = offset + self.directory_size + len(self.end_records())
+        # Ranges past an unmeasured member would need its CRC before it has been read
+        self.rangeable = all(entry.crc is not None for entry in entries)
+
+        # Changes whenever any byte of the archive would
+        layout = hashlib.sha256()
+        for entry in entries:
+            layout.update(json.dumps([
+                entry.name.decode('utf-8'), entry.modified, entry.size, entry.compressed_size, entry.digest
+            ]).encode())
+        self.etag = layout.hexdigest()[:32]
+
+    def end_records(self):
+        count = len(self.entries)
+        records = b''
+        if count >= 0xFFFF or self.directory_offset >= ZIP64_LIMIT or self.directory_size >= ZIP64_LIMIT:
+            end_offset = self.directory_offset + self.directory_size
+            records = struct.pack(
+                '<IQHHIIQQQQ', 0x06064b50, 44, MADE_BY_UNIX | 45, 45, 0, 0,
+                count, count, self.directory_size, self.directory_offset
+            ) + struct.pack('<IIQI', 0x07064b50, 0, end_offset, 1)
+        return records + struct.pack(
+            '<IHHHHIIH', 0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+            min(self.directory_size, ZIP64_MARKER), min(self.directory_offset, ZIP64_MARKER), 0
+        )
+
+    def entry_data(self, entry, begin, end):
+        """Bytes [begin, end) of a member's stored (possibly deflated) data"""
+        if entry.method == STORED:
+            yield from self.stored_data(entry, begin, end)
+            return
+        with entry.open_source() as source:
+            # Deflate output can't be entered midway, so compress from the start and drop what's before `begin`
+            deflater = open_deflater()
+            position = 0
+            while position < end:
+                data = source.read(EXPORT_READ_SIZE)
+                if data:
+                    output = deflater.compress(data)
+                else:
+                    output = deflater.flush()
+                chunk = window(output, position, begin, end)
+                position += len(output)
+                if chunk:
+                    yield chunk
+                if not data:
+                    break
+            if end == entry.compressed_size and position != end:
+                # A different zlib build than the one that measured it; start over next time
+                raise RuntimeError(f'Deflated size of {entry.name.decode()} changed')
+
+    def stored_data(self, entry, begin, end):
+        """Bytes [begin, end) of a member stored as it is, working out its CRC-32 if it isn't known"""
+        crc = 0
+        with entry.open_source(begin) as source:  # a ranged GET on S3
+            position = begin
+            while position < end:
+                data = source.read(min(EXPORT_READ_SIZE, end - position))
+                if not data:
+                    raise RuntimeError(f'{entry.name.decode()} is shorter than recorded')
+                position += len(data)
+                if entry.crc is None:
+                    crc = zlib.crc32(data, crc)
+                yield data
+        if entry.crc is None:
+            entry.crc = crc  # only unmeasured archives have these, and they are never entered midway
+
+    def chunks(self, start=0, stop=None):
+        """Yield the archive's bytes [start, stop)"""
+        stop = self.size if stop is None else stop
+        if not self.rangeable and (start, stop) != (0, self.size):
+            raise ValueError('An archive with unmeasured members can only be produced whole')
+        position = 0
+        for entry in self.entries:
+            if position >= stop:
+                return
+            header = entry.local_header()
+            chunk = window(header, position, start, stop)
+            if chunk:
+                yield chunk
+            position += len(header)
+
+            if position + entry.compressed_size > start and position < stop:
+                yield from self.entry_data(
+                    entry, max(start - position, 0), min(stop - position, entry.compressed_size)
+                )
+            position += entry.compressed_size
+
+            descriptor_size = len(entry.descriptor())
+            if position + descriptor_size > start and position < stop:
+                yield window(entry.descriptor(), position, start, stop)
+            position += descriptor_size
+
+        if position >= stop:
+            return
+        buffered = []
+        for entry in self.entries:
+            buffered.append(entry.central_header())
+            if len(buffered) == 1000:
+                header = b''.join(buffered)
+                chunk = window(header, position, start, stop)
+                if chunk:
+                    yield chunk
+                position += len(header)
+                buffered = []
+        tail = b''.join(buffered) + self.end_records()
+        chunk = window(tail, position, start, stop)
+        if chunk:
+            yield chunk
+
+def member_name(document, taken):
+    """A unique file name inside the archive for a document"""
+    name = document.original_filename or f'{document.name}.{document.file_type}'
+    name = name.replace('/', '_').replace('\\', '_') or f'document-{document.id}'
+    base, ext = os.path.splitext(name)
+    number = 1
+    while name.lower() in taken:
+        number += 1
+        name = f'{base} ({number}){ext}'
+    taken.add(name.lower())
+    return name
+
+def compressible(document):
+    return (document.file_type or '').lower() not in PRECOMPRESSED_TYPES
+
+def blob_rows(connection, documents):
+    """{digest: (sha256, size, crc32, deflated_size)} for the documents' blobs"""
+    digests = sorted({document.content_hash for document in documents if document.content_hash})
+    return {row[0]: row for row in connection.exec_driver_sql(
+        'SELECT sha256, size, crc32, deflated_size FROM blob WHERE sha256 IN (SELECT value FROM json_each(?))',
+        (json.dumps(digests),)
+    )}
+
+def needs_deflated_size(document, blob):
+    return compressible(document) and blob[3] is None
+
+def unmeasured_documents(connection, documents):
+    """Ids of the documents whose blob still lacks what a ZIP export needs"""
+    blobs = blob_rows(connection, documents)
+    return [
+        document.id for document in documents
+        if document.content_hash in blobs and (
+            blobs[document.content_hash][2] is None or needs_deflated_size(document, blobs[document.content_hash])
+        )
+    ]
+
+def measure_documents(connection, storage, documents):
+    """Measure what a ZIP export of the documents' blobs needs and isn't known yet
+
+    `documents` have file_type and content_hash. A blob's CRC-32 (and
+    deflated size, if some document of it is worth deflating) is stored on
+    its row. Files from before the blob store are skipped: they are measured
+    as they stream (see the module docstring).
+    """
+    blobs = blob_rows(connection, documents)
+    pending = {}  # digest -> whether it needs a deflated size
+    for document in documents:
+        blob = blobs.get(document.content_hash)
+        if blob is None:
+            continue
+        deflate = needs_deflated_size(document, blob)
+        if blob[2] is None or deflate:
+            pending[document.content_hash] = pending.get(document.content_hash, False) or deflate
+
+    measured = [
+        (*measure(partial(storage.open, blob_key(digest)), deflate), digest)
+        for digest, deflate in pending.items()
+    ]
+    if measured:
+        connection.exec_driver_sql(
+            'UPDATE blob SET crc32 = ?, deflated_size = COALESCE(?, deflated_size) WHERE sha256 = ?', measured
+        )
+
+def plan_archive(connection, storage, documents):
+    """Lay out an archive of the documents' files, in the order given
+
+    `documents` are rows with id, name, original_filename, file_type,
+    file_path, content_hash and created_at. Nothing is read here. Returns the
+    archive and the documents whose files can't be found, which are the only
+    ones left out of it.
+    """
+    blobs = blob_rows(connection, documents)
+    entries = []
+    missing = []
+    taken = set()
+    for document in documents:
+        if document.content_hash:
+            blob = blobs.get(document.content_hash)
+            if blob is None:
+                missing.append(document)
+                continue
+            _, size, crc, deflated_size = blob
+            open_source = partial(storage.open, blob_key(document.content_hash))
+        else:
+            # From before the blob store, on local disk and never measured
+            if not os.path.exists(document.file_path):
+                missing.append(document)
+                continue
+            size, crc, deflated_size = os.path.getsize(document.file_path), None, None
+            open_source = partial(open_file, document.file_path)
+        if crc is None or not compressible(document) or deflated_size is None or deflated_size >= size:
+            deflated_size = None  # stored as it is
+
+        entries.append(ArchiveEntry(
+            member_name(document, taken), document.created_at, size, open_source, crc,
+            digest=document.content_hash, deflated_size=deflated_size
+        ))
+    return ZipArchive(entries), missing
@@ -0,0 +1,14 @@
+# Gunicorn settings for wsgi:app; each can be overridden from the environment.
+# Threads share a process (and its connection pool) and suit this I/O-bound
+# app; SQLite still allows only one writer at a time across all workers.
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+# Chunked uploads keep individual requests short, so this can stay modest
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
@@ -0,0 +1,135 @@
+"""Reading and checking bulk metadata imports
+
+An import is a CSV file (with a header row) or JSON Lines, in the same
+columns the metadata export writes, so an export can be fed straight back in.
+Only link documents can be imported; a file's bytes don't travel with its
+metadata. Records are parsed from the request stream as it arrives and
+handed out in batches, each of which app.py inserts in its own transaction.
+"""
+import csv
+import io
+import json
+import re
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+IMPORT_BATCH_SIZE = 5000  # records per transaction
+READ_SIZE = 64 * 1024
+DEFAULT_CATEGORIES = ['General', 'Education', 'Professional', 'Personal', 'Business', 'Research']
+MAX_NAME_LENGTH = 200  # the Document column sizes
+MAX_LINK_LENGTH = 500
+MAX_CATEGORY_LENGTH = 100
+MAX_TAGS_LENGTH = 300
+# Whitespace, control characters and anything that could break out of an HTML
+# attribute or script string the link is written into
+UNSAFE_LINK_RE = re.compile(r'[\s\x00-\x1f\x7f\'"<>\\`]')
+
+class ImportFormatError(ValueError):
+    """The stream can't be read any further, e.g. malformed CSV"""
+
+def text_lines(stream):
+    """Lines of a binary stream (UTF-8, with or without BOM), decoded as it is read"""
+    if not isinstance(stream, io.BufferedIOBase):
+        stream = io.BufferedReader(stream, READ_SIZE)
+    # newline='' leaves line endings alone, as csv needs for quoted newlines
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from text
+    except UnicodeDecodeError as e:
+        raise ImportFormatError('The file is not UTF-8 text') from e
+    finally:
+        text.detach()  # the request owns the stream
+
+def csv_records(stream):
+    """(line number, dict) for each CSV row, keyed by the header row"""
+    reader = csv.DictReader(text_lines(stream))
+    try:
+        for record in reader:
+            yield reader.line_num, record
+    except csv.Error as e:
+        raise ImportFormatError(f'Malformed CSV at line {reader.line_num}: {e}') from e
+
+def jsonl_records(stream):
+    """(line number, dict) for each JSON Lines record; a bad line is yielded as its error message"""
+    for number, line in enumerate(text_lines(stream), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, 'Invalid JSON'
+            continue
+        yield number, record if isinstance(record, dict) else 'Not a JSON object'
+
+def batches(records, size=IMPORT_BATCH_SIZE):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def normalize_tags(tags):
+    """Tags are stored as one comma-separated string; accept a list or a string"""
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    if not isinstance(tags, list):
+        return None
+    return ', '.join(dict.fromkeys(str(tag).strip() for tag in tags if str(tag).strip()))
+
+def valid_link(link):
+    """An http(s) URL with a host and nothing that needs escaping to be displayed"""
+    if len(link) > MAX_LINK_LENGTH or UNSAFE_LINK_RE.search(link):
+        return False
+    parts = urlsplit(link)
+    return parts.scheme in ('http', 'https') and bool(parts.hostname)
+
+def text_field(record, name):
+    value = record.get(name)
+    return '' if value is None else str(value).strip()
+
+def validate_record(record, categories):
+    """Document column values for one import record, or an error message
+
+    `categories` maps lower-cased category names to how they are spelled;
+    anything else is rejected, so a typo doesn't quietly start a new category.
+    """
+    link = text_field(record, 'google_doc_link') or text_field(record, 'link')
+    if not link:
+        return 'Only links can be imported'
+    if not valid_link(link):
+        return 'Invalid link'
+
+    name = text_field(record, 'name')
+    if not name:
+        return 'Name is required'
+    if len(name) > MAX_NAME_LENGTH:
+        return 'Name is too long'
+
+    category = text_field(record, 'category') or 'General'
+    if category.lower() not in categories:
+        return f'Unknown category {category[:MAX_CATEGORY_LENGTH]!r}'
+
+    tags = normalize_tags(record.get('tags') or '')
+    if tags is None or len(tags) > MAX_TAGS_LENGTH:
+        return 'Invalid tags'
+
+    created_at = text_field(record, 'created_at')
+    try:
+        created_at = datetime.fromisoformat(created_at.removesuffix('Z')) if created_at else datetime.utcnow()
+    except ValueError:
+        return 'Invalid created_at'
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return {
+        'name': name,
+        'google_doc_link': link,
+        'file_type': 'google_doc',
+        'category': categories[category.lower()],
+        'tags': tags,
+        'description': text_field(record, 'description'),
+        'created_at': created_at,
+    }
@@ -0,0 +1,159 @@
+"""Persistent queue for document processing that shouldn't hold up a request
+
+Jobs live in the `job` table (migration 8), so they survive restarts and can
+be picked up by any process: web workers run a small thread pool, and
+`flask run-jobs` runs a dedicated one. Each job type has its own concurrency
+limit, counted across all processes, and failed jobs are retried with
+exponential backoff. A document's `processing_status` is 'pending' while it
+has jobs left, then 'ready', or 'failed' once a job has used up its retries.
+"""
+import json
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from models import db, Job
+
+# kind -> settings and handler(document_id), filled in by @job_handler
+JOB_TYPES = {}
+MAX_BACKOFF = 60 * 60
+STALE_CHECK_INTERVAL = 60
+
+_wake = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+def job_handler(kind, concurrency=1, max_attempts=5, backoff=10):
+    """Register a function as the handler for a job type
+
+    The handler gets a document id and runs inside an app context; whatever it
+    writes is committed together with the job's completion. Raising makes the
+    job retry after `backoff` seconds, doubling each time.
+    """
+    def register(handler):
+        JOB_TYPES[kind] = {
+            'handler': handler,
+            'concurrency': concurrency,
+            'max_attempts': max_attempts,
+            'backoff': backoff,
+        }
+        return handler
+    return register
+
+def enqueue_jobs(document_ids, kinds):
+    """Queue every job kind for each document, in the caller's transaction"""
+    now = datetime.utcnow()
+    rows = [
+        {'document_id': document_id, 'kind': kind, 'status': 'queued', 'attempts': 0, 'run_after': now, 'created_at': now}
+        for document_id in document_ids for kind in kinds
+    ]
+    if rows:
+        db.session.execute(db.insert(Job), rows)
+
+def wake_workers():
+    """Let this process's idle workers know new jobs are waiting"""
+    _wake.set()
+
+def claim_job():
+    """Mark the next runnable job as running and return it, or None
+
+    One UPDATE picks and claims the job, so workers in different processes
+    never take the same one, and the per-type limits hold across them.
+    """
+    limits = json.dumps({kind: settings['concurrency'] for kind, settings in JOB_TYPES.items()})
+    now = datetime.utcnow().isoformat(' ')
+    row = db.session.execute(db.text('''
+        UPDATE job SET status = 'running', attempts = attempts + 1, started_at = :now
+        WHERE id = (
+            SELECT job.id FROM job JOIN json_each(:limits) AS type_limit ON type_limit.key = job.kind
+            WHERE job.status = 'queued' AND job.run_after <= :now
+              AND (SELECT COUNT(*) FROM job AS running
+                   WHERE running.kind = job.kind AND running.status = 'running') < type_limit.value
+            ORDER BY job.run_after, job.id
+            LIMIT 1
+        )
+        RETURNING id, kind, document_id, attempts
+    '''), {'now': now, 'limits': limits}).first()
+    db.session.commit()
+    return row
+
+def update_processing_status(document_id):
+    db.session.execute(db.text('''
+        UPDATE document SET processing_status = CASE
+            WHEN EXISTS (SELECT 1 FROM job WHERE document_id = :id AND status = 'failed') THEN 'failed'
+            WHEN EXISTS (SELECT 1 FROM job WHERE document_id = :id) THEN 'pending'
+            ELSE 'ready'
+        END
+        WHERE id = :id
+    '''), {'id': document_id})
+
+def run_job(job):
+    settings = JOB_TYPES[job.kind]
+    try:
+        settings['handler'](job.document_id)
+        Job.query.filter_by(id=job.id).delete()
+    except Exception as e:
+        db.session.rollback()
+        error = f'{type(e).__name__}: {e}'
+        if job.attempts >= settings['max_attempts']:
+            Job.query.filter_by(id=job.id).update({'status': 'failed', 'last_error': error})
+            print(f"⚠️ Job {job.id} ({job.kind}) failed for good: {error}")
+        else:
+            delay = min(settings['backoff'] * 2 ** (job.attempts - 1), MAX_BACKOFF)
+            Job.query.filter_by(id=job.id).update({
+                'status': 'queued',
+                'last_error': error,
+                'run_after': datetime.utcnow() + timedelta(seconds=delay),
+            })
+            print(f"⚠️ Job {job.id} ({job.kind}) failed, retrying in {delay}s: {error}")
+            traceback.print_exc()
+    update_processing_status(job.document_id)
+    db.session.commit()
+
+def requeue_stale_jobs(timeout):
+    """Put back jobs left 'running' by a worker that died mid-job"""
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+    requeued = Job.query.filter(Job.status == 'running', Job.started_at < cutoff).update(
+        {'status': 'queued', 'run_after': datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+    return requeued
+
+def work(app, stop):
+    """Worker thread loop: run jobs until `stop` is set, sleeping when idle"""
+    with app.app_context():
+        last_stale_check = None
+        while not stop.is_set():
+            job = None
+            try:
+                now = datetime.utcnow()
+                if last_stale_check is None or (now - last_stale_check).total_seconds() > STALE_CHECK_INTERVAL:
+                    requeue_stale_jobs(app.config['JOB_TIMEOUT'])
+                    last_stale_check = now
+                job = claim_job()
+                if job is not None:
+                    run_job(job)
+            except OperationalError as e:
+                # Most likely the write lock was busy for longer than the busy timeout
+                db.session.rollback()
+                print(f"⚠️ Job worker could not reach the database: {e}")
+            finally:
+                db.session.remove()
+
+            if job is None:
+                _wake.wait(app.config['JOB_POLL_INTERVAL'])
+                _wake.clear()
+
+def start_workers(app, count):
+    """Start `count` worker threads in this process, once; returns the stop event"""
+    with _workers_lock:
+        if _workers:
+            return None
+        stop = threading.Event()
+        for number in range(count):
+            worker = threading.Thread(target=work, args=(app, stop), name=f'job-worker-{number}', daemon=True)
+            worker.start()
+            _workers.append(worker)
+        return stop
@@ -0,0 +1,195 @@
+"""Request, SQL and transfer metrics in the Prometheus text format
+
+A small in-process registry: counters, gauges and histograms with labels,
+rendered by render_metrics() for the /metrics route. app.py times every
+request and counts upload/download bytes; instrument_engine() hooks
+SQLAlchemy's cursor events so each request also knows how many queries it
+ran and how long they took. Requests slower than SLOW_REQUEST_THRESHOLD are
+logged together with the queries they issued.
+
+Values are per process. Under gunicorn each worker keeps its own, so scrape
+every worker (or run one) to see the whole picture.
+"""
+import threading
+import time
+
+from flask import g, has_request_context
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+MAX_LOGGED_QUERIES = 50  # statements kept per request for the slow-request log
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        if not self.labelnames and self.kind != 'histogram':
+            self.values[()] = 0  # so unlabelled series show up before their first event
+        REGISTRY.append(self)
+
+    def key(self, labels):
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, labels, value) for every series"""
+        with self.lock:
+            return [('', key, value) for key, value in sorted(self.values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for suffix, labels, value in self.samples():
+            lines.append(f'{self.name}{suffix}{format_labels(labels)} {format_value(value)}')
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            series = sorted(self.values.items())
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append(('_bucket', key + (('le', format_value(float(bound))),), cumulative))
+            samples.append(('_sum', key, total))
+            samples.append(('_count', key, cumulative))
+        return samples
+
+REGISTRY = []
+
+REQUESTS = Counter('http_requests_total', 'HTTP requests served.', ['method', 'endpoint', 'status'])
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time to serve a request, including streamed bodies.', ['method', 'endpoint']
+)
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests currently being served.')
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL statements executed per request.', ['endpoint'], QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL per request.', ['endpoint']
+)
+DB_QUERIES = Counter('db_queries_total', 'SQL statements executed, in requests or not.')
+DB_DURATION = Counter('db_query_duration_seconds_total', 'Time spent executing SQL statements.')
+UPLOAD_BYTES = Counter('upload_bytes_total', 'Request body bytes received by upload endpoints.', ['endpoint'])
+DOWNLOAD_BYTES = Counter('download_bytes_total', 'File bytes sent to clients by this process (not presigned downloads).')
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# SQL timing
+def instrument_engine(engine):
+    """Time every statement the engine runs, attributing it to the current request"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def finish_query(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - connection.info['query_started'].pop()
+        DB_QUERIES.inc()
+        DB_DURATION.inc(elapsed)
+        state = g.get('metrics') if has_request_context() else None
+        if state is not None:
+            state.query_count += 1
+            state.query_time += elapsed
+            if len(state.queries) < MAX_LOGGED_QUERIES:
+                state.queries.append((elapsed, statement))
+
+# Requests
+class RequestMetrics:
+    """What one request has done so far; app.py keeps it in g.metrics"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.status = 500  # until a response says otherwise
+        self.query_count = 0
+        self.query_time = 0.0
+        self.queries = []
+        self.finished = False
+
+def start_request():
+    g.metrics = RequestMetrics()
+    REQUESTS_IN_FLIGHT.inc()
+
+def finish_request(state, method, endpoint, path, slow_threshold):
+    """Record a request that has been fully served, logging it if it was slow"""
+    if state.finished:
+        return
+    state.finished = True
+    elapsed = time.perf_counter() - state.started
+    REQUESTS_IN_FLIGHT.dec()
+    REQUESTS.inc(method=method, endpoint=endpoint, status=state.status)
+    REQUEST_DURATION.observe(elapsed, method=method, endpoint=endpoint)
+    REQUEST_QUERIES.observe(state.query_count, endpoint=endpoint)
+    REQUEST_DB_DURATION.observe(state.query_time, endpoint=endpoint)
+
+    if slow_threshold is not None and elapsed >= slow_threshold:
+        print(
+            f"⚠️ Slow request: {method} {path} took {elapsed:.3f}s, "
+            f"{state.query_count} queries in {state.query_time:.3f}s"
+        )
+        for query_time, statement in state.queries:
+            print(f"    {query_time * 1000:8.1f} ms  {' '.join(statement.split())[:500]}")
+        if state.query_count > len(state.queries):
+            print(f"    ... and {state.query_count - len(state.queries)} more")
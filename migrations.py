@@ -0,0 +1,302 @@
+"""Versioned schema migrations, applied at startup in place of db.create_all()
+
+Every migration runs once, in order, inside its own write transaction together
+with the row that records it in `schema_version`, so a failed migration leaves
+the database exactly as it was. Models in models.py must be kept in step with
+the DDL here.
+"""
+import os
+import sqlite3
+from datetime import datetime
+
+# The user_stats rows computed from scratch, the same aggregates the triggers
+# of migration 6 maintain. {where} is '' or a filter on document.user_id; the
+# rebuild-stats command in app.py runs these too.
+REBUILD_STATS_SQL = [
+    '''INSERT INTO user_stats (user_id, kind, value, count, bytes)
+        SELECT user_id, 'total', '', COUNT(*), COALESCE(SUM(file_size), 0)
+        FROM document {where} GROUP BY user_id''',
+    '''INSERT INTO user_stats (user_id, kind, value, count, bytes)
+        SELECT user_id, 'file_type', COALESCE(file_type, ''), COUNT(*), COALESCE(SUM(file_size), 0)
+        FROM document {where} GROUP BY user_id, COALESCE(file_type, '')''',
+    '''INSERT INTO user_stats (user_id, kind, value, count, bytes)
+        SELECT user_id, 'category', COALESCE(category, ''), COUNT(*), COALESCE(SUM(file_size), 0)
+        FROM document {where} GROUP BY user_id, COALESCE(category, '')''',
+]
+
+# (version, description, statements or callable(conn))
+MIGRATIONS = [
+    (1, 'baseline schema', [
+        '''CREATE TABLE IF NOT EXISTS user (
+            id INTEGER NOT NULL,
+            username VARCHAR(80) NOT NULL,
+            email VARCHAR(120) NOT NULL,
+            password_hash VARCHAR(200) NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (username),
+            UNIQUE (email)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS document (
+            id INTEGER NOT NULL,
+            name VARCHAR(200) NOT NULL,
+            original_filename VARCHAR(300),
+            google_doc_link VARCHAR(500),
+            file_path VARCHAR(500),
+            file_type VARCHAR(50),
+            file_size INTEGER,
+            category VARCHAR(100),
+            tags VARCHAR(300),
+            description TEXT,
+            user_id INTEGER NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES user (id)
+        )''',
+    ]),
+    (2, 'per-user document indexes', [
+        'CREATE INDEX IF NOT EXISTS ix_document_user_created ON document (user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_document_user_category ON document (user_id, category)',
+        'CREATE INDEX IF NOT EXISTS ix_document_user_file_type ON document (user_id, file_type)',
+    ]),
+    (3, 'full-text search index', [
+        '''CREATE VIRTUAL TABLE document_fts USING fts5(
+            owner, name, description, tags, body,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )''',
+        # Default ranking: bm25 weighted towards the name, ignoring the owner token
+        "INSERT INTO document_fts (document_fts, rank) VALUES ('rank', 'bm25(0.0, 10.0, 3.0, 5.0, 1.0)')",
+        '''INSERT INTO document_fts (rowid, owner, name, description, tags, body)
+            SELECT id, 'u' || user_id, name, COALESCE(description, ''), COALESCE(tags, ''), ''
+            FROM document''',
+        '''CREATE TRIGGER document_fts_insert AFTER INSERT ON document BEGIN
+            INSERT INTO document_fts (rowid, owner, name, description, tags, body)
+            VALUES (new.id, 'u' || new.user_id, new.name, COALESCE(new.description, ''), COALESCE(new.tags, ''), '');
+        END''',
+        '''CREATE TRIGGER document_fts_update AFTER UPDATE OF user_id, name, description, tags ON document BEGIN
+            UPDATE document_fts
+            SET owner = 'u' || new.user_id, name = new.name,
+                description = COALESCE(new.description, ''), tags = COALESCE(new.tags, '')
+            WHERE rowid = old.id;
+        END''',
+        '''CREATE TRIGGER document_fts_delete AFTER DELETE ON document BEGIN
+            DELETE FROM document_fts WHERE rowid = old.id;
+        END''',
+    ]),
+    (4, 'resumable upload sessions', [
+        '''CREATE TABLE upload_session (
+            id VARCHAR(32) NOT NULL,
+            user_id INTEGER NOT NULL,
+            filename VARCHAR(300) NOT NULL,
+            category VARCHAR(100),
+            description TEXT,
+            total_size INTEGER NOT NULL,
+            received INTEGER NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES user (id)
+        )''',
+        'CREATE INDEX ix_upload_session_updated ON upload_session (updated_at)',
+    ]),
+    (5, 'content-addressed blob store', [
+        '''CREATE TABLE blob (
+            sha256 VARCHAR(64) NOT NULL,
+            size INTEGER NOT NULL,
+            ref_count INTEGER NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (sha256)
+        )''',
+        'ALTER TABLE document ADD COLUMN content_hash VARCHAR(64)',
+        'CREATE INDEX ix_document_content_hash ON document (content_hash)',
+    ]),
+    # One 'total' row per user plus one row per file type and per category,
+    # each holding a document count and the bytes those documents use
+    (6, 'per-user statistics', [
+        '''CREATE TABLE user_stats (
+            user_id INTEGER NOT NULL,
+            kind VARCHAR(20) NOT NULL,
+            value VARCHAR(100) NOT NULL,
+            count INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            PRIMARY KEY (user_id, kind, value)
+        )''',
+        *(statement.format(where='') for statement in REBUILD_STATS_SQL),
+        '''CREATE TRIGGER user_stats_insert AFTER INSERT ON document BEGIN
+            INSERT INTO user_stats (user_id, kind, value, count, bytes) VALUES
+                (new.user_id, 'total', '', 1, COALESCE(new.file_size, 0)),
+                (new.user_id, 'file_type', COALESCE(new.file_type, ''), 1, COALESCE(new.file_size, 0)),
+                (new.user_id, 'category', COALESCE(new.category, ''), 1, COALESCE(new.file_size, 0))
+            ON CONFLICT (user_id, kind, value) DO UPDATE
+                SET count = count + excluded.count, bytes = bytes + excluded.bytes;
+        END''',
+        '''CREATE TRIGGER user_stats_delete AFTER DELETE ON document BEGIN
+            UPDATE user_stats SET count = count - 1, bytes = bytes - COALESCE(old.file_size, 0)
+            WHERE user_id = old.user_id AND (
+                (kind = 'total' AND value = '')
+                OR (kind = 'file_type' AND value = COALESCE(old.file_type, ''))
+                OR (kind = 'category' AND value = COALESCE(old.category, ''))
+            );
+            DELETE FROM user_stats WHERE user_id = old.user_id AND kind != 'total' AND count <= 0;
+        END''',
+        '''CREATE TRIGGER user_stats_update AFTER UPDATE OF user_id, file_type, category, file_size ON document BEGIN
+            UPDATE user_stats SET count = count - 1, bytes = bytes - COALESCE(old.file_size, 0)
+            WHERE user_id = old.user_id AND (
+                (kind = 'total' AND value = '')
+                OR (kind = 'file_type' AND value = COALESCE(old.file_type, ''))
+                OR (kind = 'category' AND value = COALESCE(old.category, ''))
+            );
+            DELETE FROM user_stats WHERE user_id = old.user_id AND kind != 'total' AND count <= 0;
+            INSERT INTO user_stats (user_id, kind, value, count, bytes) VALUES
+                (new.user_id, 'total', '', 1, COALESCE(new.file_size, 0)),
+                (new.user_id, 'file_type', COALESCE(new.file_type, ''), 1, COALESCE(new.file_size, 0)),
+                (new.user_id, 'category', COALESCE(new.category, ''), 1, COALESCE(new.file_size, 0))
+            ON CONFLICT (user_id, kind, value) DO UPDATE
+                SET count = count + excluded.count, bytes = bytes + excluded.bytes;
+        END''',
+    ]),
+    # The latest change to each of a user's documents, in commit order. A
+    # delete leaves a tombstone row; the delta sync endpoint reads this.
+    (7, 'document change log', [
+        '''CREATE TABLE document_change (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            document_id INTEGER NOT NULL,
+            deleted BOOLEAN NOT NULL,
+            changed_at DATETIME NOT NULL
+        )''',
+        'CREATE UNIQUE INDEX ix_document_change_user_document ON document_change (user_id, document_id)',
+        'CREATE INDEX ix_document_change_user_seq ON document_change (user_id, seq)',
+        # OR REPLACE drops the document's previous entry, so the log holds one
+        # row per document and each change takes a fresh, higher seq
+        '''CREATE TRIGGER document_change_insert AFTER INSERT ON document BEGIN
+            INSERT OR REPLACE INTO document_change (user_id, document_id, deleted, changed_at)
+            VALUES (new.user_id, new.id, 0, datetime('now'));
+        END''',
+        '''CREATE TRIGGER document_change_update AFTER UPDATE ON document BEGIN
+            INSERT OR REPLACE INTO document_change (user_id, document_id, deleted, changed_at)
+            SELECT old.user_id, old.id, 1, datetime('now') WHERE old.user_id != new.user_id;
+            INSERT OR REPLACE INTO document_change (user_id, document_id, deleted, changed_at)
+            VALUES (new.user_id, new.id, 0, datetime('now'));
+        END''',
+        '''CREATE TRIGGER document_change_delete AFTER DELETE ON document BEGIN
+            INSERT OR REPLACE INTO document_change (user_id, document_id, deleted, changed_at)
+            VALUES (old.user_id, old.id, 1, datetime('now'));
+        END''',
+    ]),
+    (8, 'background job queue', [
+        '''CREATE TABLE job (
+            id INTEGER NOT NULL,
+            document_id INTEGER NOT NULL,
+            kind VARCHAR(50) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            attempts INTEGER NOT NULL,
+            run_after DATETIME NOT NULL,
+            started_at DATETIME,
+            last_error TEXT,
+            created_at DATETIME,
+            PRIMARY KEY (id)
+        )''',
+        'CREATE INDEX ix_job_status_run_after ON job (status, run_after)',
+        'CREATE INDEX ix_job_document ON job (document_id)',
+        'ALTER TABLE document ADD COLUMN processing_status VARCHAR(20)',
+    ]),
+    (9, 'relative blob keys', [
+        # Blob-backed documents record the blob's key, not a path under one
+        # particular UPLOAD_FOLDER or bucket
+        '''UPDATE document
+            SET file_path = substr(content_hash, 1, 2) || '/' || substr(content_hash, 3, 2) || '/' || content_hash
+            WHERE content_hash IS NOT NULL''',
+    ]),
+    (10, 'zip exports', [
+        '''CREATE TABLE export (
+            id VARCHAR(32) NOT NULL,
+            user_id INTEGER NOT NULL,
+            document_ids TEXT NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES user (id)
+        )''',
+        'CREATE INDEX ix_export_created ON export (created_at)',
+        # Measured for ZIP exports (see exports.py)
+        'ALTER TABLE blob ADD COLUMN crc32 INTEGER',
+        'ALTER TABLE blob ADD COLUMN deflated_size INTEGER',
+    ]),
+    # Metadata imports skip links the user already has
+    (11, 'per-user link index', [
+        'CREATE INDEX ix_document_user_link ON document (user_id, google_doc_link) WHERE google_doc_link IS NOT NULL',
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description VARCHAR(200),
+        applied_at DATETIME
+    )''')
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+def has_user_tables(conn):
+    return conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name != 'schema_version'"
+    ).fetchone()[0] > 0
+
+def backup_database(conn, version):
+    """Copy the database file aside before migrating it; returns the backup path"""
+    path = conn.execute('PRAGMA database_list').fetchone()[2]
+    if not path:
+        return None  # in-memory database
+    backup_path = f'{path}.v{version}.bak'
+    target = sqlite3.connect(backup_path)
+    try:
+        conn.backup(target)
+    finally:
+        target.close()
+    return backup_path
+
+def apply_migration(conn, version, description, steps):
+    # BEGIN IMMEDIATE takes the write lock up front, so when several workers
+    # start together only one applies each migration and the rest skip it
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if current_version(conn) >= version:
+            conn.execute('ROLLBACK')
+            return False
+        if callable(steps):
+            steps(conn)
+        else:
+            for statement in steps:
+                conn.execute(statement)
+        conn.execute(
+            'INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+            (version, description, datetime.utcnow().isoformat(' '))
+        )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return True
+
+def run_migrations(engine):
+    """Bring the database up to LATEST_VERSION; returns the list of versions applied"""
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None  # transactions are managed explicitly below
+    applied = []
+    try:
+        version = current_version(conn)
+        if version < LATEST_VERSION and has_user_tables(conn):
+            backup_path = backup_database(conn, version)
+            if backup_path:
+                print(f"✅ Backed up database to {os.path.basename(backup_path)} before migrating")
+        for migration_version, description, steps in MIGRATIONS:
+            if migration_version > version and apply_migration(conn, migration_version, description, steps):
+                applied.append(migration_version)
+                print(f"✅ Applied migration {migration_version}: {description}")
+    finally:
+        conn.isolation_level = previous_isolation
+        raw.close()
+    return applied
@@ -0,0 +1,137 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from datetime import datetime
+
+db = SQLAlchemy()
+
+def configure_sqlite(engine, config):
+    """Apply the SQLITE_* settings to every connection the engine opens"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode = {config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous = {config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT'])}")
+        cursor.execute(f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.close()
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS, plus DATABASE_POOL_OPTIONS unless the database is in memory"""
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+    return {**config['DATABASE_POOL_OPTIONS'], **options}
+
+# Database Models
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Document(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    original_filename = db.Column(db.String(300))
+    google_doc_link = db.Column(db.String(500))
+    file_path = db.Column(db.String(500))
+    file_type = db.Column(db.String(50))
+    file_size = db.Column(db.Integer)
+    category = db.Column(db.String(100), default='General')
+    tags = db.Column(db.String(300))
+    description = db.Column(db.Text)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    content_hash = db.Column(db.String(64))  # SHA-256 of the file, i.e. its blob key
+    processing_status = db.Column(db.String(20))  # 'pending', 'ready' or 'failed'; None if nothing to process
+
+    # Created by migrations.py - keep the two in step
+    __table_args__ = (
+        db.Index('ix_document_user_created', 'user_id', 'created_at'),
+        db.Index('ix_document_user_category', 'user_id', 'category'),
+        db.Index('ix_document_user_file_type', 'user_id', 'file_type'),
+        db.Index('ix_document_content_hash', 'content_hash'),
+        db.Index('ix_document_user_link', 'user_id', 'google_doc_link', sqlite_where=db.text('google_doc_link IS NOT NULL')),
+    )
+
+class UserStat(db.Model):
+    """Per-user document counters, kept current by triggers on document (see migrations.py)
+
+    kind is 'total' (with an empty value), 'file_type' or 'category'.
+    """
+    __tablename__ = 'user_stats'
+    user_id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+    bytes = db.Column(db.Integer, nullable=False)
+
+class DocumentChange(db.Model):
+    """Latest change to each document, written by triggers on document (see migrations.py)
+
+    seq only ever grows, so "everything after seq N" is a user's delta since N.
+    """
+    __tablename__ = 'document_change'
+    seq = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    document_id = db.Column(db.Integer, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_document_change_user_document', 'user_id', 'document_id', unique=True),
+        db.Index('ix_document_change_user_seq', 'user_id', 'seq'),
+    )
+
+class Job(db.Model):
+    """A queued unit of background work on one document (see jobs.py)
+
+    status is 'queued', 'running' or 'failed'; finished jobs are deleted.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    document_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_job_status_run_after', 'status', 'run_after'),
+        db.Index('ix_job_document', 'document_id'),
+    )
+
+class UploadSession(db.Model):
+    """A chunked upload in progress; the bytes so far live in its partial file"""
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    filename = db.Column(db.String(300), nullable=False)
+    category = db.Column(db.String(100), default='General')
+    description = db.Column(db.Text)
+    total_size = db.Column(db.Integer, nullable=False)
+    received = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_upload_session_updated', 'updated_at'),
+    )
+
+class Export(db.Model):
+    """A ZIP export: the documents it covers are fixed when it is created, so resumed downloads match"""
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    document_ids = db.Column(db.Text, nullable=False)  # JSON list, in archive order
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_export_created', 'created_at'),
+    )
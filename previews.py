@@ -0,0 +1,202 @@
+"""Preview images for uploaded files, kept in a size-bounded disk cache
+
+Previews are JPEG thumbnails keyed by the file's SHA-256, so documents that
+share content share a preview. They are rendered by the background workers:
+images are scaled down, PDFs have their first page rendered, and Office files
+use the thumbnail they embed. Where no real rendering is possible, the start
+of the file's text is drawn onto a page instead. A file that can't be
+previewed at all gets an empty marker, so it isn't retried on every request.
+
+The cache evicts least recently used previews once it outgrows its budget;
+serving a preview bumps its mtime, which is what eviction sorts by.
+"""
+import os
+import threading
+import textwrap
+import time
+import uuid
+import zipfile
+
+from search import extract_text, xml_text
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # previews are optional
+    Image = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # without it PDFs get a text preview
+    pdfium = None
+
+IMAGE_TYPES = {'jpg', 'jpeg', 'png'}
+OFFICE_TYPES = {'docx', 'xlsx', 'pptx'}
+PREVIEW_TYPES = IMAGE_TYPES | OFFICE_TYPES | {'pdf', 'txt'}
+
+PAGE_TEXT_CHARS = 2000
+TOUCH_INTERVAL = 60 * 60  # only refresh a preview's mtime this often
+EVICT_TO = 0.9  # evict down to this fraction of the budget, so it doesn't run on every write
+
+_cache_bytes = None
+_cache_lock = threading.Lock()
+# PDFium is not thread-safe, and the job workers are threads of the web
+# process: a crash in native code would take its requests down with it
+_pdfium_lock = threading.Lock()
+
+def can_preview(file_type):
+    return Image is not None and file_type in PREVIEW_TYPES
+
+def preview_path(root, digest):
+    return os.path.join(root, digest[:2], f'{digest}.jpg')
+
+def cached_preview(root, digest):
+    """Path of the cached preview, '' if the file has no preview, None if not cached"""
+    path = preview_path(root, digest)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if stat.st_size == 0:
+        return ''
+    if time.time() - stat.st_mtime > TOUCH_INTERVAL:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None  # evicted just now
+    return path
+
+# Rendering
+def render_image(source_path, size):
+    image = Image.open(source_path)
+    image.draft('RGB', (size, size))  # lets JPEG decode at a reduced scale
+    return image
+
+def render_pdf(source_path, size):
+    if pdfium is None:
+        return render_text_page(extract_text(source_path, 'pdf'), size)
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(source_path)
+        try:
+            page = pdf[0]
+            scale = size / max(page.get_width(), page.get_height())
+            bitmap = page.render(scale=scale * 2)
+            # Copied out, so nothing PDFium owns is touched (or freed) after the lock
+            image = bitmap.to_pil().copy()
+            bitmap.close()
+            page.close()
+            return image
+        finally:
+            pdf.close()
+
+def render_office(source_path, file_type, size):
+    with zipfile.ZipFile(source_path) as archive:
+        names = archive.namelist()
+        thumbnails = [name for name in names if name.lower().startswith('docprops/thumbnail.')]
+        if thumbnails:
+            with archive.open(thumbnails[0]) as thumbnail:
+                image = Image.open(thumbnail)
+                image.load()
+                return image
+        if file_type == 'pptx':
+            text = xml_text(archive.read('ppt/slides/slide1.xml'), 't') if 'ppt/slides/slide1.xml' in names else ''
+            return render_text_page(text, size)
+    return render_text_page(extract_text(source_path, file_type), size)
+
+def render_text_page(text, size):
+    """The start of some text drawn on a page-shaped image, or None if there is no text"""
+    text = text[:PAGE_TEXT_CHARS].strip()
+    if not text:
+        return None
+    width, height = size * 3 // 4, size
+    page = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default()
+    line_height = 12
+    lines = []
+    for paragraph in text.splitlines():
+        lines.extend(textwrap.wrap(paragraph, width=width // 6) or [''])
+    for number, line in enumerate(lines[:(height - 16) // line_height]):
+        draw.text((8, 8 + number * line_height), line, fill='#333333', font=font)
+    return page
+
+def render_preview(source_path, file_type, size):
+    if file_type in IMAGE_TYPES:
+        return render_image(source_path, size)
+    if file_type == 'pdf':
+        return render_pdf(source_path, size)
+    if file_type in OFFICE_TYPES:
+        return render_office(source_path, file_type, size)
+    return render_text_page(extract_text(source_path, file_type), size)
+
+def generate_preview(root, digest, source_path, file_type, size, max_bytes):
+    """Render and cache the preview for one file, unless it is already cached
+
+    Files that can't be read or rendered get the empty "no preview" marker;
+    errors that look transient (e.g. a missing file) are raised so the job
+    is retried.
+    """
+    if cached_preview(root, digest) is not None:
+        return
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(source_path)
+    try:
+        image = render_preview(source_path, file_type, size)
+    except Exception as e:
+        print(f"⚠️ Could not render a preview of {source_path}: {e}")
+        image = None
+    if image is not None:
+        image.thumbnail((size, size))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+    store_preview(root, digest, image, max_bytes)
+
+def store_preview(root, digest, image, max_bytes):
+    global _cache_bytes
+    path = preview_path(root, digest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write beside the target and rename, so readers never see a partial image
+    temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    if image is None:
+        open(temp_path, 'wb').close()
+    else:
+        image.save(temp_path, 'JPEG', quality=80, optimize=True)
+    os.replace(temp_path, path)
+
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = cache_size(root)
+        else:
+            _cache_bytes += os.path.getsize(path)
+        if _cache_bytes > max_bytes:
+            _cache_bytes = evict_previews(root, int(max_bytes * EVICT_TO))
+
+# LRU eviction
+def cache_entries(root):
+    """(mtime, size, path) for every cached preview"""
+    entries = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+def cache_size(root):
+    return sum(size for _, size, _ in cache_entries(root))
+
+def evict_previews(root, target_bytes):
+    """Delete the least recently used previews until the cache fits target_bytes; returns its new size"""
+    entries = sorted(cache_entries(root))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= target_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
@@ -0,0 +1,116 @@
+"""Full-text search over documents
+
+The `document_fts` FTS5 table (created by migration 3) holds name, description
+and tags, kept in sync with `document` by SQLite triggers, plus `body`, the
+text extracted from the uploaded file. Each row also carries an `owner` token
+so a MATCH only ever walks the posting lists of a single user.
+"""
+import html
+import re
+import zipfile
+from xml.etree import ElementTree
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # PDF text extraction is optional
+    PdfReader = None
+
+# Cap on text indexed per file, so one huge upload can't bloat the index
+MAX_EXTRACTED_CHARS = 1_000_000
+
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+WORD_RE = re.compile(r'\w+')
+CONTENT_COLUMNS = ['name', 'description', 'tags', 'body']
+
+def owner_token(user_id):
+    return f'u{user_id}'
+
+def build_match_query(user_id, text):
+    """Turn free text into a safe FTS5 query, or None if it has no words
+
+    Every word must match; the last one is a prefix so results update while
+    the user is still typing. The words are confined to the content columns,
+    or they would also match the `owner` token (`u1` would find all of user
+    1's documents).
+    """
+    words = WORD_RE.findall(text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return f'owner:{owner_token(user_id)} AND {{{" ".join(CONTENT_COLUMNS)}}}: ({" ".join(terms)})'
+
+def render_snippet(snippet):
+    """Escape a raw FTS snippet and turn its match markers into <mark> tags"""
+    if not snippet or SNIPPET_START not in snippet:
+        return ''
+    escaped = html.escape(snippet)
+    return escaped.replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
+# Text extraction
+def extract_txt(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read(MAX_EXTRACTED_CHARS)
+
+def extract_pdf(path):
+    if PdfReader is None:
+        return ''
+    parts = []
+    size = 0
+    for page in PdfReader(path).pages:
+        text = page.extract_text() or ''
+        parts.append(text)
+        size += len(text)
+        if size >= MAX_EXTRACTED_CHARS:
+            break
+    return '\n'.join(parts)
+
+def xml_text(data, tag):
+    """All text held in elements with the given local name, in document order"""
+    root = ElementTree.fromstring(data)
+    return ' '.join(
+        element.text for element in root.iter()
+        if element.tag.rsplit('}', 1)[-1] == tag and element.text
+    )
+
+def extract_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        return xml_text(archive.read('word/document.xml'), 't')
+
+def extract_xlsx(path):
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        parts = []
+        # Cell text lives in the shared string table, except for inline strings
+        if 'xl/sharedStrings.xml' in names:
+            parts.append(xml_text(archive.read('xl/sharedStrings.xml'), 't'))
+        for name in sorted(names):
+            if name.startswith('xl/worksheets/sheet') and name.endswith('.xml'):
+                parts.append(xml_text(archive.read(name), 't'))
+        return '\n'.join(part for part in parts if part)
+
+EXTRACTORS = {
+    'txt': extract_txt,
+    'pdf': extract_pdf,
+    'docx': extract_docx,
+    'xlsx': extract_xlsx,
+}
+
+def extract_text(path, file_type):
+    """Best-effort plain text of an uploaded file; '' if unsupported or unreadable"""
+    extractor = EXTRACTORS.get(file_type)
+    if extractor is None:
+        return ''
+    try:
+        return extractor(path)[:MAX_EXTRACTED_CHARS]
+    except Exception as e:
+        print(f"⚠️ Could not extract text from {path}: {e}")
+        return ''
+
+def index_document_body(connection, doc_id, text):
+    """Store extracted file text in the search index for one document"""
+    connection.exec_driver_sql(
+        'UPDATE document_fts SET body = ? WHERE rowid = ?', (text, doc_id)
+    )
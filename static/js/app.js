@@ -0,0 +1,1369 @@
+// Optional libraries are fetched only when first needed. Effects (the
+// particles background and celebrations) are skipped when the server turns
+// them off with UI_EFFECTS, or when the user prefers reduced motion.
+const EFFECTS_ENABLED = !document.body.classList.contains('effects-off')
+    && !window.matchMedia('(prefers-reduced-motion: reduce)').matches;
+const loadedScripts = {};
+
+function loadScript(src) {
+    if (!loadedScripts[src]) {
+        loadedScripts[src] = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = src;
+            script.async = true;
+            script.onload = resolve;
+            script.onerror = () => {
+                delete loadedScripts[src];
+                reject(new Error(`Failed to load ${src}`));
+            };
+            document.head.appendChild(script);
+        });
+    }
+    return loadedScripts[src];
+}
+
+// Initialize particles background once the page itself is ready
+window.addEventListener('load', function() {
+    const container = document.getElementById('particles-js');
+    if (!EFFECTS_ENABLED || !container) return;
+    loadScript(document.body.dataset.effectsSrc)
+        .then(() => startParticles(container))
+        .catch(error => console.error(error));
+});
+
+const DOCUMENTS_PAGE_SIZE = 50;
+let documents = [];          // pages loaded so far for the current query
+let nextCursor = null;
+let documentsQuerySeq = 0;   // bumped whenever filters/sort change
+let isLoadingDocuments = false;
+let syncToken = null;        // change-log position of the loaded list; null while searching
+let isSyncing = false;
+let pendingSyncTimer = null;
+let filterTimer = null;
+let totalDocuments = 0;
+const selectedIds = new Set();
+let currentUser = null;
+let isDarkTheme = true;
+let fileTypeChart = null;
+let categoryChart = null;
+let dashboardStats = null;
+
+// Theme Toggle
+function toggleTheme() {
+    isDarkTheme = !isDarkTheme;
+    document.body.classList.toggle('light-theme');
+
+    const themeIcon = document.querySelector('.theme-icon');
+    if (isDarkTheme) {
+        themeIcon.className = 'fas fa-moon theme-icon';
+    } else {
+        themeIcon.className = 'fas fa-sun theme-icon';
+    }
+
+    // Save theme preference
+    localStorage.setItem('docmanager-theme', isDarkTheme ? 'dark' : 'light');
+
+    // Update charts if they exist
+    updateChartThemes();
+}
+
+function updateChartThemes() {
+    const isDark = document.body.classList.contains('light-theme') ? false : true;
+    const textColor = isDark ? '#f8fafc' : '#1e293b';
+    const gridColor = isDark ? 'rgba(255,255,255,0.1)' : 'rgba(0,0,0,0.1)';
+
+    if (fileTypeChart) {
+        fileTypeChart.options.plugins.legend.labels.color = textColor;
+        fileTypeChart.update();
+    }
+    if (categoryChart) {
+        categoryChart.options.plugins.legend.labels.color = textColor;
+        categoryChart.update();
+    }
+}
+
+// Load saved theme
+const savedTheme = localStorage.getItem('docmanager-theme');
+if (savedTheme === 'light') {
+    toggleTheme(); // Switch to light theme if saved
+}
+
+// Auth Functions
+function showAuthForm(formType) {
+    document.querySelectorAll('.auth-form').forEach(form => form.classList.remove('active'));
+    document.querySelectorAll('.nav-btn').forEach(btn => btn.classList.remove('active'));
+
+    document.getElementById(formType + 'Form').classList.add('active');
+    event.target.classList.add('active');
+}
+
+async function handleLogin(e) {
+    e.preventDefault();
+    const form = e.target;
+    const formData = {
+        username: form[0].value,
+        password: form[1].value
+    };
+
+    try {
+        const response = await fetch('/api/login', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formData)
+        });
+        const data = await response.json();
+
+        if (data.success) {
+            showToast('Login successful!', 'success');
+            currentUser = data.user;
+            showApp();
+
+            // Celebration effect
+            createConfetti();
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        showToast('Login failed', 'error');
+    }
+}
+
+async function handleSignup(e) {
+    e.preventDefault();
+    const form = e.target;
+    const formData = {
+        username: form[0].value,
+        email: form[1].value,
+        password: form[2].value,
+        confirm_password: form[3].value,
+        primary_use: form[4].value
+    };
+
+    try {
+        const response = await fetch('/api/signup', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formData)
+        });
+        const data = await response.json();
+
+        if (data.success) {
+            showToast('Account created successfully!', 'success');
+            currentUser = data.user;
+            showApp();
+
+            // Celebration effect
+            createConfetti();
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        showToast('Signup failed', 'error');
+    }
+}
+
+function showApp() {
+    document.getElementById('authSection').classList.add('hidden');
+    document.getElementById('appSection').classList.remove('hidden');
+    document.getElementById('userInfo').classList.remove('hidden');
+    document.getElementById('usernameDisplay').textContent = currentUser.username;
+
+    loadDashboard();
+    restoreDocuments();
+}
+
+async function logout() {
+    try {
+        await fetch('/api/logout');
+        await clearDocumentsCache();
+        currentUser = null;
+        document.getElementById('appSection').classList.add('hidden');
+        document.getElementById('authSection').classList.remove('hidden');
+        document.getElementById('userInfo').classList.add('hidden');
+        showToast('Logged out', 'success');
+    } catch (error) {
+        showToast('Logout failed', 'error');
+    }
+}
+
+// Chart Functions
+async function renderCharts() {
+    // Chart.js is only fetched once the dashboard is actually on screen
+    if (!dashboardStats || document.getElementById('dashboardSection').classList.contains('hidden')) return;
+    try {
+        await loadScript(document.body.dataset.chartSrc);
+    } catch (error) {
+        console.error('Failed to load charts:', error);
+        return;
+    }
+    createCharts(dashboardStats);
+}
+
+function createCharts(stats) {
+    const isDark = !document.body.classList.contains('light-theme');
+    const textColor = isDark ? '#f8fafc' : '#1e293b';
+    const gridColor = isDark ? 'rgba(255,255,255,0.1)' : 'rgba(0,0,0,0.1)';
+
+    // File Type Chart
+    const fileTypeCtx = document.getElementById('fileTypeChart').getContext('2d');
+    if (fileTypeChart) {
+        fileTypeChart.destroy();
+    }
+
+    fileTypeChart = new Chart(fileTypeCtx, {
+        type: 'doughnut',
+        data: {
+            labels: Object.keys(stats.file_types),
+            datasets: [{
+                data: Object.values(stats.file_types),
+                backgroundColor: [
+                    '#6366f1', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4',
+                    '#84cc16', '#f97316', '#ec4899', '#14b8a6'
+                ],
+                borderWidth: 2,
+                borderColor: isDark ? '#1e293b' : '#ffffff'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    position: 'bottom',
+                    labels: {
+                        color: textColor,
+                        font: {
+                            size: 12
+                        }
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.label || '';
+                            const value = context.raw || 0;
+                            const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                            const percentage = Math.round((value / total) * 100);
+                            return `${label}: ${value} (${percentage}%)`;
+                        }
+                    }
+                }
+            }
+        }
+    });
+
+    // Category Chart
+    const categoryCtx = document.getElementById('categoryChart').getContext('2d');
+    if (categoryChart) {
+        categoryChart.destroy();
+    }
+
+    categoryChart = new Chart(categoryCtx, {
+        type: 'pie',
+        data: {
+            labels: Object.keys(stats.categories),
+            datasets: [{
+                data: Object.values(stats.categories),
+                backgroundColor: [
+                    '#6366f1', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4',
+                    '#84cc16', '#f97316', '#ec4899', '#14b8a6'
+                ],
+                borderWidth: 2,
+                borderColor: isDark ? '#1e293b' : '#ffffff'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    position: 'bottom',
+                    labels: {
+                        color: textColor,
+                        font: {
+                            size: 12
+                        }
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.label || '';
+                            const value = context.raw || 0;
+                            const total = context.dataset.data.reduce((a, b) => a + b, 0);
+                            const percentage = Math.round((value / total) * 100);
+                            return `${label}: ${value} (${percentage}%)`;
+                        }
+                    }
+                }
+            }
+        }
+    });
+}
+
+// Document Functions
+async function loadDashboard() {
+    try {
+        const response = await fetch('/api/stats');
+        const data = await response.json();
+
+        if (data.success) {
+            totalDocuments = data.stats.total_documents;
+            document.getElementById('totalDocs').textContent = data.stats.total_documents;
+            document.getElementById('totalStorage').textContent = data.stats.storage_formatted;
+            document.getElementById('fileTypes').textContent = Object.keys(data.stats.file_types).length;
+
+            let recentHtml = '';
+            data.stats.recent_documents.forEach(doc => {
+                recentHtml += `<div style="padding: 5px 0; border-bottom: 1px solid var(--border);">
+                    <strong>${escapeHtml(doc.name)}</strong> - ${escapeHtml(doc.category || '')}
+                </div>`;
+            });
+            document.getElementById('recentActivity').innerHTML = recentHtml || 'No recent activity';
+
+            // Create charts
+            dashboardStats = data.stats;
+            renderCharts();
+        }
+    } catch (error) {
+        console.error('Failed to load dashboard:', error);
+    }
+}
+
+// Documents are fetched a page at a time; filtering and sorting run on the server
+function buildDocumentsQuery() {
+    const [sort, order] = document.getElementById('sortSelect').value.split(':');
+    const params = new URLSearchParams({ limit: DOCUMENTS_PAGE_SIZE, sort, order });
+    const searchTerm = document.getElementById('searchInput').value.trim();
+    const typeFilter = document.getElementById('typeFilter').value;
+    const categoryFilter = document.getElementById('categoryFilter').value;
+
+    if (searchTerm) params.set('q', searchTerm);
+    if (typeFilter) params.set('type', typeFilter);
+    if (categoryFilter) params.set('category', categoryFilter);
+    return params;
+}
+
+async function loadDocuments() {
+    clearSelection();
+    documents = [];
+    nextCursor = null;
+    await fetchDocumentsPage(++documentsQuerySeq);
+}
+
+async function loadMoreDocuments() {
+    if (!nextCursor || isLoadingDocuments) return;
+    await fetchDocumentsPage(documentsQuerySeq);
+}
+
+async function fetchDocumentsPage(seq) {
+    const params = buildDocumentsQuery();
+    if (nextCursor) params.set('cursor', nextCursor);
+    isLoadingDocuments = true;
+
+    try {
+        // Searches go to the full-text index and come back ranked by relevance
+        const endpoint = params.has('q') ? '/api/search?' : '/api/documents?';
+        const response = await fetch(endpoint + params);
+        const data = await response.json();
+
+        // A newer query was started while this one was in flight
+        if (seq !== documentsQuerySeq) return;
+
+        if (data.success) {
+            const append = documents.length > 0;
+            if (!append) syncToken = data.sync_token || null;
+            documents = documents.concat(data.documents);
+            nextCursor = data.next_cursor;
+            displayDocuments();
+            saveDocumentsCache();
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        showToast('Failed to load documents', 'error');
+    } finally {
+        if (seq === documentsQuerySeq) {
+            isLoadingDocuments = false;
+            document.getElementById('documentsSentinel').textContent = nextCursor ? 'Loading more...' : '';
+        }
+    }
+}
+
+// Delta sync: after a change, fetch only what changed since syncToken
+// and patch it into the loaded pages instead of reloading them
+async function syncDocuments() {
+    if (!syncToken) {
+        // Search results are ranked by the server, so they can't be patched
+        await loadDocuments();
+        return;
+    }
+    if (isSyncing) return;
+    isSyncing = true;
+    const seq = documentsQuerySeq;
+
+    try {
+        let data;
+        do {
+            const response = await fetch('/api/documents/changes?' + new URLSearchParams({ since: syncToken }));
+            data = await response.json();
+            if (seq !== documentsQuerySeq) return;
+            if (!data.success) {
+                showToast(data.message, 'error');
+                return;
+            }
+            if (data.reset) {
+                await loadDocuments();
+                return;
+            }
+            applyDocumentChanges(data.documents, data.deleted);
+            syncToken = data.token;
+        } while (data.has_more);
+
+        displayDocuments();
+        saveDocumentsCache();
+    } catch (error) {
+        showToast('Failed to sync documents', 'error');
+    } finally {
+        isSyncing = false;
+    }
+}
+
+function applyDocumentChanges(changed, deleted) {
+    const gone = new Set(deleted.concat(changed.map(doc => doc.id)));
+    documents = documents.filter(doc => !gone.has(doc.id));
+    deleted.forEach(id => selectedIds.delete(id));
+
+    const { sort, order, type, category } = Object.fromEntries(buildDocumentsQuery());
+    for (const doc of changed) {
+        if (type === 'google_doc' && !doc.google_doc_link) continue;
+        if (type === 'file' && !doc.file_path) continue;
+        if (category && doc.category !== category) continue;
+
+        let position = documents.findIndex(other => compareDocuments(doc, other, sort, order) < 0);
+        if (position === -1) {
+            // Past the last loaded row: the next page will bring it in
+            if (nextCursor) continue;
+            position = documents.length;
+        }
+        documents.splice(position, 0, doc);
+    }
+    updateBulkBar();
+}
+
+// Same ordering as DOCUMENT_SORT_KEYS on the server, ties broken by id
+function compareDocuments(a, b, sort, order) {
+    const value = doc => {
+        if (sort === 'file_size') return doc.file_size || 0;
+        if (sort === 'category') return doc.category || '';
+        return doc[sort];
+    };
+    const [x, y] = [value(a), value(b)];
+    const result = x < y ? -1 : x > y ? 1 : a.id - b.id;
+    return order === 'desc' ? -result : result;
+}
+
+// The loaded list is kept in IndexedDB, so a reload shows it at once
+// and only asks the server for what changed in the meantime
+const DOCUMENTS_CACHE_DB = 'docmanager';
+const DOCUMENTS_CACHE_STORE = 'documents';
+
+function openDocumentsCache() {
+    return new Promise((resolve, reject) => {
+        if (!window.indexedDB) {
+            reject(new Error('IndexedDB unavailable'));
+            return;
+        }
+        const request = indexedDB.open(DOCUMENTS_CACHE_DB, 1);
+        request.onupgradeneeded = () => request.result.createObjectStore(DOCUMENTS_CACHE_STORE, { keyPath: 'user_id' });
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+async function documentsCacheRequest(mode, action) {
+    const cache = await openDocumentsCache();
+    try {
+        return await new Promise((resolve, reject) => {
+            const request = action(cache.transaction(DOCUMENTS_CACHE_STORE, mode).objectStore(DOCUMENTS_CACHE_STORE));
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    } finally {
+        cache.close();
+    }
+}
+
+async function saveDocumentsCache() {
+    if (!syncToken || !currentUser) return;
+    const entry = {
+        user_id: currentUser.id,
+        view: buildDocumentsQuery().toString(),
+        documents,
+        next_cursor: nextCursor,
+        token: syncToken
+    };
+    try {
+        await documentsCacheRequest('readwrite', store => store.put(entry));
+    } catch (error) {
+        // The cache is only an optimisation
+    }
+}
+
+async function clearDocumentsCache() {
+    try {
+        await documentsCacheRequest('readwrite', store => store.clear());
+    } catch (error) {
+        // Nothing cached
+    }
+}
+
+async function restoreDocuments() {
+    let entry = null;
+    try {
+        entry = await documentsCacheRequest('readonly', store => store.get(currentUser.id));
+    } catch (error) {
+        entry = null;
+    }
+    if (!entry || entry.view !== buildDocumentsQuery().toString()) {
+        await loadDocuments();
+        return;
+    }
+
+    documentsQuerySeq++;
+    documents = entry.documents;
+    nextCursor = entry.next_cursor;
+    syncToken = entry.token;
+    displayDocuments();
+    document.getElementById('documentsSentinel').textContent = nextCursor ? 'Loading more...' : '';
+    await syncDocuments();
+}
+
+const documentsObserver = new IntersectionObserver(entries => {
+    if (entries.some(entry => entry.isIntersecting)) {
+        loadMoreDocuments();
+    }
+}, { rootMargin: '400px' });
+documentsObserver.observe(document.getElementById('documentsSentinel'));
+
+// The grid is virtualized: cards have a fixed height, so the rows in view
+// can be worked out from the scroll position, and only those rows get DOM
+// nodes. Card elements are pooled and refilled as the window moves.
+const CARD_MIN_WIDTH = 320;
+const CARD_HEIGHT = 460;
+const CARD_GAP = 24;
+const OVERSCAN_ROWS = 2;
+const cardPool = [];
+let renderQueued = false;
+
+function displayDocuments() {
+    const container = document.getElementById('documentsContainer');
+    if (documents.length === 0) {
+        container.innerHTML = '<div class="text-center">No documents found</div>';
+        container.style.height = '';
+        cardPool.length = 0;
+        schedulePendingSync();
+        return;
+    }
+    if (!container.querySelector('.documents-window')) {
+        container.innerHTML = '<div class="documents-window"></div>';
+        cardPool.length = 0;
+    }
+    renderDocumentsWindow();
+    schedulePendingSync();
+}
+
+function renderDocumentsWindow() {
+    const container = document.getElementById('documentsContainer');
+    const grid = container.querySelector('.documents-window');
+    // Nothing to lay out while the documents section is hidden
+    if (!grid || container.clientWidth === 0) return;
+
+    const columns = Math.max(1, Math.floor((container.clientWidth + CARD_GAP) / (CARD_MIN_WIDTH + CARD_GAP)));
+    const rowHeight = CARD_HEIGHT + CARD_GAP;
+    const rows = Math.ceil(documents.length / columns);
+    container.style.height = `${rows * rowHeight - CARD_GAP}px`;
+
+    const top = -container.getBoundingClientRect().top;
+    const firstRow = Math.max(0, Math.floor(top / rowHeight) - OVERSCAN_ROWS);
+    const lastRow = Math.min(rows - 1, Math.floor((top + window.innerHeight) / rowHeight) + OVERSCAN_ROWS);
+    const first = firstRow * columns;
+    const visible = documents.slice(first, Math.max(first, (lastRow + 1) * columns));
+
+    grid.style.gridTemplateColumns = `repeat(${columns}, 1fr)`;
+    grid.style.gridAutoRows = `${CARD_HEIGHT}px`;
+    grid.style.transform = `translateY(${firstRow * rowHeight}px)`;
+
+    while (cardPool.length < visible.length) {
+        const card = document.createElement('div');
+        card.className = 'document-card';
+        cardPool.push(card);
+    }
+    visible.forEach((doc, index) => {
+        const card = cardPool[index];
+        // Documents are replaced, not mutated, on change, so identity says whether to refill
+        if (card.doc !== doc) {
+            card.doc = doc;
+            card.innerHTML = renderDocumentCard(doc);
+        } else {
+            card.querySelector('.document-select').checked = selectedIds.has(doc.id);
+        }
+        if (card.parentNode !== grid || grid.children[index] !== card) {
+            grid.insertBefore(card, grid.children[index] || null);
+        }
+    });
+    while (grid.children.length > visible.length) {
+        grid.lastChild.remove();
+    }
+}
+
+function queueDocumentsRender() {
+    if (renderQueued) return;
+    renderQueued = true;
+    requestAnimationFrame(() => {
+        renderQueued = false;
+        renderDocumentsWindow();
+    });
+}
+
+window.addEventListener('scroll', queueDocumentsRender, { passive: true });
+window.addEventListener('resize', queueDocumentsRender);
+
+function renderDocumentCard(doc) {
+    let fileIcon = 'fas fa-file';
+    let iconClass = '';
+
+    if (doc.google_doc_link) {
+        fileIcon = 'fab fa-google-drive';
+        iconClass = 'drive-icon';
+    } else if (doc.file_path) {
+        const ext = (doc.file_type || '').toLowerCase();
+        if (['pdf'].includes(ext)) {
+            fileIcon = 'fas fa-file-pdf';
+            iconClass = 'pdf-icon';
+        } else if (['doc', 'docx'].includes(ext)) {
+            fileIcon = 'fas fa-file-word';
+            iconClass = 'doc-icon';
+        } else if (['xls', 'xlsx'].includes(ext)) {
+            fileIcon = 'fas fa-file-excel';
+            iconClass = 'xls-icon';
+        } else if (['jpg', 'jpeg', 'png', 'gif'].includes(ext)) {
+            fileIcon = 'fas fa-file-image';
+            iconClass = 'img-icon';
+        } else if (['js', 'html', 'css', 'py', 'java', 'cpp'].includes(ext)) {
+            fileIcon = 'fas fa-file-code';
+            iconClass = 'code-icon';
+        }
+    }
+
+    return `
+        <div class="document-header">
+            <div>
+                <div class="document-title">${escapeHtml(doc.name)}</div>
+                <span class="document-category">${escapeHtml(doc.category || '')}</span>
+            </div>
+            <input type="checkbox" class="document-select" title="Select"
+                ${selectedIds.has(doc.id) ? 'checked' : ''} onchange="toggleSelection(${doc.id}, this.checked)">
+        </div>
+
+        <div class="file-icon-container ${doc.preview_url ? 'has-preview' : ''}">
+            ${doc.preview_url ? `<img class="document-preview" src="${doc.preview_url}" alt="" loading="lazy" decoding="async"
+                onerror="this.parentElement.classList.remove('has-preview'); this.remove()">` : ''}
+            <i class="${fileIcon} ${iconClass} file-icon"></i>
+        </div>
+
+        <div class="document-content">
+            ${doc.description ? `<div class="document-description">${escapeHtml(doc.description)}</div>` : ''}
+            ${doc.snippet ? `<div class="document-description document-snippet">${doc.snippet}</div>` : ''}
+            ${doc.tags ? `<div class="document-tags">${doc.tags.split(', ').map(tag => `<span class="document-tag">${escapeHtml(tag)}</span>`).join('')}</div>` : ''}
+
+            <div class="document-meta">
+                ${doc.file_size ? `<span><i class="fas fa-weight-hanging"></i> ${doc.file_size_formatted}</span>` : ''}
+                <span><i class="fas fa-calendar"></i> ${new Date(doc.created_at).toLocaleDateString()}</span>
+                ${doc.processing_status === 'pending' ? '<span><i class="fas fa-spinner fa-spin"></i> Processing</span>' : ''}
+                ${doc.processing_status === 'failed' ? '<span title="Background processing failed"><i class="fas fa-exclamation-triangle"></i> Not indexed</span>' : ''}
+            </div>
+        </div>
+
+        <div class="document-actions">
+            ${doc.google_doc_link ? `
+                <button class="action-btn copy" data-link-action="copy">
+                    <i class="fas fa-copy"></i> Copy
+                </button>
+                <button class="action-btn" data-link-action="open">
+                    <i class="fas fa-external-link-alt"></i> Open
+                </button>
+            ` : ''}
+            ${doc.file_path ? `
+                <button class="action-btn download" onclick="downloadFile(${doc.id})">
+                    <i class="fas fa-download"></i> Download
+                </button>
+            ` : ''}
+            <button class="action-btn delete" onclick="deleteDocument(${doc.id})">
+                <i class="fas fa-trash"></i> Delete
+            </button>
+        </div>
+    `;
+}
+
+// Uploads are processed in the background; their status changes
+// arrive through the change log like any other edit
+function schedulePendingSync() {
+    clearTimeout(pendingSyncTimer);
+    if (syncToken && documents.some(doc => doc.processing_status === 'pending')) {
+        pendingSyncTimer = setTimeout(syncDocuments, 3000);
+    }
+}
+
+// Bulk actions apply to the checked cards, or with "All matching" to
+// everything the current filters match, loaded or not
+function toggleSelection(id, checked) {
+    if (checked) {
+        selectedIds.add(id);
+    } else {
+        selectedIds.delete(id);
+    }
+    updateBulkBar();
+}
+
+function clearSelection() {
+    selectedIds.clear();
+    document.getElementById('selectAllMatching').checked = false;
+    document.querySelectorAll('.document-select').forEach(box => box.checked = false);
+    updateBulkBar();
+}
+
+function updateBulkBar() {
+    const allMatching = document.getElementById('selectAllMatching').checked;
+    document.getElementById('bulkBar').classList.toggle('hidden', !allMatching && selectedIds.size === 0);
+    document.getElementById('bulkCount').textContent = allMatching
+        ? 'All matching documents'
+        : `${selectedIds.size} selected`;
+}
+
+function bulkSelection() {
+    if (!document.getElementById('selectAllMatching').checked) {
+        return { ids: Array.from(selectedIds) };
+    }
+    const params = buildDocumentsQuery();
+    return { filter: { q: params.get('q') || '', type: params.get('type') || '', category: params.get('category') || '' } };
+}
+
+async function bulkRequest(method, changes) {
+    try {
+        const response = await fetch('/api/documents', {
+            method,
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ...bulkSelection(), ...changes })
+        });
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+            clearSelection();
+            syncDocuments();
+            loadDashboard();
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        showToast('Bulk update failed', 'error');
+    }
+}
+
+function bulkRecategorize() {
+    const category = document.getElementById('bulkCategory').value;
+    if (!category) {
+        showToast('Choose a category first', 'error');
+        return;
+    }
+    bulkRequest('PATCH', { category });
+}
+
+function bulkRetag() {
+    bulkRequest('PATCH', { tags: document.getElementById('bulkTags').value });
+}
+
+// The server streams the archive; handing the URL to the browser's download
+// manager lets it resume a large export that was cut off
+async function bulkExport() {
+    try {
+        const response = await fetch('/api/exports', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(bulkSelection())
+        });
+        const data = await response.json();
+
+        if (data.success) {
+            showToast(data.message, 'success');
+            const link = document.createElement('a');
+            link.href = data.url;
+            link.download = '';
+            document.body.appendChild(link);
+            link.click();
+            link.remove();
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        showToast('Export failed', 'error');
+    }
+}
+
+function bulkDelete() {
+    const target = document.getElementById('selectAllMatching').checked
+        ? 'ALL documents matching the current filters'
+        : `${selectedIds.size} documents`;
+    if (!confirm(`Delete ${target}? This cannot be undone.`)) return;
+    bulkRequest('DELETE', {});
+}
+
+function filterDocuments() {
+    // Wait for a pause in typing before querying the server
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(loadDocuments, 250);
+}
+
+// Modal Functions
+function openAddModal() {
+    document.getElementById('addModal').style.display = 'block';
+}
+
+function closeAddModal() {
+    document.getElementById('addModal').style.display = 'none';
+}
+
+function openUploadModal() {
+    document.getElementById('uploadModal').style.display = 'block';
+}
+
+function closeUploadModal() {
+    document.getElementById('uploadModal').style.display = 'none';
+}
+
+async function handleAddDocument(e) {
+    e.preventDefault();
+    const form = e.target;
+    const formData = {
+        name: form[0].value,
+        link: form[1].value,
+        category: form[2].value,
+        description: form[3].value
+    };
+
+    try {
+        const response = await fetch('/api/documents', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formData)
+        });
+        const data = await response.json();
+
+        if (data.success) {
+            showToast('Document added!', 'success');
+            closeAddModal();
+            form.reset();
+            syncDocuments();
+            loadDashboard();
+
+            // Celebration effect for 100th document
+            if (totalDocuments + 1 === 100) {
+                createFireworks();
+                showToast('🎉 100th Document! You\'re a Storage Champion!', 'success');
+            }
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        showToast('Failed to add document', 'error');
+    }
+}
+
+// Chunked, resumable upload: the session id is remembered per file, so
+// retrying the same file after a dropped connection or a page reload
+// continues from the last byte the server stored
+const UPLOAD_MAX_RETRIES = 5;
+
+function uploadResumeKey(file) {
+    return `docmanager-upload:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+async function startUploadSession(file, category, description) {
+    const resumeKey = uploadResumeKey(file);
+    const savedId = localStorage.getItem(resumeKey);
+
+    if (savedId) {
+        const response = await fetch(`/api/uploads/${savedId}`);
+        const data = await response.json();
+        if (data.success) return data;
+        localStorage.removeItem(resumeKey);
+    }
+
+    const response = await fetch('/api/uploads', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size, category, description })
+    });
+    const data = await response.json();
+    if (data.success) localStorage.setItem(resumeKey, data.upload_id);
+    return data;
+}
+
+async function sendUploadChunks(file, upload) {
+    const progress = document.getElementById('uploadProgress');
+    let offset = upload.offset;
+    let failures = 0;
+
+    while (offset < file.size) {
+        progress.textContent = `Uploading... ${Math.floor(offset / file.size * 100)}%`;
+        const chunk = file.slice(offset, offset + upload.chunk_size);
+
+        try {
+            const response = await fetch(`/api/uploads/${upload.upload_id}?offset=${offset}`, {
+                method: 'PUT',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: chunk
+            });
+            const data = await response.json();
+            if (data.offset === undefined) throw new Error(data.message);
+            offset = data.offset;
+
+            // A rejected chunk still tells us where the server is; just retry from there
+            if (data.success) {
+                failures = 0;
+            } else if (++failures > UPLOAD_MAX_RETRIES) {
+                throw new Error(data.message);
+            }
+        } catch (error) {
+            if (++failures > UPLOAD_MAX_RETRIES) throw error;
+
+            // Back off, then ask the server where to pick up again
+            await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** failures));
+            try {
+                const response = await fetch(`/api/uploads/${upload.upload_id}`);
+                const data = await response.json();
+                if (data.success) offset = data.offset;
+            } catch (statusError) {
+                // Still offline; the next attempt will retry
+            }
+        }
+    }
+    progress.textContent = 'Finishing upload...';
+}
+
+// Instant upload: the file is hashed in a worker (hash-worker.js) and the
+// server asked whether it already holds those bytes; if it does, the
+// document is created and nothing is sent
+const INSTANT_UPLOAD_MIN_BYTES = 1024 * 1024;
+
+function hashFile(file, onProgress) {
+    return new Promise((resolve, reject) => {
+        const worker = new Worker(document.body.dataset.hashWorkerSrc);
+        worker.onmessage = event => {
+            const { loaded, sha256, error } = event.data;
+            if (sha256 || error) {
+                worker.terminate();
+                error ? reject(new Error(error)) : resolve(sha256);
+            } else {
+                onProgress(loaded);
+            }
+        };
+        worker.onerror = event => {
+            worker.terminate();
+            reject(new Error(event.message));
+        };
+        worker.postMessage({ file });
+    });
+}
+
+async function checkInstantUpload(file, category, description) {
+    const progress = document.getElementById('uploadProgress');
+    let sha256;
+    try {
+        sha256 = await hashFile(file, loaded => {
+            progress.textContent = `Checking file... ${Math.floor(loaded / file.size * 100)}%`;
+        });
+    } catch (error) {
+        return null; // can't hash here; just upload it
+    }
+
+    const response = await fetch('/api/uploads/instant', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size, sha256, category, description })
+    });
+    return { sha256, data: await response.json() };
+}
+
+async function uploadResumable(file, category, description, unpack) {
+    // Archives to unpack always go up: their members are what gets stored
+    let sha256 = null;
+    if (window.Worker && file.size >= INSTANT_UPLOAD_MIN_BYTES && !(unpack && isZip(file))) {
+        const instant = await checkInstantUpload(file, category, description);
+        if (instant) {
+            if (instant.data.uploaded || !instant.data.success) return instant.data;
+            sha256 = instant.sha256;
+        }
+    }
+
+    const upload = await startUploadSession(file, category, description);
+    if (!upload.success) return upload;
+
+    await sendUploadChunks(file, upload);
+
+    // Having the hash anyway, let the server check nothing was corrupted on the way
+    const response = await fetch(`/api/uploads/${upload.upload_id}/complete`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ unpack, sha256 })
+    });
+    const data = await response.json();
+    if (data.success) localStorage.removeItem(uploadResumeKey(file));
+    return data;
+}
+
+// Small files go up many per request; anything bigger than a batch uses the resumable protocol
+const BULK_BATCH_BYTES = 32 * 1024 * 1024;
+const BULK_BATCH_FILES = 500;
+
+function isZip(file) {
+    return file.name.toLowerCase().endsWith('.zip');
+}
+
+async function uploadBatch(batch, category, description, unpack) {
+    const formData = new FormData();
+    batch.forEach(file => formData.append(unpack && isZip(file) ? 'archive' : 'files', file));
+    formData.append('category', category);
+    formData.append('description', description);
+
+    const response = await fetch('/api/upload/bulk', { method: 'POST', body: formData });
+    return response.json();
+}
+
+async function uploadFiles(files, category, description, unpack) {
+    const progress = document.getElementById('uploadProgress');
+    const results = [];
+    let batch = [];
+    let batchBytes = 0;
+    let done = 0;
+
+    const flush = async () => {
+        if (batch.length === 0) return;
+        progress.textContent = `Uploading ${done + 1}-${done + batch.length} of ${files.length} files...`;
+        const data = await uploadBatch(batch, category, description, unpack);
+        results.push(...(data.results || batch.map(file => ({ filename: file.name, success: false, message: data.message }))));
+        done += batch.length;
+        batch = [];
+        batchBytes = 0;
+    };
+
+    for (const file of files) {
+        if (file.size > BULK_BATCH_BYTES) {
+            const data = await uploadResumable(file, category, description, unpack);
+            results.push(...(data.results || [{ filename: file.name, success: data.success, message: data.message }]));
+            done += 1;
+            continue;
+        }
+        if (batch.length >= BULK_BATCH_FILES || batchBytes + file.size > BULK_BATCH_BYTES) {
+            await flush();
+        }
+        batch.push(file);
+        batchBytes += file.size;
+    }
+    await flush();
+    return results;
+}
+
+async function handleUploadFile(e) {
+    e.preventDefault();
+    const form = e.target;
+    const fileInput = form[0];
+    const files = Array.from(fileInput.files);
+    const category = form[1].value;
+    const description = form[2].value;
+    const unpack = form[3].checked;
+    const progress = document.getElementById('uploadProgress');
+
+    if (files.length === 0) {
+        showToast('Please select a file', 'error');
+        return;
+    }
+
+    try {
+        let results;
+        if (files.length === 1) {
+            const data = await uploadResumable(files[0], category, description, unpack);
+            results = data.results || [{ filename: files[0].name, success: data.success, message: data.message }];
+        } else {
+            results = await uploadFiles(files, category, description, unpack);
+        }
+
+        const failed = results.filter(result => !result.success);
+        const uploaded = results.length - failed.length;
+
+        if (uploaded > 0) {
+            showToast(failed.length
+                ? `Uploaded ${uploaded} of ${results.length} files. Failed: ${failed.slice(0, 3).map(r => r.filename + ' (' + r.message + ')').join(', ')}`
+                : (results.length === 1 ? 'File uploaded!' : `Uploaded ${uploaded} files!`),
+                failed.length ? 'error' : 'success');
+            closeUploadModal();
+            form.reset();
+            syncDocuments();
+            loadDashboard();
+
+            // Celebration effect for large files
+            if (files.some(file => file.size > 10 * 1024 * 1024)) { // 10MB
+                createRocketAnimation();
+            }
+        } else {
+            showToast(failed.length ? failed[0].message : 'Nothing to upload', 'error');
+        }
+    } catch (error) {
+        showToast('Upload interrupted - select the same files again to resume', 'error');
+    } finally {
+        progress.textContent = '';
+    }
+}
+
+async function deleteDocument(id) {
+    if (!confirm('Are you sure you want to delete this document?')) return;
+
+    try {
+        const response = await fetch(`/api/documents/${id}`, {
+            method: 'DELETE'
+        });
+        const data = await response.json();
+
+        if (data.success) {
+            showToast('Document deleted', 'success');
+            syncDocuments();
+            loadDashboard();
+        } else {
+            showToast(data.message, 'error');
+        }
+    } catch (error) {
+        showToast('Delete failed', 'error');
+    }
+}
+
+async function downloadFile(id) {
+    try {
+        window.open(`/api/documents/${id}/download`, '_blank');
+    } catch (error) {
+        showToast('Download failed', 'error');
+    }
+}
+
+// Link buttons carry no URL in their markup; the card knows its document
+document.addEventListener('click', function(event) {
+    const button = event.target.closest('[data-link-action]');
+    const card = button && button.closest('.document-card');
+    if (!card || !card.doc) return;
+    if (button.dataset.linkAction === 'copy') {
+        copyLink(card.doc.google_doc_link);
+    } else {
+        openLink(card.doc.google_doc_link);
+    }
+});
+
+function openLink(url) {
+    let parsed;
+    try {
+        parsed = new URL(url);
+    } catch (error) {
+        parsed = null;
+    }
+    if (!parsed || !['http:', 'https:'].includes(parsed.protocol)) {
+        showToast('Only http and https links can be opened', 'error');
+        return;
+    }
+    window.open(parsed.href, '_blank', 'noopener');
+}
+
+async function copyLink(url) {
+    try {
+        await navigator.clipboard.writeText(url);
+        showToast('Link copied to clipboard!', 'success');
+    } catch (error) {
+        showToast('Failed to copy link', 'error');
+    }
+}
+
+function showSection(section) {
+    document.querySelectorAll('.nav-btn').forEach(btn => btn.classList.remove('active'));
+    event.target.classList.add('active');
+
+    document.getElementById('dashboardSection').classList.add('hidden');
+    document.getElementById('documentsSection').classList.add('hidden');
+    document.getElementById(section + 'Section').classList.remove('hidden');
+    if (section === 'dashboard') renderCharts();
+    if (section === 'documents') renderDocumentsWindow();
+}
+
+// Animation Functions
+function createConfetti() {
+    if (!EFFECTS_ENABLED) return;
+    const confettiCount = 200;
+    const confettiContainer = document.createElement('div');
+    confettiContainer.style.position = 'fixed';
+    confettiContainer.style.top = '0';
+    confettiContainer.style.left = '0';
+    confettiContainer.style.width = '100%';
+    confettiContainer.style.height = '100%';
+    confettiContainer.style.pointerEvents = 'none';
+    confettiContainer.style.zIndex = '9999';
+    document.body.appendChild(confettiContainer);
+
+    for (let i = 0; i < confettiCount; i++) {
+        const confetti = document.createElement('div');
+        confetti.style.position = 'absolute';
+        confetti.style.width = '10px';
+        confetti.style.height = '10px';
+        confetti.style.backgroundColor = getRandomColor();
+        confetti.style.borderRadius = '50%';
+        confetti.style.left = Math.random() * 100 + 'vw';
+        confetti.style.top = '-10px';
+        confetti.style.opacity = '0.8';
+        confettiContainer.appendChild(confetti);
+
+        // Animate confetti
+        const animation = confetti.animate([
+            { transform: 'translateY(0) rotate(0deg)', opacity: 1 },
+            { transform: `translateY(${window.innerHeight}px) rotate(${360 + Math.random() * 360}deg)`, opacity: 0 }
+        ], {
+            duration: 2000 + Math.random() * 3000,
+            easing: 'cubic-bezier(0.1, 0.8, 0.2, 1)'
+        });
+
+        animation.onfinish = () => {
+            confetti.remove();
+            if (confettiContainer.children.length === 0) {
+                confettiContainer.remove();
+            }
+        };
+    }
+}
+
+function createFireworks() {
+    if (!EFFECTS_ENABLED) return;
+    const fireworkCount = 5;
+    for (let i = 0; i < fireworkCount; i++) {
+        setTimeout(() => {
+            createFirework();
+        }, i * 300);
+    }
+}
+
+function createFirework() {
+    const firework = document.createElement('div');
+    firework.style.position = 'fixed';
+    firework.style.left = Math.random() * 80 + 10 + 'vw';
+    firework.style.top = Math.random() * 80 + 10 + 'vh';
+    firework.style.width = '6px';
+    firework.style.height = '6px';
+    firework.style.backgroundColor = getRandomColor();
+    firework.style.borderRadius = '50%';
+    firework.style.boxShadow = '0 0 10px ' + getRandomColor();
+    firework.style.zIndex = '9999';
+    document.body.appendChild(firework);
+
+    // Explode firework
+    const particles = 30;
+    for (let i = 0; i < particles; i++) {
+        setTimeout(() => {
+            const particle = document.createElement('div');
+            particle.style.position = 'fixed';
+            particle.style.left = firework.style.left;
+            particle.style.top = firework.style.top;
+            particle.style.width = '4px';
+            particle.style.height = '4px';
+            particle.style.backgroundColor = getRandomColor();
+            particle.style.borderRadius = '50%';
+            particle.style.zIndex = '9999';
+            document.body.appendChild(particle);
+
+            const angle = (i / particles) * Math.PI * 2;
+            const distance = 50 + Math.random() * 100;
+            const x = Math.cos(angle) * distance;
+            const y = Math.sin(angle) * distance;
+
+            particle.animate([
+                { transform: 'translate(0, 0) scale(1)', opacity: 1 },
+                { transform: `translate(${x}px, ${y}px) scale(0)`, opacity: 0 }
+            ], {
+                duration: 1000 + Math.random() * 500,
+                easing: 'cubic-bezier(0.1, 0.8, 0.2, 1)'
+            }).onfinish = () => particle.remove();
+        }, i * 30);
+    }
+
+    firework.animate([
+        { transform: 'scale(1)', opacity: 1 },
+        { transform: 'scale(0)', opacity: 0 }
+    ], {
+        duration: 500,
+        easing: 'ease-out'
+    }).onfinish = () => firework.remove();
+}
+
+function createRocketAnimation() {
+    if (!EFFECTS_ENABLED) return;
+    const rocket = document.createElement('div');
+    rocket.innerHTML = '🚀';
+    rocket.style.position = 'fixed';
+    rocket.style.left = '50%';
+    rocket.style.bottom = '20px';
+    rocket.style.fontSize = '40px';
+    rocket.style.zIndex = '9999';
+    rocket.style.transform = 'translateX(-50%)';
+    document.body.appendChild(rocket);
+
+    rocket.animate([
+        { transform: 'translateX(-50%) translateY(0)', opacity: 1 },
+        { transform: 'translateX(-50%) translateY(-100vh)', opacity: 0 }
+    ], {
+        duration: 2000,
+        easing: 'cubic-bezier(0.1, 0.8, 0.2, 1)'
+    }).onfinish = () => rocket.remove();
+}
+
+function getRandomColor() {
+    const colors = ['#6366f1', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#06b6d4'];
+    return colors[Math.floor(Math.random() * colors.length)];
+}
+
+// Utility Functions
+function showToast(message, type) {
+    const toast = document.getElementById('toast');
+    toast.textContent = message;
+    toast.className = `toast ${type}`;
+    toast.style.display = 'block';
+
+    setTimeout(() => {
+        toast.style.display = 'none';
+    }, 3000);
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+// Check if user is already logged in
+async function checkAuth() {
+    try {
+        const response = await fetch('/api/me');
+        const data = await response.json();
+        if (data.success) {
+            currentUser = data.user;
+            showApp();
+        }
+    } catch (error) {
+        // Not logged in
+    }
+}
+
+// Initialize
+checkAuth();
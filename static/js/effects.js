@@ -0,0 +1,113 @@
+// Animated particle network for the page background: a small stand-in for
+// particles.js with the same look. app.js loads this file on demand, and not
+// at all when effects are switched off.
+function startParticles(container, options = {}) {
+    const settings = {
+        count: 80,
+        color: '99, 102, 241',
+        linkDistance: 150,
+        speed: 2,
+        repulseRadius: 100,
+        ...options
+    };
+    const canvas = document.createElement('canvas');
+    canvas.style.display = 'block';
+    canvas.style.width = '100%';
+    canvas.style.height = '100%';
+    container.appendChild(canvas);
+
+    const context = canvas.getContext('2d');
+    const particles = [];
+    const pointer = { x: null, y: null };
+    let width = 0;
+    let height = 0;
+
+    function resize() {
+        const ratio = window.devicePixelRatio || 1;
+        width = container.clientWidth || window.innerWidth;
+        height = container.clientHeight || window.innerHeight;
+        canvas.width = width * ratio;
+        canvas.height = height * ratio;
+        context.setTransform(ratio, 0, 0, ratio, 0, 0);
+    }
+
+    function addParticle(x = Math.random() * width, y = Math.random() * height) {
+        particles.push({
+            x,
+            y,
+            vx: (Math.random() - 0.5) * settings.speed,
+            vy: (Math.random() - 0.5) * settings.speed,
+            radius: Math.random() * 3 + 0.5,
+            opacity: Math.random() * 0.5 + 0.1
+        });
+    }
+
+    function move(particle) {
+        particle.x += particle.vx;
+        particle.y += particle.vy;
+        // Particles leaving one edge come back in at the opposite one
+        if (particle.x < 0) particle.x = width;
+        if (particle.x > width) particle.x = 0;
+        if (particle.y < 0) particle.y = height;
+        if (particle.y > height) particle.y = 0;
+
+        if (pointer.x !== null) {
+            const dx = particle.x - pointer.x;
+            const dy = particle.y - pointer.y;
+            const distance = Math.hypot(dx, dy);
+            if (distance > 0 && distance < settings.repulseRadius) {
+                const push = (settings.repulseRadius - distance) / distance * 0.1;
+                particle.x += dx * push;
+                particle.y += dy * push;
+            }
+        }
+    }
+
+    function draw() {
+        context.clearRect(0, 0, width, height);
+        for (const particle of particles) {
+            move(particle);
+            context.beginPath();
+            context.arc(particle.x, particle.y, particle.radius, 0, Math.PI * 2);
+            context.fillStyle = `rgba(${settings.color}, ${particle.opacity})`;
+            context.fill();
+        }
+
+        context.lineWidth = 1;
+        for (let i = 0; i < particles.length; i++) {
+            for (let j = i + 1; j < particles.length; j++) {
+                const distance = Math.hypot(particles[i].x - particles[j].x, particles[i].y - particles[j].y);
+                if (distance < settings.linkDistance) {
+                    context.strokeStyle = `rgba(${settings.color}, ${0.4 * (1 - distance / settings.linkDistance)})`;
+                    context.beginPath();
+                    context.moveTo(particles[i].x, particles[i].y);
+                    context.lineTo(particles[j].x, particles[j].y);
+                    context.stroke();
+                }
+            }
+        }
+        // requestAnimationFrame pauses by itself while the tab is hidden
+        requestAnimationFrame(draw);
+    }
+
+    resize();
+    for (let i = 0; i < settings.count; i++) {
+        addParticle();
+    }
+    window.addEventListener('resize', resize);
+    window.addEventListener('mousemove', event => {
+        pointer.x = event.clientX;
+        pointer.y = event.clientY;
+    });
+    document.documentElement.addEventListener('mouseleave', () => {
+        pointer.x = null;
+        pointer.y = null;
+    });
+    window.addEventListener('click', event => {
+        for (let i = 0; i < 4; i++) {
+            addParticle(event.clientX, event.clientY);
+        }
+        particles.splice(0, Math.max(0, particles.length - settings.count * 2));
+    });
+    requestAnimationFrame(draw);
+}
@@ -0,0 +1,215 @@
+"""Where file contents live: the local disk or an S3-compatible object store
+
+Both drivers store opaque, '/'-separated keys (the blob store uses
+`ab/cd/abcd...`) and offer the same small interface:
+
+    exists(key), size(key), save(key, source_path, move=True), delete(key),
+    open(key, start=0), local_copy(key), download_url(key, filename), keys()
+
+LocalStorage keeps files under a root folder, exactly where the blob store
+always put them. S3Storage (needs the optional `boto3` package) sends files up
+with multipart uploads whose parts go in parallel, fetches them the same way
+when a job needs a local copy, and serves downloads as presigned URLs, so the
+bytes go straight from the bucket to the browser without passing through a
+Flask worker. It works with AWS and with stand-ins such as MinIO.
+"""
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from urllib.parse import quote
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # only needed for STORAGE_BACKEND = 's3'
+    boto3 = None
+
+class LocalStorage:
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def size(self, key):
+        return os.path.getsize(self.path(key))
+
+    def save(self, key, source_path, move=True):
+        """Store the file at source_path under key; with move=True the source is consumed"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if move:
+            os.replace(source_path, path)
+        else:
+            # Link (or copy) beside the target first so readers never see a partial file
+            temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+            try:
+                os.link(source_path, temp_path)
+            except OSError:  # e.g. on another file system
+                shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def open(self, key, start=0):
+        source = open(self.path(key), 'rb')
+        source.seek(start)
+        return source
+
+    @contextmanager
+    def local_copy(self, key):
+        """A path to read the file from, valid inside the with block"""
+        path = self.path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(key)
+        yield path
+
+    def download_url(self, key, filename):
+        return None  # served by Flask (or the front proxy)
+
+    def keys(self):
+        """(key, size, modified timestamp) of every stored file"""
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue  # a save in progress
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield os.path.relpath(path, self.root).replace(os.sep, '/'), stat.st_size, stat.st_mtime
+
+class S3Storage:
+    name = 's3'
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, access_key_id=None,
+                 secret_access_key=None, multipart_threshold=16 * 1024 * 1024,
+                 multipart_chunksize=16 * 1024 * 1024, max_concurrency=8, url_expiry=300):
+        if boto3 is None:
+            raise RuntimeError('The s3 storage backend needs the boto3 package')
+        if not bucket:
+            raise RuntimeError('S3_BUCKET must be set for the s3 storage backend')
+        self.bucket = bucket
+        self.prefix = prefix
+        self.url_expiry = url_expiry
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # One pooled connection per concurrent part, for every thread that transfers at once
+            config=BotoConfig(signature_version='s3v4', max_pool_connections=max(10, max_concurrency * 2)),
+        )
+        self.transfer = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+            use_threads=True,
+        )
+
+    def object_key(self, key):
+        return self.prefix + key
+
+    def head(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def exists(self, key):
+        return self.head(key) is not None
+
+    def size(self, key):
+        head = self.head(key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head['ContentLength']
+
+    def save(self, key, source_path, move=True):
+        # upload_file streams from disk; above the threshold it is a multipart upload
+        # with max_concurrency parts in flight
+        self.client.upload_file(source_path, self.bucket, self.object_key(key), Config=self.transfer)
+        if move:
+            os.remove(source_path)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def open(self, key, start=0):
+        """A readable stream of the object's bytes, from byte `start` on (a ranged GET)"""
+        ranged = {'Range': f'bytes={start}-'} if start else {}
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.object_key(key), **ranged)['Body']
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise FileNotFoundError(key) from e
+            raise
+
+    @contextmanager
+    def local_copy(self, key):
+        """Download to a temporary file (ranged GETs in parallel), removed after the with block"""
+        handle, path = tempfile.mkstemp(prefix='storage-')
+        os.close(handle)
+        try:
+            try:
+                self.client.download_file(self.bucket, self.object_key(key), path, Config=self.transfer)
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                    raise FileNotFoundError(key) from e
+                raise
+            yield path
+        finally:
+            os.remove(path)
+
+    def download_url(self, key, filename):
+        """Presigned GET that makes the browser save the object as filename"""
+        return self.client.generate_presigned_url('get_object', Params={
+            'Bucket': self.bucket,
+            'Key': self.object_key(key),
+            'ResponseContentDisposition': f"attachment; filename*=UTF-8''{quote(filename or 'download')}",
+            'ResponseCacheControl': 'private, no-transform',
+        }, ExpiresIn=self.url_expiry)
+
+    def keys(self):
+        """(key, size, modified timestamp) of every object under the prefix"""
+        pages = self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=self.prefix)
+        for page in pages:
+            for item in page.get('Contents', []):
+                yield item['Key'][len(self.prefix):], item['Size'], item['LastModified'].timestamp()
+
+def create_storage(config):
+    """The storage driver selected by STORAGE_BACKEND"""
+    backend = config['STORAGE_BACKEND']
+    if backend == 'local':
+        return LocalStorage(config['BLOB_FOLDER'])
+    if backend == 's3':
+        return S3Storage(
+            config['S3_BUCKET'],
+            prefix=config['S3_PREFIX'],
+            endpoint_url=config['S3_ENDPOINT_URL'],
+            region=config['S3_REGION'],
+            access_key_id=config['S3_ACCESS_KEY_ID'],
+            secret_access_key=config['S3_SECRET_ACCESS_KEY'],
+            multipart_threshold=config['S3_MULTIPART_THRESHOLD'],
+            multipart_chunksize=config['S3_MULTIPART_CHUNKSIZE'],
+            max_concurrency=config['S3_MAX_CONCURRENCY'],
+            url_expiry=config['S3_URL_EXPIRY'],
+        )
+    raise RuntimeError(f'Unknown STORAGE_BACKEND {backend!r}')
@@ -0,0 +1,166 @@
+"""Streamed JSON and compressed responses for the API
+
+Large listings are written out as they are read: stream_json() yields the
+document around a list one row at a time, so only the row being serialized
+is held in memory rather than the whole payload; stream_csv() and
+stream_jsonl() do the same for tabular exports. JSON is encoded with the
+optional `orjson` package when it is installed (OrjsonProvider does the same
+for jsonify()), falling back to the standard library.
+
+compress_response() then encodes API responses above a size threshold, and
+every streamed one, with the best of brotli, zstd and gzip that the client
+accepts; brotli and zstd need the optional `brotli` and `zstandard` packages.
+"""
+import csv
+import io
+import json
+import zlib
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # the standard library's json is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_MIMETYPES = {'application/json', 'text/csv', 'application/x-ndjson'}
+STREAM_CHUNK_SIZE = 16 * 1024  # bytes gathered before a chunk is yielded
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # the higher levels are too slow to run per response
+ZSTD_LEVEL = 3
+
+def dumps(value):
+    """Compact JSON for `value`, as bytes"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() through orjson, with Flask's own handling of dates and other extra types"""
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options), mimetype=self.mimetype
+        )
+
+def json_provider(app):
+    return OrjsonProvider(app) if orjson is not None else DefaultJSONProvider(app)
+
+def stream_json(head, key, rows, tail=None):
+    """Yield the JSON object `head`, with a `key` list made from `rows`
+
+    `rows` is any iterable, consumed lazily. `tail` is called once the rows are
+    exhausted and returns more fields, for values that depend on what was read
+    (e.g. the next page's cursor). Chunks of up to ~16 KB are yielded at a time.
+    """
+    buffer = [dumps(head)[:-1], b',' if head else b'', dumps(key), b':[']
+    size = 0
+    first = True
+    for row in rows:
+        if not first:
+            buffer.append(b',')
+        first = False
+        encoded = dumps(row)
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= STREAM_CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    buffer.append(b']')
+    for name, value in (tail() if tail else {}).items():
+        buffer.extend([b',', dumps(name), b':', dumps(value)])
+    buffer.append(b'}')
+    yield b''.join(buffer)
+
+def stream_jsonl(rows):
+    """Yield `rows` as JSON Lines, one object per line"""
+    buffer = []
+    size = 0
+    for row in rows:
+        encoded = dumps(row) + b'\n'
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= STREAM_CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    yield b''.join(buffer)
+
+def stream_csv(fields, rows):
+    """Yield a CSV with a `fields` header row, then one line per row dict (None as empty)"""
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fields, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if text.tell() >= STREAM_CHUNK_SIZE:
+            yield text.getvalue().encode('utf-8')
+            text.seek(0)
+            text.truncate()
+    yield text.getvalue().encode('utf-8')
+
+# Compression
+def available_encodings():
+    """Content-Encodings this process can produce, in order of preference"""
+    encodings = []
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    encodings.append('gzip')
+    return encodings
+
+def compressor(encoding):
+    """A streaming compressor for `encoding`; brotli's names its methods process() and finish()"""
+    if encoding == 'br':
+        return brotli.Compressor(quality=BROTLI_QUALITY)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31: gzip container
+
+def compress_chunks(chunks, encoding):
+    """Compress a stream of byte chunks as it is produced"""
+    encoder = compressor(encoding)
+    compress = encoder.process if encoding == 'br' else encoder.compress
+    for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield encoder.finish() if encoding == 'br' else encoder.flush()
+
+def compress_response(response, accept_encodings, min_size):
+    """Encode a JSON-ish response for the client, if it is worth it; returns the response"""
+    if (response.status_code < 200 or response.status_code == 204 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSED_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(b''.join(compress_chunks([data], encoding)))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,15 @@
+import pytest
+
+@pytest.fixture
+def make_app(tmp_path):
+    """create_app() with everything kept in memory or under tmp_path; pass more settings as keywords"""
+    def make(**config):
+        from app import create_app
+        return create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'ASSET_BUILD_FOLDER': str(tmp_path / 'dist'),
+            'JOB_WORKERS': 0,
+            **config,
+        })
+    return make
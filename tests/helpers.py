@@ -0,0 +1,28 @@
+"""Driving the API from tests"""
+import io
+
+def signup(client, username):
+    """Sign up (and so log in) a user on this client"""
+    result = client.post('/api/signup', json={
+        'username': username, 'email': f'{username}@example.com', 'password': 'secret'
+    }).get_json()
+    assert result['success']
+
+def upload(client, data, filename):
+    """Upload a file as the logged-in user; returns its document id"""
+    result = client.post('/api/upload', data={'file': (io.BytesIO(data), filename)}).get_json()
+    assert result['success']
+    return client.get('/api/documents').get_json()['documents'][0]['id']
+
+def add_link(client, name, **fields):
+    result = client.post('/api/documents', json={
+        'name': name, 'link': f'https://docs.example.com/{name}', **fields
+    }).get_json()
+    assert result['success']
+
+def run_jobs(app):
+    """Run every queued background job in the foreground"""
+    from jobs import claim_job, run_job
+    with app.app_context():
+        while (job := claim_job()) is not None:
+            run_job(job)
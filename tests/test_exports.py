@@ -0,0 +1,113 @@
+"""ZIP exports: measured archives resume, unmeasured ones stream whole, nothing is left out quietly"""
+import io
+import os
+import zipfile
+
+import pytest
+
+import exports
+from helpers import run_jobs, signup, upload
+from models import db, Document, Job
+
+FILES = {'notes.txt': b'hello world ' * 50000, 'photo.png': os.urandom(300000)}
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    signup(client, 'alice')
+    for name, data in FILES.items():
+        upload(client, data, name)
+    return client
+
+def add_legacy_document(app, path, name='old.txt'):
+    """A document from before the blob store, pointing at a file in a per-user folder"""
+    with app.app_context():
+        document = Document(name=name, original_filename=name, file_path=str(path), file_type='txt', user_id=1)
+        db.session.add(document)
+        db.session.commit()
+        return document.id
+
+def create_export(client):
+    result = client.post('/api/exports', json={'filter': {}}).get_json()
+    assert result['success']
+    return result
+
+def read_archive(response):
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    assert archive.testzip() is None
+    return {info.filename: archive.read(info) for info in archive.infolist()}
+
+def test_unmeasured_files_stream_whole_without_being_read_ahead(app, client, monkeypatch):
+    def measure(*args, **kwargs):
+        raise AssertionError('measured outside the job')
+    monkeypatch.setattr(exports, 'measure', measure)
+
+    export = create_export(client)  # the upload jobs haven't run
+    response = client.get(export['url'])
+    assert response.status_code == 200
+    assert response.headers['Accept-Ranges'] == 'none' and 'ETag' not in response.headers
+    assert response.content_length == len(response.data)
+    assert read_archive(response) == FILES
+
+    resumed = client.get(export['url'], headers={'Range': 'bytes=100-'})
+    assert resumed.status_code == 200 and resumed.data == response.data
+
+def test_measured_export_can_be_resumed(app, client):
+    run_jobs(app)
+    export = create_export(client)
+    response = client.get(export['url'])
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert read_archive(response) == FILES
+    notes = zipfile.ZipFile(io.BytesIO(response.data)).getinfo('notes.txt')
+    assert notes.compress_type == zipfile.ZIP_DEFLATED
+
+    for start in [0, 100, len(response.data) // 2, len(response.data) - 30]:
+        resumed = client.get(export['url'], headers={'Range': f'bytes={start}-', 'If-Range': response.headers['ETag']})
+        assert resumed.status_code == 206 and resumed.data == response.data[start:]
+
+def test_export_queues_measuring_once(app, client):
+    with app.app_context():
+        db.session.query(Job).delete()
+        db.session.commit()
+    create_export(client)
+    create_export(client)
+    with app.app_context():
+        assert db.session.query(Job.kind).filter_by(kind='measure').count() == len(FILES)
+
+def test_missing_files_are_reported(app, client, tmp_path):
+    add_legacy_document(app, tmp_path / 'gone.txt', name='gone.txt')
+    export = create_export(client)
+    assert export['count'] == len(FILES) and export['missing'] == ['gone.txt']
+    assert 'left out' in export['message']
+    assert read_archive(client.get(export['url'])) == FILES
+
+    legacy = tmp_path / 'old.txt'
+    legacy.write_bytes(b'legacy text')
+    add_legacy_document(app, legacy)
+    export = create_export(client)
+    assert read_archive(client.get(export['url']))['old.txt'] == b'legacy text'
+
+    legacy.unlink()
+    response = client.get(export['url'])
+    assert response.status_code == 409
+    assert response.get_json()['missing'] == ['old.txt']
+
+def test_export_from_before_migrate_blobs(app, client, tmp_path):
+    legacy = tmp_path / 'old.txt'
+    legacy.write_bytes(b'legacy text ' * 1000)
+    doc_id = add_legacy_document(app, legacy)
+    export = create_export(client)
+
+    app.test_cli_runner().invoke(args=['migrate-blobs'])
+    with app.app_context():
+        assert db.session.query(Job).filter_by(document_id=doc_id, kind='measure').count() == 1
+    assert read_archive(client.get(export['url']))['old.txt'] == b'legacy text ' * 1000
+
+    run_jobs(app)
+    response = client.get(export['url'])
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert read_archive(response)['old.txt'] == b'legacy text ' * 1000
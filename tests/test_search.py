@@ -0,0 +1,25 @@
+"""Search terms only ever match a document's content, never its owner token"""
+from helpers import add_link, signup
+
+def names(client, query):
+    return sorted(doc['name'] for doc in client.get(f'/api/search?q={query}').get_json()['documents'])
+
+def test_search_does_not_match_owner_token(make_app):
+    client = make_app().test_client()
+    signup(client, 'alice')  # user 1, owner token u1
+    add_link(client, 'report', description='quarterly numbers')
+    add_link(client, 'unicorn')
+
+    assert names(client, 'u') == ['unicorn']
+    assert names(client, 'u1') == []
+    assert names(client, 'quarter') == ['report']
+
+def test_bulk_delete_by_search_only_deletes_matches(make_app):
+    client = make_app().test_client()
+    signup(client, 'alice')
+    add_link(client, 'report')
+    add_link(client, 'unicorn')
+
+    result = client.delete('/api/documents', json={'filter': {'q': 'u'}}).get_json()
+    assert result['count'] == 1
+    assert [doc['name'] for doc in client.get('/api/documents').get_json()['documents']] == ['report']
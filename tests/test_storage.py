@@ -0,0 +1,200 @@
+"""Both storage drivers, against a temporary folder and a moto-mocked S3 bucket"""
+import hashlib
+import os
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from blobstore import blob_key, orphaned_blobs, settle_blob, store_blob
+from helpers import add_link, signup, upload
+from models import db
+from storage import LocalStorage, S3Storage
+
+moto = pytest.importorskip('moto')
+requests = pytest.importorskip('requests')
+
+BUCKET = 'documents'
+PART_SIZE = 5 * 1024 * 1024  # the smallest part S3 accepts
+KEY = 'ab/cd/abcdef'
+
+@pytest.fixture
+def aws(monkeypatch):
+    for name, value in [('AWS_ACCESS_KEY_ID', 'testing'), ('AWS_SECRET_ACCESS_KEY', 'testing'),
+                        ('AWS_DEFAULT_REGION', 'us-east-1')]:
+        monkeypatch.setenv(name, value)
+    with moto.mock_aws():
+        yield
+
+@pytest.fixture
+def s3_storage(aws):
+    storage = S3Storage(
+        BUCKET, prefix='blobs/', region='us-east-1',
+        multipart_threshold=PART_SIZE, multipart_chunksize=PART_SIZE, max_concurrency=4
+    )
+    storage.client.create_bucket(Bucket=BUCKET)
+    return storage
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorage(str(tmp_path / 'blobs'))
+
+@pytest.fixture(params=['local', 's3'])
+def storage(request):
+    return request.getfixturevalue(f'{request.param}_storage')
+
+def write_file(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+def test_save_open_and_delete(storage, tmp_path):
+    data = os.urandom(1000)
+    source = write_file(tmp_path / 'upload', data)
+
+    assert not storage.exists(KEY)
+    storage.save(KEY, source)
+    assert not os.path.exists(source)  # move=True consumes the source
+    assert storage.exists(KEY)
+    assert storage.size(KEY) == len(data)
+    with storage.open(KEY) as f:
+        assert f.read() == data
+
+    storage.delete(KEY)
+    assert not storage.exists(KEY)
+    storage.delete(KEY)  # deleting twice is fine
+
+def test_save_keeps_source_without_move(storage, tmp_path):
+    source = write_file(tmp_path / 'upload', b'hello')
+    storage.save(KEY, source, move=False)
+    assert os.path.exists(source)
+    assert storage.size(KEY) == 5
+
+def test_open_from_an_offset(storage, tmp_path):
+    data = os.urandom(3000)
+    storage.save(KEY, write_file(tmp_path / 'upload', data))
+    with storage.open(KEY, 1000) as f:
+        assert f.read() == data[1000:]
+
+def test_local_copy(storage, tmp_path):
+    data = os.urandom(3000)
+    storage.save(KEY, write_file(tmp_path / 'upload', data))
+    with storage.local_copy(KEY) as path:
+        with open(path, 'rb') as f:
+            assert f.read() == data
+
+def test_missing_key(storage):
+    assert not storage.exists(KEY)
+    with pytest.raises(FileNotFoundError):
+        storage.open(KEY)
+    with pytest.raises(FileNotFoundError):
+        with storage.local_copy(KEY):
+            pass
+
+def test_local_paths_and_no_download_url(local_storage, tmp_path):
+    local_storage.save(KEY, write_file(tmp_path / 'upload', b'x'))
+    assert os.path.exists(os.path.join(local_storage.root, 'ab', 'cd', 'abcdef'))
+    assert local_storage.download_url(KEY, 'report.pdf') is None
+
+def test_s3_multipart_save_and_parallel_local_copy(s3_storage, tmp_path):
+    data = os.urandom(2 * PART_SIZE + 1234)
+    s3_storage.save(KEY, write_file(tmp_path / 'upload', data))
+
+    head = s3_storage.client.head_object(Bucket=BUCKET, Key='blobs/' + KEY)
+    assert head['ETag'].strip('"').endswith('-3')  # went up in three parts
+    assert s3_storage.size(KEY) == len(data)
+    with s3_storage.local_copy(KEY) as path:
+        with open(path, 'rb') as f:
+            assert f.read() == data
+    assert not os.path.exists(path)  # removed after the with block
+
+def test_s3_download_url_is_presigned(s3_storage, tmp_path):
+    s3_storage.save(KEY, write_file(tmp_path / 'upload', b'report'))
+    url = s3_storage.download_url(KEY, 'quarterly report.pdf')
+
+    query = parse_qs(urlsplit(url).query)
+    assert urlsplit(url).path.endswith('/blobs/' + KEY)
+    assert query['X-Amz-Expires'] == ['300']
+    assert query['response-content-disposition'] == ["attachment; filename*=UTF-8''quarterly%20report.pdf"]
+    response = requests.get(url)
+    assert response.status_code == 200 and response.content == b'report'
+
+def test_app_download_redirects_to_s3(s3_storage, make_app):
+    app = make_app(STORAGE_BACKEND='s3', S3_BUCKET=BUCKET, S3_PREFIX='blobs/', S3_REGION='us-east-1')
+    client = app.test_client()
+    signup(client, 'alice')
+    doc_id = upload(client, b'stored in the bucket', 'notes.txt')
+
+    response = client.get(f'/api/documents/{doc_id}/download')
+    assert response.status_code == 302
+    assert 'no-store' in response.headers['Cache-Control']
+    assert requests.get(response.headers['Location']).content == b'stored in the bucket'
+
+def test_app_download_served_from_local_disk(make_app):
+    client = make_app().test_client()
+    signup(client, 'alice')
+    doc_id = upload(client, b'stored on disk', 'notes.txt')
+
+    response = client.get(f'/api/documents/{doc_id}/download')
+    assert response.status_code == 200
+    assert response.data == b'stored on disk'
+
+def test_s3_upload_leaves_the_database_to_other_writers(s3_storage, make_app, tmp_path, monkeypatch):
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "app.db"}', SQLITE_BUSY_TIMEOUT=200,
+        STORAGE_BACKEND='s3', S3_BUCKET=BUCKET, S3_PREFIX='blobs/', S3_REGION='us-east-1'
+    )
+    uploader, writer = app.test_client(), app.test_client()
+    signup(uploader, 'alice')
+    signup(writer, 'bob')
+
+    # Hold the object upload open until the other session has written
+    uploading, written = threading.Event(), threading.Event()
+    save = S3Storage.save
+    def slow_save(self, *args, **kwargs):
+        uploading.set()
+        assert written.wait(10)
+        return save(self, *args, **kwargs)
+    monkeypatch.setattr(S3Storage, 'save', slow_save)
+
+    uploaded = []
+    thread = threading.Thread(target=lambda: uploaded.append(upload(uploader, b'a large file', 'big.txt')))
+    thread.start()
+    try:
+        assert uploading.wait(10)
+        add_link(writer, 'meanwhile')
+    finally:
+        written.set()
+        thread.join(10)
+
+    assert uploaded
+    assert writer.get('/api/documents').get_json()['documents'][0]['name'] == 'meanwhile'
+    response = uploader.get(f'/api/documents/{uploaded[0]}/download')
+    assert requests.get(response.headers['Location']).content == b'a large file'
+
+def test_settle_puts_back_a_blob_collected_before_the_reference(storage, tmp_path):
+    source = write_file(tmp_path / 'upload', b'uploaded twice')
+    digest = hashlib.sha256(b'uploaded twice').hexdigest()
+
+    store_blob(storage, digest, source)
+    storage.delete(blob_key(digest))  # what collect_blob() does for the last other copy
+    settle_blob(storage, digest, source)
+    assert storage.size(blob_key(digest)) == len(b'uploaded twice')
+    assert not os.path.exists(source)
+
+def test_collect_blobs_removes_objects_nothing_referenced(make_app, tmp_path):
+    app = make_app()
+    client = app.test_client()
+    signup(client, 'alice')
+    kept = upload(client, b'referenced', 'kept.txt')
+    orphan = hashlib.sha256(b'never referenced').hexdigest()
+    with app.app_context():
+        storage = app.extensions['storage']
+        store_blob(storage, orphan, write_file(tmp_path / 'orphan', b'never referenced'))
+        assert orphaned_blobs(db.session.connection(), storage) == []  # too young to tell
+        assert orphaned_blobs(db.session.connection(), storage, min_age=-1) == [orphan]
+        db.session.commit()
+
+        app.test_cli_runner().invoke(args=['collect-blobs'])
+        assert not storage.exists(blob_key(orphan))
+    assert client.get(f'/api/documents/{kept}/download').data == b'referenced'
@@ -0,0 +1,49 @@
+"""Chunked uploads, including chunks that land on different server processes"""
+import hashlib
+import os
+
+import pytest
+
+import uploads
+from helpers import signup
+
+CHUNK = 1000
+
+def chunked_upload(client, data, between_chunks=lambda: None):
+    upload_id = client.post('/api/uploads', json={'filename': 'big.txt', 'size': len(data)}).get_json()['upload_id']
+    for offset in range(0, len(data), CHUNK):
+        between_chunks()
+        result = client.put(f'/api/uploads/{upload_id}?offset={offset}', data=data[offset:offset + CHUNK]).get_json()
+        assert result['success']
+    return client.post(f'/api/uploads/{upload_id}/complete', json={'sha256': hashlib.sha256(data).hexdigest()})
+
+@pytest.fixture
+def prefix_reads(monkeypatch):
+    """Lengths of every re-read of an upload's bytes from disk"""
+    reads = []
+    hash_file_prefix = uploads.hash_file_prefix
+
+    def counting(path, length):
+        reads.append(length)
+        return hash_file_prefix(path, length)
+    monkeypatch.setattr(uploads, 'hash_file_prefix', counting)
+    return reads
+
+def test_chunks_on_one_process_never_reread(make_app, prefix_reads):
+    client = make_app().test_client()
+    signup(client, 'alice')
+    data = os.urandom(5 * CHUNK + 123)
+
+    result = chunked_upload(client, data).get_json()
+    assert result['success'] and result['sha256'] == hashlib.sha256(data).hexdigest()
+    assert prefix_reads == []
+
+def test_chunks_on_other_processes_are_hashed_once(make_app, prefix_reads):
+    client = make_app().test_client()
+    signup(client, 'alice')
+    data = os.urandom(5 * CHUNK + 123)
+
+    # Every chunk finds a process that has never seen the upload
+    result = chunked_upload(client, data, between_chunks=uploads._hashers.clear).get_json()
+    assert result['success'] and result['sha256'] == hashlib.sha256(data).hexdigest()
+    assert prefix_reads == [len(data)]
@@ -0,0 +1,102 @@
+"""Streaming helpers for the chunked upload protocol
+
+Chunks are written straight from the request stream to a partial file in
+fixed-size reads, and fed to a running SHA-256 as they go. The running hashers
+are cached per process; when a chunk lands on a worker that doesn't hold the
+hasher (another process served the previous chunk, or the server restarted)
+the upload carries on unhashed, and the whole file is hashed once when it is
+completed. Rebuilding the hasher per chunk instead would re-read everything
+received so far on almost every chunk, with several server processes.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from werkzeug.exceptions import ClientDisconnected
+
+# Size of each read from the request stream; bounds per-request memory
+UPLOAD_READ_SIZE = 64 * 1024
+MAX_CACHED_HASHERS = 256
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+def hash_file_prefix(path, length):
+    """SHA-256 state over the first `length` bytes of a file"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(UPLOAD_READ_SIZE, remaining))
+            if not data:
+                break
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+def take_hasher(upload_id, offset):
+    """Running hasher for an upload positioned at `offset`, or None if this process has none
+
+    The cached hasher is removed while a request uses it; hand it back with
+    put_hasher() once the chunk has been written.
+    """
+    with _hashers_lock:
+        cached = _hashers.pop(upload_id, None)
+    if cached and cached[0] == offset:
+        return cached[1]
+    if offset == 0:
+        return hashlib.sha256()
+    return None
+
+def file_checksum(upload_id, path, size):
+    """SHA-256 of a completed upload: from its running hasher, or read from disk once"""
+    hasher = take_hasher(upload_id, size) or hash_file_prefix(path, size)
+    return hasher.hexdigest()
+
+def put_hasher(upload_id, offset, hasher):
+    with _hashers_lock:
+        _hashers[upload_id] = (offset, hasher)
+        while len(_hashers) > MAX_CACHED_HASHERS:
+            _hashers.popitem(last=False)
+
+def drop_hasher(upload_id):
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+
+def write_chunk(stream, path, offset, limit, hasher):
+    """Append a request body to a partial file at `offset`
+
+    Anything past `offset` left by an interrupted chunk is discarded first.
+    At most `limit` bytes are accepted, and fed to `hasher` unless it is
+    None. Returns (bytes written, complete), where complete is False if the
+    client disconnected or sent too much; the bytes written up to that point
+    are kept either way.
+    """
+    written = 0
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.truncate()
+        try:
+            while True:
+                data = stream.read(UPLOAD_READ_SIZE)
+                if not data:
+                    return written, True
+                if written + len(data) > limit:
+                    data = data[:limit - written]
+                    f.write(data)
+                    if hasher:
+                        hasher.update(data)
+                    written += len(data)
+                    return written, False
+                f.write(data)
+                if hasher:
+                    hasher.update(data)
+                written += len(data)
+        except ClientDisconnected:
+            # Keep whatever arrived so the client can resume from there
+            return written, False
+
+def create_partial_file(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()